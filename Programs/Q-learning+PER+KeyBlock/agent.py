@@ -1,11 +1,56 @@
 import numpy as np
 from collections import defaultdict
+from state_index import StateIndex
+from planning import DynaModel
+
+
+def sequential_update(q_values, flat_indices, step_sizes, td_targets):
+    """
+    Apply a batch of Q-value updates in place, equivalent to applying them one by one.
+    Repeated (state, action) entries are applied in batch order, each seeing the value
+    left by the previous one; distinct entries are updated together.
+
+    Parameters:
+        q_values: Flat view of the Q-table (modified in place)
+        flat_indices: Flat Q-table index of each sample
+        step_sizes: Per-sample step size
+        td_targets: Per-sample TD target
+    Returns:
+        Signed TD error of each sample at the moment it was applied
+    """
+    # Rank of each sample among earlier samples hitting the same entry
+    order = np.argsort(flat_indices, kind="stable")
+    sorted_indices = flat_indices[order]
+    positions = np.arange(len(order))
+    group_start = np.r_[True, sorted_indices[1:] != sorted_indices[:-1]]
+    ranks = np.empty_like(positions)
+    ranks[order] = positions - np.maximum.accumulate(np.where(group_start, positions, 0))
+
+    td_errors = np.empty(len(order))
+    for rank in range(ranks.max() + 1 if len(order) else 0):
+        mask = ranks == rank
+        entries = flat_indices[mask]
+        errors = td_targets[mask] - q_values[entries]
+        q_values[entries] += step_sizes[mask] * errors
+        td_errors[mask] = errors
+    return td_errors
 
 
 class QLearningAgent:
-    def __init__(self, maze_size_x, maze_size_y, action_size=4):
+    def __init__(self, maze_size_x, maze_size_y, action_size=4, state_index=None, dtype=np.float64):
+        """
+        Parameters:
+            maze_size_x, maze_size_y: Maze dimensions
+            action_size: Number of actions
+            state_index: StateIndex of the cells that get Q-table rows (default: every cell)
+            dtype: Floating type of the Q-table (float64, float32 or float16)
+        """
+        self.maze_size_y = maze_size_y
+        if state_index is None:
+            state_index = StateIndex.dense(maze_size_x * maze_size_y)
+        self.state_index = state_index
         # Expand the Q-table to include key status
-        self.q_table = np.zeros((maze_size_x, maze_size_y, 2, action_size))  # New third dimension: 0=no key, 1=has key
+        self.q_table = np.zeros((len(state_index), 2, action_size), dtype=dtype)  # Second dimension: 0=no key, 1=has key
         self.lr = 0.1
         self.gamma = 0.95
         self.epsilon = 1.0
@@ -13,6 +58,12 @@ class QLearningAgent:
         self.epsilon_decay = 0.995  # Slow down the decay
         self.state_action_counts = defaultdict(int)  # Track state-action visit counts
 
+        # Dyna-Q / prioritized sweeping (off while planning_steps is 0)
+        self.planning_steps = 0  # Model backups per real step
+        self.planning_batch = 64  # Backups applied together
+        self.planning_threshold = 1e-4  # Smaller TD errors are not queued
+        self.model = None  # DynaModel over (state, key flag) rows, built on the first observe
+
     def get_action(self, state, has_key=False):
         """
         Parameters:
@@ -28,37 +79,118 @@ class QLearningAgent:
             action_counts = [self.state_action_counts[(x, y, key_state, a)] for a in range(4)]
             return np.argmin(action_counts)
 
-        return np.argmax(self.q_table[x, y, key_state])
+        return np.argmax(self.q_table[self.state_id(state), key_state])
+
+    def state_id(self, state):
+        """Q-table row of an (x, y) state"""
+        x, y = map(int, state)
+        return self.state_index.index.item(x * self.maze_size_y + y)
+
+    def memory_usage(self):
+        """Bytes held by the Q-table and the state index"""
+        usage = {'q_table': self.q_table.nbytes, 'state_index': self.state_index.nbytes}
+        if self.model is not None:
+            usage['model'] = self.model.nbytes
+        return usage
 
-    def learn(self, batch, env):
+    def get_actions(self, cells, has_key):
         """
+        Vectorised epsilon-greedy selection for many agents at once
         Parameters:
-            batch: [(state, action, reward, next_state, done), ...]
-            env: Maze environment object, used to query key status
+            cells: Array of flat cell ids
+            has_key: Boolean array of key flags
         """
-        states, actions, rewards, next_states, dones = zip(*batch)
-        td_errors = []
+        q_values = self.q_table[self.state_index.state_ids(cells), has_key.astype(int)]
+        explore = np.random.random(len(cells)) < self.epsilon
+        return np.where(explore, np.random.randint(self.q_table.shape[-1], size=len(cells)),
+                        q_values.argmax(axis=1))
 
-        for i in range(len(batch)):
-            x, y = map(int, states[i])
-            next_x, next_y = map(int, next_states[i])
+    def learn(self, batch, env=None):
+        """
+        Parameters:
+            batch: (states, actions, rewards, next_states, dones, has_keys, next_has_keys) arrays,
+                   states as state ids
+            env: Maze environment object, used to query key status; if None the key flags
+                 stored with each transition are used instead (batched training)
+        Returns:
+            Absolute TD error of each transition (targets bootstrap from the pre-batch Q-table)
+        """
+        states, actions, rewards, next_states, dones = batch[:5]
 
+        if env is None:
+            current_has_key = batch[5].astype(int)
+            next_has_key = batch[6].astype(int)
+        else:
             # Directly get key status from the environment
-            current_has_key = env.has_key or ((x, y) == env.key_pos and not env.has_key)
-            next_has_key = env.has_key or ((next_x, next_y) == env.key_pos and not env.has_key)
-
-            # Calculate TD target
-            if dones[i]:
-                td_target = rewards[i]
-            else:
-                td_target = rewards[i] + self.gamma * np.max(
-                    self.q_table[next_x, next_y, int(next_has_key)]
-                )
-
-            # Update Q value
-            td_error = td_target - self.q_table[x, y, int(current_has_key), actions[i]]
-            self.q_table[x, y, int(current_has_key), actions[i]] += self.lr * td_error
-            td_errors.append(abs(td_error))
+            key_state = self.state_id(env.key_pos)
+            current_has_key = (env.has_key | (states == key_state)).astype(int)
+            next_has_key = (env.has_key | (next_states == key_state)).astype(int)
+
+        # Calculate TD targets (no bootstrap from terminal transitions)
+        next_max = self.q_table[next_states, next_has_key].max(axis=1)
+        td_targets = rewards + self.gamma * next_max * ~dones
+
+        # Update Q values
+        flat_indices = np.ravel_multi_index((states, current_has_key, actions), self.q_table.shape)
+        td_errors = sequential_update(self.q_table.reshape(-1), flat_indices,
+                                      np.full(len(flat_indices), self.lr), td_targets)
 
         self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
-        return td_errors
\ No newline at end of file
+        return np.abs(td_errors)
+
+    def _model_errors(self, entries):
+        """TD targets and |TD errors| of model entries against the current Q-table"""
+        q_rows = self.q_table.reshape(-1, self.q_table.shape[-1])
+        model = self.model
+        next_max = q_rows[model.next_rows[entries]].max(axis=1)
+        targets = model.rewards[entries] + self.gamma * next_max * ~model.dones[entries]
+        return targets, np.abs(targets - self.q_table.reshape(-1)[entries])
+
+    def observe(self, states, has_key, actions, rewards, next_states, next_has_key, dones):
+        """
+        Record real transitions in the Dyna model and queue them by TD error
+        (does nothing while planning_steps is 0)
+        Parameters:
+            states, next_states: State ids (scalars or arrays)
+            has_key, next_has_key: Key flags before / after the move
+        """
+        if self.planning_steps <= 0:
+            return
+        if self.model is None:
+            self.model = DynaModel(len(self.state_index) * 2, self.q_table.shape[-1])
+
+        rows = np.atleast_1d(states) * 2 + np.atleast_1d(has_key)
+        next_rows = np.atleast_1d(next_states) * 2 + np.atleast_1d(next_has_key)
+        entries = rows * self.q_table.shape[-1] + np.atleast_1d(actions)
+        self.model.observe(entries, next_rows, rewards, dones)
+        entries = np.unique(entries)
+        _, errors = self._model_errors(entries)
+        self.model.requeue([], entries, np.where(errors > self.planning_threshold, errors, 0.0))
+
+    def plan(self):
+        """
+        Run up to planning_steps prioritized-sweeping backups on the model. Each pass
+        backs up a batch of entries drawn by priority, then re-queues the entries
+        observed to lead into the updated rows by their new TD error.
+        Returns:
+            Number of backups applied
+        """
+        if self.model is None or self.planning_steps <= 0:
+            return 0
+
+        q_values = self.q_table.reshape(-1)
+        num_actions = self.q_table.shape[-1]
+        backups = 0
+        while backups < self.planning_steps:
+            entries = self.model.sample(min(self.planning_batch, self.planning_steps - backups))
+            if len(entries) == 0:
+                break
+            targets, _ = self._model_errors(entries)
+            q_values[entries] += self.lr * (targets - q_values[entries])  # Entries are distinct
+            backups += len(entries)
+
+            predecessors = self.model.predecessors_of(np.unique(entries // num_actions))
+            _, errors = self._model_errors(predecessors)
+            self.model.requeue(entries, predecessors, np.where(errors > self.planning_threshold, errors, 0.0))
+        return backups
+
@@ -0,0 +1,67 @@
+import numpy as np
+
+
+class EarlyStopping:
+    def __init__(self, q_table, check_every=50, patience=3, window=100, min_success_rate=0.9,
+                 max_delta=0.1, max_policy_change=0.15):
+        """
+        Stop training once the Q-table, the greedy policy and the success rate have settled.
+        Every check_every episodes the Q-table is compared with its copy from the previous
+        check. A check passes when the norm of the Q-table change is at most max_delta of the
+        norm of the Q-table, at most max_policy_change of the (state, key flag) pairs changed
+        their greedy action and at least min_success_rate of the last window episodes
+        succeeded. Training stops after patience passing checks in a row.
+        Parameters:
+            q_table: The agent's Q-table (copied as the first reference)
+            check_every: Episodes between checks
+            patience: Consecutive passing checks needed to stop
+            window: Episodes in the rolling success rate (no check passes before that many episodes)
+            min_success_rate: Lowest rolling success rate that passes
+            max_delta: Largest relative Q-table change that passes
+            max_policy_change: Largest fraction of changed greedy actions that passes
+        """
+        self.check_every = check_every
+        self.patience = patience
+        self.min_success_rate = min_success_rate
+        self.max_delta = max_delta
+        self.max_policy_change = max_policy_change
+        self.previous = np.array(q_table)
+        self.successes = np.zeros(window, dtype=bool)  # Ring buffer of the last window episodes
+        self.count = 0
+        self.streak = 0
+        self.stopped_at = None  # Episode after which training converged
+        self.checks = []
+
+    def update(self, episode, q_table, success):
+        """
+        Record a finished episode (numbered from 1) and run the check when one is due
+        Returns:
+            True once training should stop
+        """
+        self.successes[self.count % len(self.successes)] = success
+        self.count += 1
+        if episode % self.check_every:
+            return False
+        return self.check(episode, q_table)
+
+    def check(self, episode, q_table):
+        """Compare q_table with the previous check; returns True once training should stop"""
+        delta = float(np.linalg.norm(q_table - self.previous) / max(np.linalg.norm(q_table), 1e-12))
+        policy_change = float(np.mean(q_table.argmax(axis=-1) != self.previous.argmax(axis=-1)))
+        success_rate = float(self.successes[:self.count].mean())
+        np.copyto(self.previous, q_table)
+
+        passed = (delta <= self.max_delta and policy_change <= self.max_policy_change
+                  and success_rate >= self.min_success_rate and self.count >= len(self.successes))
+        self.streak = self.streak + 1 if passed else 0
+        self.checks.append({'episode': episode, 'delta': delta, 'policy_change': policy_change,
+                            'success_rate': success_rate, 'passed': passed})
+        if self.streak >= self.patience and self.stopped_at is None:
+            self.stopped_at = episode
+        return self.stopped_at is not None
+
+    def report(self, episodes):
+        """Episode training stopped at, episodes saved out of the planned episodes, and every check"""
+        return {'stopped_at': self.stopped_at,
+                'episodes_saved': 0 if self.stopped_at is None else episodes - self.stopped_at,
+                'checks': self.checks}
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+def distances_to(successors, target):
+    """
+    Fewest moves from every node to target (breadth-first over the reversed graph)
+    Parameters:
+        successors: (nodes, actions) table of the node each action leads to
+        target: Node to reach
+    Returns:
+        Distance per node, -1 where target cannot be reached
+    """
+    nodes, actions = successors.shape
+    targets = successors.ravel()
+    predecessors = np.repeat(np.arange(nodes), actions)[np.argsort(targets, kind="stable")]
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(targets, minlength=nodes))])
+
+    distance = np.full(nodes, -1, dtype=np.int64)
+    distance[target] = 0
+    frontier = np.array([target])
+    level = 0
+    while len(frontier):
+        level += 1
+        # Predecessor lists of the whole frontier, gathered as one ragged slice
+        starts, counts = offsets[frontier], offsets[frontier + 1] - offsets[frontier]
+        slots = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        frontier = np.unique(predecessors[slots])
+        frontier = frontier[distance[frontier] < 0]
+        distance[frontier] = level
+    return distance
+
+
+def hitting_times(successor, starts, target):
+    """
+    Moves a deterministic walk needs from each start to target, by pointer doubling.
+    successor[n] is the single node after n, with target absorbing. The table of 2^k-step
+    jumps is built for k up to log2(nodes), then every walk advances by the largest jumps
+    that stay short of target. A walk that has not reached target after as many moves as
+    there are nodes has entered a cycle.
+    Parameters:
+        successor: Next node of every node
+        starts: Start nodes (not target itself)
+        target: Absorbing node to reach
+    Returns:
+        Moves per start, -1 for walks caught in a cycle
+    """
+    jumps = [successor]
+    for _ in range(len(successor).bit_length() - 1):
+        jumps.append(jumps[-1][jumps[-1]])
+
+    current = np.asarray(starts)
+    moves = np.zeros(len(current), dtype=np.int64)
+    for k in range(len(jumps) - 1, -1, -1):
+        ahead = jumps[k][current]
+        short = ahead != target
+        current = np.where(short, ahead, current)
+        moves += short.astype(np.int64) << k
+    return np.where(successor[current] == target, moves + 1, -1)
+
+
+class PolicyEvaluator:
+    def __init__(self, maze, state_index):
+        """
+        Greedy-policy evaluation from every reachable start cell at once. A node is a
+        (state, key flag) pair, node = state_id * 2 + has_key, matching the rows of the
+        flattened Q-table. The maze's transitions are compiled once into a table over
+        nodes (picking up the key on entering its cell, reaching the goal with the key
+        folded into one absorbing node) together with the breadth-first optimum of every
+        start; evaluate() then only has to follow the greedy action of each node.
+        Walks start without the key, as training episodes do.
+        Parameters:
+            maze: Maze the agent is trained on
+            state_index: The agent's state index (rows of its Q-table)
+        """
+        cells = state_index.cells
+        self.goal = 2 * len(cells)  # Absorbing node standing in for goal-with-key
+        next_cells = maze.next_cell[cells]
+        successors = np.empty((len(cells), 2, next_cells.shape[1]), dtype=np.int64)
+        for has_key in (0, 1):
+            next_has_key = has_key | maze.is_key[next_cells]
+            successors[:, has_key] = np.where(maze.is_goal[next_cells] & next_has_key, self.goal,
+                                              state_index.index[next_cells] * 2 + next_has_key)
+        successors = successors.reshape(-1, next_cells.shape[1])
+        self.successors = np.vstack([successors, np.full((1, successors.shape[1]), self.goal)])
+
+        self.optimal = distances_to(self.successors, self.goal)
+        self.starts = np.flatnonzero(self.optimal > 0)
+        self.starts = self.starts[self.starts % 2 == 0]  # Without the key
+        start = np.flatnonzero(self.starts == state_index.index[maze.cell_id(maze.start)] * 2)
+        self.start_slot = int(start[0]) if len(start) else None  # Position of maze.start in starts
+
+    def evaluate(self, q_table):
+        """
+        Roll the greedy policy of q_table out from every start
+        Parameters:
+            q_table: (states, 2, actions) Q-values
+        Returns:
+            dict of starts, success_rate, mean_path_length and mean_optimal_length (over the
+            successful starts), path_ratio (their total greedy / optimal length), loops
+            (starts whose walk cycles forever) and start_path_length (greedy length from the
+            maze's start cell, None if it loops)
+        """
+        greedy = q_table.reshape(-1, q_table.shape[-1]).argmax(axis=1)
+        successor = np.append(self.successors[np.arange(len(greedy)), greedy], self.goal)
+        lengths = hitting_times(successor, self.starts, self.goal)
+        return _summary(lengths, self.optimal[self.starts],
+                        -1 if self.start_slot is None else lengths[self.start_slot])
+
+
+def _summary(lengths, optimal, start_length):
+    """Evaluation summary of greedy path lengths (-1 = loop) against their optimum"""
+    solved = lengths > 0
+    return {
+        'starts': len(lengths),
+        'success_rate': float(solved.mean()) if len(lengths) else 0.0,
+        'mean_path_length': float(lengths[solved].mean()) if solved.any() else None,
+        'mean_optimal_length': float(optimal[solved].mean()) if solved.any() else None,
+        'path_ratio': float(lengths[solved].sum() / optimal[solved].sum()) if solved.any() else None,
+        'loops': int((~solved).sum()),
+        'start_path_length': int(start_length) if start_length > 0 else None,
+    }
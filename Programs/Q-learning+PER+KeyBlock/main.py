@@ -1,16 +1,44 @@
+import argparse
+import json
 import os
+import sys
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import ListedColormap
 from maze import Maze
 from agent import QLearningAgent
 from memory import PrioritizedReplayBuffer
-from rewards import get_reward
+from rewards import REWARD_CONSTANTS, get_reward, get_rewards
+from vec_env import VecMaze
+from state_index import StateIndex
+from metrics import MetricsWriter, summary_path
+from profiling import StageProfiler
+from evaluation import PolicyEvaluator
+from early_stopping import EarlyStopping
+from checkpoint import (check_maze, load_checkpoint, maze_state, restore_training_state, save_checkpoint,
+                        training_state)
 import time
 
+# One metrics record per training episode
+METRICS_FIELDS = [('reward', np.float64), ('steps', np.int32), ('success', np.bool_), ('epsilon', np.float32)]
+
+
+def load_pyplot(show=True):
+    """Import pyplot on first use; with show=False the non-interactive Agg backend is selected
+    so figures can be written to disk on machines without a display. Once pyplot is loaded its
+    backend is kept: saving a figure works under any backend, and switching to Agg would stop
+    later windows from appearing"""
+    import matplotlib
+    if not show and "matplotlib.pyplot" not in sys.modules:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
 
 def animate_path(env, path):
     """Animate the path finding process step by step"""
+    # Plotting imports stay local so headless training never loads matplotlib
+    plt = load_pyplot()
+    from matplotlib.colors import ListedColormap
+
     plt.figure(figsize=(8, 8))
     grid = np.zeros((env.size, env.size))
 
@@ -54,8 +82,36 @@ def animate_path(env, path):
     plt.show()
 
 
-def preview_maze(env):
+def save_path_plot(env, path, filename):
+    """Draw the whole path on the maze in one frame and save it (no window, no pauses)"""
+    plt = load_pyplot(show=False)
+    from matplotlib.colors import ListedColormap
+
+    grid = np.zeros((env.size, env.size))
+    for (x, y) in env.obstacles:
+        grid[x, y] = 1  # Obstacles (black)
+    for (x, y) in path:
+        grid[x, y] = 5  # Path (blue)
+    grid[env.start] = 2  # Start point (green)
+    grid[env.goal] = 3  # Goal (red)
+    grid[env.key_pos] = 4  # Key (gold)
+
+    plt.figure(figsize=(8, 8))
+    plt.imshow(grid.T, cmap=ListedColormap(['white', 'black', 'green', 'red', 'gold', 'blue']),
+               vmin=0, vmax=5)
+    plt.gca().set_xticks(np.arange(-0.5, env.size, 1), minor=True)
+    plt.gca().set_yticks(np.arange(-0.5, env.size, 1), minor=True)
+    plt.grid(which="minor", color="gray", linestyle='-', linewidth=0.5)
+    plt.title(f"Best path: {len(path) - 1} steps")
+    plt.savefig(filename, bbox_inches='tight')
+    plt.close()
+
+
+def preview_maze(env, save_path=None, show=True):
     """Display the initial maze layout in a style consistent with the animation"""
+    plt = load_pyplot(show)
+    from matplotlib.colors import ListedColormap
+
     plt.figure(figsize=(8, 8))
     grid = np.zeros((env.size, env.size))
 
@@ -89,76 +145,252 @@ def preview_maze(env):
     ]
     plt.legend(handles=legend_elements, bbox_to_anchor=(1.05, 1), loc='upper left')
 
-    plt.title("Initial Maze Layout Preview (Close window to start training)")
-    save_path="C:\\Users\\zhang\\Desktop\\Q-learning走迷宫\\save_map"
-    os.chdir(save_path)
-    plt.savefig("map.png", bbox_inches='tight', dpi=300)
-    plt.show()
-
-
-def train():
-    env = Maze(size=10)
-    preview_maze(env)
-    agent = QLearningAgent(env.size, env.size)
-    memory = PrioritizedReplayBuffer(10000)
-
-    best_path = None
-    best_reward = -float('inf')
-    max_steps = 400  # Maximum steps per episode
-    iteration_num = 1000
-
-    # New: Initialize statistics variables
-    episode_rewards = []  # Record total reward per episode
-    success_rates = []  # Record cumulative success rate
-    success_steps = []  # Record steps for successful episodes (0 for failures)
-    success_count = 0  # Success counter
-
-    for episode in range(iteration_num):
-        state = env.reset()
-        done = False
-        current_path = [state]
-        total_reward = 0
-        step_count = 0
-
-        while not done and step_count < max_steps:
-            action = agent.get_action(state, has_key=env.has_key)
-            next_state, done = env.step(action)
-
-            reward = get_reward(state, next_state, done, env, step_count, max_steps)
+    if show:
+        plt.title("Initial Maze Layout Preview (Close window to start training)")
+    else:
+        plt.title("Initial Maze Layout")
+    if save_path is not None:
+        plt.savefig(save_path, bbox_inches='tight', dpi=300)
+    if show:
+        plt.show()
+    else:
+        plt.close()
+
+
+def apply_overrides(obj, params):
+    """Set existing attributes of obj from a {name: value} dict (unknown names are an error)"""
+    for name, value in (params or {}).items():
+        if not hasattr(obj, name):
+            raise ValueError(f"{type(obj).__name__} has no parameter '{name}'")
+        setattr(obj, name, value)
+
+
+def precision(dtype):
+    """Replay buffer dtype arguments for dtype (None keeps the buffer's own defaults)"""
+    return {} if dtype is None else {'reward_dtype': dtype, 'priority_dtype': dtype}
+
+
+def memory_report(agent, memory):
+    """Bytes per component: the agent's tables plus each replay buffer array (prefixed replay.)"""
+    report = dict(agent.memory_usage())
+    report.update({f"replay.{name}": nbytes for name, nbytes in memory.memory_usage().items()})
+    report['total'] = sum(report.values())
+    return report
+
+
+def run_episode(env, agent, memory, max_steps, constants, profiler):
+    """
+    Play one training episode, learning from replay batches of 32 drawn from memory once it
+    holds that many transitions (memory=None learns from each transition as it happens)
+    Returns:
+        (path of states, total reward, steps taken, whether the goal was reached)
+    """
+    state = env.reset()
+    done = False
+    current_path = [state]
+    total_reward = 0
+    step_count = 0
+
+    while not done and step_count < max_steps:
+        t = profiler.clock()
+        has_key = env.has_key
+        action = agent.get_action(state, has_key=has_key)
+        t = profiler.lap('get_action', t)
+        next_state, done = env.step(action)
+        t = profiler.lap('env.step', t)
+
+        reward = get_reward(state, next_state, done, env, step_count, max_steps, constants)
+        t = profiler.lap('get_reward', t)
+        current_path.append(next_state)
+        total_reward += reward
+        step_count += 1
+
+        if memory is None:  # Online update on this transition alone, with its own key flags
+            agent.learn((np.array([agent.state_id(state)]), np.array([action]), np.array([reward]),
+                         np.array([agent.state_id(next_state)]), np.array([done]),
+                         np.array([has_key]), np.array([env.has_key])))
+            t = profiler.lap('agent.learn', t)
+        else:
             memory.add(state, action, reward, next_state, done)
-            current_path.append(next_state)
-            total_reward += reward
-            step_count += 1
-
+            t = profiler.lap('memory.add', t)
             if len(memory) >= 32:
                 indices, batch, weights = memory.sample(32)
+                t = profiler.lap('memory.sample', t)
                 td_errors = agent.learn(batch, env)
+                t = profiler.lap('agent.learn', t)
                 memory.update_priorities(indices, td_errors)
+                t = profiler.lap('update_priorities', t)
+
+        if agent.planning_steps > 0:  # Dyna-Q: remember the transition, then plan on the model
+            agent.observe(agent.state_id(state), has_key, action, reward,
+                          agent.state_id(next_state), env.has_key, done)
+            agent.plan()
+            profiler.lap('planning', t)
+
+        state = next_state
+
+    return current_path, total_reward, step_count, done
+
+
+def train(seed=None, env=None, episodes=1000, max_steps=400, agent_params=None, memory_params=None,
+          reward_constants=None, render=True, output_dir=None, verbose=True, dtype=None,
+          metrics_path=None, checkpoint_dir=None, checkpoint_every=100, resume=False, profile=False,
+          eval_every=None, early_stopping=None):
+    """
+    Parameters:
+        seed: Seeds the maze layout and np.random, making the run reproducible
+        env: Prebuilt Maze to train on instead of generating one
+        episodes: Number of training episodes
+        max_steps: Maximum steps per episode
+        agent_params: QLearningAgent attribute overrides (lr, gamma, epsilon_decay,
+                      planning_steps for Dyna-Q, ...)
+        memory_params: PrioritizedReplayBuffer attribute overrides (alpha, beta, ...)
+        reward_constants: Overrides for rewards.REWARD_CONSTANTS
+        render: Preview the maze and plot/animate results in windows; False never opens one
+        output_dir: Save map.png, best_path.png and training_stats.png here (matplotlib is
+            only imported when render or output_dir is set)
+        verbose: Print progress
+        dtype: Floating type of the Q-table, replay rewards and priorities
+               (default: float64 Q-table, float32 rewards, float64 priorities)
+        metrics_path: Stream per-episode records to this metrics file (see
+                      metrics.MetricsWriter) in constant memory; without it every record is
+                      kept in memory and each checkpoint saves all of them again
+        checkpoint_dir: Save the full training state here every checkpoint_every episodes and
+                        after the last one (see checkpoint.save_checkpoint)
+        checkpoint_every: Episodes between checkpoints
+        resume: Continue from the checkpoint in checkpoint_dir, if there is one; the other
+                arguments must match the interrupted run, which is then reproduced exactly
+        profile: Time each stage of the training step (see profiling.StageProfiler)
+        eval_every: Evaluate the greedy policy from every start cell every eval_every episodes
+                    (see evaluation.PolicyEvaluator)
+        early_stopping: Stop before `episodes` once training has converged; dict of
+                        EarlyStopping arguments ({} for the defaults), None trains every episode
+    Returns:
+        dict with the agent, best path, per-episode rewards / successes / steps (memory-mapped
+        from metrics_path when given), wall time, memory_bytes (see memory_report), the
+        StageProfiler as profile, the greedy-policy evaluations (dicts with their episode) and
+        early_stopping (see EarlyStopping.report; None without early stopping)
+    """
+    start_time = time.perf_counter()
+    if seed is not None:
+        np.random.seed(seed)
+    if env is None:
+        env = Maze(size=10, seed=seed)  # Same seed, same layout
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    if render or output_dir is not None:
+        preview_maze(env, save_path=output_dir and os.path.join(output_dir, "map.png"), show=render)
+    state_index = StateIndex.from_mazes(env)  # Q-table and visit counts cover reachable cells only
+    agent = QLearningAgent(env.size, env.size, state_index=state_index,
+                           dtype=np.float64 if dtype is None else dtype)
+    apply_overrides(agent, agent_params)
+    memory = PrioritizedReplayBuffer(10000, state_shape=(env.size, env.size), state_index=state_index,
+                                     **precision(dtype))
+    apply_overrides(memory, memory_params)
+    constants = {**REWARD_CONSTANTS, **(reward_constants or {})}
 
-            state = next_state
-
-        # New: Record statistics
-        episode_rewards.append(total_reward)
-        if done:
-            success_count += 1
-            success_steps.append(step_count)
-        else:
-            success_steps.append(0)  # Failed episodes marked as 0
-        success_rates.append(success_count / (episode + 1) * 100)  # Calculate cumulative success rate
+    best_path = None
+    best_reward = -float('inf')
+    iteration_num = episodes
+
+    metrics = MetricsWriter(metrics_path, METRICS_FIELDS)  # Per-episode statistics
+    first_record = metrics.count  # Records already in an existing metrics file
+    profiler = StageProfiler(profile)
+    evaluator = PolicyEvaluator(env, state_index) if eval_every else None
+    evaluations = []
+    stopping = None if early_stopping is None else EarlyStopping(agent.q_table, **early_stopping)
+    first_episode = 0
+    if resume and checkpoint_dir is not None and os.path.exists(os.path.join(checkpoint_dir, "checkpoint.json")):
+        state = load_checkpoint(checkpoint_dir)
+        check_maze(state, env)
+        restore_training_state(state, agent, memory, stopping)
+        first_episode, best_reward = state['episode'], state['best_reward']
+        best_path = list(map(tuple, state['best_path'].tolist())) if 'best_path' in state else None
+        evaluations = list(state.get('evaluations', []))
+        first_record = state['metrics.first_record']
+        metrics.rewind(first_record + first_episode, state.get('metrics.records'))
+        if verbose:
+            print(f"Resuming from episode {first_episode}")
+
+    for episode in range(first_episode, iteration_num):
+        if stopping is not None and stopping.stopped_at is not None:
+            break  # Converged (possibly before a resume)
+        current_path, total_reward, step_count, done = run_episode(env, agent, memory, max_steps, constants,
+                                                                   profiler)
+
+        t = profiler.clock()
+        metrics.write(reward=total_reward, steps=step_count, success=done, epsilon=agent.epsilon)
+        profiler.lap('metrics', t)
 
         Is = (total_reward > best_reward)
         if Is and done:
             best_reward = total_reward
             best_path = current_path
-            print(f"Episode {episode}: Best path! Steps: {len(best_path) - 1}, Reward: {best_reward:.1f}")
+            if verbose:
+                print(f"Episode {episode}: Best path! Steps: {len(best_path) - 1}, Reward: {best_reward:.1f}")
 
-        if episode % 100 == 0:
+        if verbose and episode % 100 == 0:
             print(f"Episode {episode}")
 
-    # Visualize after training
-    animate_path(env, best_path)
+        if evaluator is not None and (episode + 1) % eval_every == 0:
+            t = profiler.clock()
+            evaluations.append({'episode': episode + 1, **evaluator.evaluate(agent.q_table)})
+            profiler.lap('evaluate', t)
+            if verbose:
+                print(f"Episode {episode + 1}: greedy policy solves {evaluations[-1]['success_rate']:.1%} "
+                      f"of starts, {evaluations[-1]['loops']} stuck in loops")
+
+        converged = stopping is not None and stopping.update(episode + 1, agent.q_table, done)
+        if verbose and converged:
+            print(f"Converged after {episode + 1} episodes")
+
+        if checkpoint_dir is not None and ((episode + 1) % checkpoint_every == 0 or episode + 1 == iteration_num
+                                           or converged):
+            state = {**training_state(agent, memory, stopping), **maze_state(env), 'episode': episode + 1,
+                     'best_reward': best_reward, 'metrics.first_record': first_record,
+                     'evaluations': evaluations}
+            if best_path is not None:
+                state['best_path'] = np.array(best_path)
+            if metrics_path is None:
+                state['metrics.records'] = metrics.records()
+            else:
+                metrics.flush()
+            save_checkpoint(checkpoint_dir, state)
+
+    metrics.close()
+    records = metrics.records()[first_record:]
+    if output_dir is not None or render:
+        success_steps = np.where(records['success'], records['steps'], 0)  # Failed episodes marked as 0
+        success_rates = np.cumsum(records['success']) / np.arange(1, len(records) + 1) * 100
+    if render:
+        # Visualize after training (before the files, so pyplot loads an interactive backend)
+        if best_path is not None:
+            animate_path(env, best_path)
+        plot_training_stats(records['reward'], success_rates, success_steps)
+    if output_dir is not None:
+        if best_path is not None:
+            save_path_plot(env, best_path, os.path.join(output_dir, "best_path.png"))
+        plot_training_stats(records['reward'], success_rates, success_steps,
+                            save_path=os.path.join(output_dir, "training_stats.png"), show=False)
+
+    return {
+        'agent': agent,
+        'best_path': best_path,
+        'episode_rewards': records['reward'],
+        'successes': records['success'],
+        'episode_steps': records['steps'],
+        'wall_time': time.perf_counter() - start_time,
+        'memory_bytes': memory_report(agent, memory),
+        'profile': profiler,
+        'evaluations': evaluations,
+        'early_stopping': None if stopping is None else stopping.report(episodes),
+    }
+
+
+def plot_training_stats(episode_rewards, success_rates, success_steps, save_path=None, show=True):
+    """Plot final training statistics"""
+    plt = load_pyplot(show)
 
-    # New: Plot final training statistics
     plt.figure(figsize=(15, 5))
 
     # Subplot 1: Smoothed rewards per episode
@@ -196,8 +428,199 @@ def train():
         plt.grid(True, linestyle='--', alpha=0.5)
 
     plt.tight_layout()
-    plt.show()
+    if save_path is not None:
+        plt.savefig(save_path)
+    if show:
+        plt.show()
+    else:
+        plt.close()
+
+
+def train_vectorized(num_envs=64, total_steps=200000, seed=None, mazes=None, batch_size=256, max_steps=400,
+                     dtype=None, agent_params=None, profile=False):
+    """
+    Headless training on num_envs episodes stepped together (no preview or plots).
+    Every vectorised step adds num_envs transitions and runs one replay update (plus
+    agent.planning_steps model backups when Dyna-Q is enabled through agent_params).
+    profile=True times each stage of the step (see profiling.StageProfiler).
+    Returns a dict with the agent, per-episode success/length arrays and the StageProfiler.
+    """
+    if mazes is None:
+        mazes = [Maze(size=10, seed=seed)]
+    env = VecMaze(mazes, num_envs, max_steps=max_steps)
+    state_index = StateIndex.from_mazes(mazes)
+    agent = QLearningAgent(env.size, env.size, state_index=state_index,
+                           dtype=np.float64 if dtype is None else dtype)
+    apply_overrides(agent, agent_params)
+    memory = PrioritizedReplayBuffer(max(10000, 4 * num_envs), state_shape=(env.size, env.size),
+                                     state_index=state_index, **precision(dtype))
+
+    successes, lengths = [], []
+    profiler = StageProfiler(profile)
+    cells, has_key = env.reset()
+    for _ in range(total_steps // num_envs):
+        t = profiler.clock()
+        actions = agent.get_actions(cells, has_key)
+        t = profiler.lap('get_actions', t)
+        next_cells, next_has_key, dones, truncated, steps = env.step(actions)
+        t = profiler.lap('env.step', t)
+        rewards = get_rewards(cells, next_cells, dones, next_has_key, steps - 1, env, max_steps)
+        t = profiler.lap('get_rewards', t)
+        memory.add_batch(cells, actions, rewards, next_cells, dones, has_key, next_has_key)
+        t = profiler.lap('memory.add_batch', t)
+
+        if len(memory) >= batch_size:
+            indices, batch, weights = memory.sample(batch_size)
+            t = profiler.lap('memory.sample', t)
+            td_errors = agent.learn(batch)
+            t = profiler.lap('agent.learn', t)
+            memory.update_priorities(indices, td_errors)
+            t = profiler.lap('update_priorities', t)
+
+        if agent.planning_steps > 0:
+            agent.observe(agent.state_index.state_ids(cells), has_key, actions, rewards,
+                          agent.state_index.state_ids(next_cells), next_has_key, dones)
+            agent.plan()
+            profiler.lap('planning', t)
+
+        finished = dones | truncated
+        successes.append(dones[finished])
+        lengths.append(steps[finished])
+        cells, has_key = env.cells, env.has_key
+
+    return {
+        'agent': agent,
+        'successes': np.concatenate(successes),
+        'episode_steps': np.concatenate(lengths),
+        'memory_bytes': memory_report(agent, memory),
+        'profile': profiler,
+    }
+
+
+def summarize(result):
+    """Success rate, mean steps of successful episodes and wall time of a train() result"""
+    successes = result['successes']
+    steps = result['episode_steps'][successes]
+    return {
+        'episodes': len(successes),
+        'success_rate': float(successes.mean()) if len(successes) else 0.0,
+        'mean_steps_to_goal': float(steps.mean()) if len(steps) else None,
+        'best_path_steps': None if result['best_path'] is None else len(result['best_path']) - 1,
+        'wall_time': result['wall_time'],
+        'memory_bytes': result['memory_bytes'],
+        'greedy_policy': result['evaluations'][-1] if result.get('evaluations') else None,
+        'episodes_saved': result['early_stopping']['episodes_saved'] if result.get('early_stopping') else 0,
+    }
+
+
+def metrics_path(args):
+    """
+    --metrics, or metrics.bin under --output-dir so runs that write files keep flat memory
+    (a fresh run replaces it, --resume continues it); None keeps the records in memory
+    """
+    if args.metrics is not None or args.output_dir is None:
+        return args.metrics
+    path = os.path.join(args.output_dir, "metrics.bin")
+    if args.resume:
+        return path if os.path.exists(path) else None  # Continue in the interrupted run's mode
+    for stale in (path, summary_path(path)):
+        if os.path.exists(stale):
+            os.remove(stale)
+    os.makedirs(args.output_dir, exist_ok=True)
+    return path
+
+
+def early_stopping_params(args):
+    """EarlyStopping arguments from the --early-stop / --stop-* options (None when disabled)"""
+    if not args.early_stop:
+        return None
+    return {'check_every': args.stop_check_every, 'patience': args.stop_patience,
+            'min_success_rate': args.stop_min_success, 'max_delta': args.stop_max_delta,
+            'max_policy_change': args.stop_max_policy_change}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the PER Q-learning agent on a random key-and-door maze")
+    parser.add_argument("--size", type=int, default=10, help="maze side length")
+    parser.add_argument("--seed", type=int, default=None, help="maze layout and training seed")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--max-steps", type=int, default=400, help="step limit per episode")
+    parser.add_argument("--planning-steps", type=int, default=0,
+                        help="Dyna-Q / prioritized sweeping backups per real step (0 = off)")
+    parser.add_argument("--dtype", choices=["float64", "float32", "float16"], default=None,
+                        help="Q-table, replay reward and priority precision")
+    parser.add_argument("--output-dir", default=None,
+                        help="write summary.json, map.png, best_path.png and training_stats.png here")
+    parser.add_argument("--render", action="store_true",
+                        help="preview the maze and show the animation and plots in windows")
+    parser.add_argument("--quiet", action="store_true", help="no progress output")
+    parser.add_argument("--metrics", default=None,
+                        help="stream per-episode metrics to this file (appended to if it exists; default "
+                             "metrics.bin in --output-dir, without either every record is kept in memory)")
+    parser.add_argument("--checkpoint-dir", default=None, help="save training checkpoints here")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="episodes between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue from the checkpoint in --checkpoint-dir")
+    parser.add_argument("--profile", action="store_true", help="print a per-stage timing breakdown")
+    parser.add_argument("--profile-json", default=None, help="write the per-stage timings to this JSON file")
+    parser.add_argument("--eval-every", type=int, default=None,
+                        help="evaluate the greedy policy from every start cell every N episodes")
+    parser.add_argument("--early-stop", action="store_true",
+                        help="stop once Q-values, greedy policy and success rate have converged")
+    parser.add_argument("--stop-check-every", type=int, default=50, help="episodes between convergence checks")
+    parser.add_argument("--stop-patience", type=int, default=3, help="passing checks in a row needed to stop")
+    parser.add_argument("--stop-min-success", type=float, default=0.9,
+                        help="lowest rolling success rate that counts as converged")
+    parser.add_argument("--stop-max-delta", type=float, default=0.1,
+                        help="largest Q-table change between checks, relative to the Q-table's norm")
+    parser.add_argument("--stop-max-policy-change", type=float, default=0.15,
+                        help="largest fraction of states whose greedy action may change between checks")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="learner processes sharing one Q-table (see parallel.train_parallel)")
+    parser.add_argument("--lock-stripes", type=int, default=0,
+                        help="locks striped over the shared Q-table rows (0 = lock-free Hogwild updates)")
+    parser.add_argument("--no-replay", action="store_true",
+                        help="with --workers, learn online from each transition instead of per-worker replay")
+    parser.add_argument("--target-success", type=float, default=None,
+                        help="with --workers, stop once the greedy policy solves this fraction of start cells")
+    parser.add_argument("--eval-interval", type=float, default=1.0,
+                        help="with --workers, seconds between evaluations of the shared greedy policy")
+    args = parser.parse_args(argv)
+    if args.workers > 1 and (args.metrics or args.checkpoint_dir or args.resume or args.render or args.profile
+                             or args.profile_json or args.early_stop or args.eval_every):
+        parser.error("--workers does not support --metrics, --checkpoint-dir, --resume, --render, --profile, "
+                     "--eval-every or --early-stop")
+
+    env = Maze(size=args.size, seed=args.seed)
+    if args.workers > 1:
+        from parallel import train_parallel  # parallel imports this module
+        result = train_parallel(workers=args.workers, seed=args.seed, env=env, episodes=args.episodes,
+                                max_steps=args.max_steps, agent_params={'planning_steps': args.planning_steps},
+                                replay=not args.no_replay, lock_stripes=args.lock_stripes, dtype=args.dtype,
+                                eval_interval=args.eval_interval, target_success_rate=args.target_success,
+                                verbose=not args.quiet)
+    else:
+        result = train(seed=args.seed, env=env, episodes=args.episodes, max_steps=args.max_steps,
+                       agent_params={'planning_steps': args.planning_steps},
+                       render=args.render, output_dir=args.output_dir, verbose=not args.quiet,
+                       dtype=args.dtype, metrics_path=metrics_path(args), checkpoint_dir=args.checkpoint_dir,
+                       checkpoint_every=args.checkpoint_every, resume=args.resume,
+                       profile=args.profile or args.profile_json is not None, eval_every=args.eval_every,
+                       early_stopping=early_stopping_params(args))
+
+    summary = summarize(result)
+    if args.workers > 1:
+        summary['time_to_converge'] = result['time_to_converge']
+    print(json.dumps(summary))
+    if args.profile:
+        print(result['profile'].report())
+    if args.profile_json is not None:
+        result['profile'].dump(args.profile_json)
+    if args.output_dir is not None:
+        os.makedirs(args.output_dir, exist_ok=True)
+        with open(os.path.join(args.output_dir, "summary.json"), "w") as f:
+            json.dump({'args': vars(args), **summary}, f, indent=2)
+    return result
 
 
 if __name__ == "__main__":
-    train()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -3,8 +3,17 @@ from collections import deque
 
 
 class Maze:
-    def __init__(self, size=10):
+    def __init__(self, size=10, seed=None, layout=None):
+        """
+        Parameters:
+            size: Side length of the square maze
+            seed: Seed for a private generator, so the same seed always gives the same layout
+                  (None uses the global np.random state)
+            layout: Optional (obstacles, key_pos) to rebuild a stored maze without generating
+        """
         self.size = size
+        self.seed = seed
+        self._rng = np.random.RandomState(seed) if seed is not None else np.random
         self.start = (0, 0)
         self.goal = (size - 1, size - 1)
 
@@ -15,64 +24,65 @@ class Maze:
         self.key_pos = None
         self.has_key = False
         self.obstacles = set()
-        self._generate_valid_maze()
+        self._distance_fields = {}  # Cached BFS distance grids {target: np.ndarray}, built on first use
+        if layout is None:
+            self._generate_valid_maze()
+        else:
+            obstacles, key_pos = layout
+            self.obstacles = set(map(tuple, obstacles))
+            self.key_pos = tuple(key_pos)
+        self.compile_transitions()
 
     def _generate_valid_maze(self):
         """Generate a valid maze with uniformly distributed obstacles"""
-        # Initialize empty maze
-        grid = np.zeros((self.size, self.size), dtype=bool)
-
         # Ensure key position is at least 3 cells away from goal
-        all_positions = [(i, j) for i in range(self.size)
-                         for j in range(self.size)
-                         if (i, j) not in [self.start, self.goal]]
-
-        valid_key_pos = [pos for pos in all_positions
-                         if abs(pos[0] - self.goal[0]) + abs(pos[1] - self.goal[1]) >= 3]
-        self.key_pos = valid_key_pos[np.random.choice(len(valid_key_pos))]
+        xs, ys = np.indices((self.size, self.size))
+        candidates = (abs(xs - self.goal[0]) + abs(ys - self.goal[1]) >= 3)
+        candidates[self.start] = False
+        valid_key_pos = np.flatnonzero(candidates)
+        key_x, key_y = np.unravel_index(valid_key_pos[self._rng.choice(len(valid_key_pos))], candidates.shape)
+        self.key_pos = (int(key_x), int(key_y))
 
         # Obstacle generation parameters
         target_obstacles = int(self.size ** 2 * 0.2)  # 20% obstacles
-        max_attempts = 1000
-        attempts = 0
-
-        while len(self.obstacles) < target_obstacles and attempts < max_attempts:
-            attempts += 1
-
-            # Prefer generating obstacles on the right side (balanced distribution)
-            if np.random.random() < 0.7 and self.size > 5:  # 70% probability on right side
-                x = np.random.randint(self.size // 2, self.size)
-                y = np.random.randint(self.size)
-            else:
-                x, y = np.random.randint(self.size), np.random.randint(self.size)
-
-            pos = (x, y)
-
-            # Skip critical positions
-            if pos in [self.start, self.goal, self.key_pos]:
-                continue
 
-            temp_obs = self.obstacles | {pos}
-
-            # Check path validity
-            if self._path_exists(self.start, self.key_pos, temp_obs) and \
-                    self._path_exists(self.key_pos, self.goal, temp_obs):
-                self.obstacles = temp_obs
-
-        # Fallback if not enough obstacles generated
-        if len(self.obstacles) < target_obstacles * 0.8:
-            print("Warning: Using fallback obstacle generation")
-            self._fallback_obstacle_generation()
-
-    def _fallback_obstacle_generation(self):
-        """Fallback obstacle generation method"""
-        # Generate random obstacles that don't block paths
-        free_positions = [(i, j) for i in range(self.size)
-                          for j in range(self.size)
-                          if (i, j) not in [self.start, self.goal, self.key_pos] + list(self.obstacles)]
-
-        need = int(self.size ** 2 * 0.2) - len(self.obstacles)
-        self.obstacles.update(set(free_positions[:need]))
+        # Reserve a random start -> key -> goal route so both legs stay reachable by construction
+        reserved = np.zeros((self.size, self.size), dtype=bool)
+        route = self._random_route([self.start, self.key_pos, self.goal])
+        reserved[route[:, 0], route[:, 1]] = True
+
+        # Prefer generating obstacles on the right side (balanced distribution):
+        # 70% of the draw mass on the right half, the rest spread over the whole grid
+        if self.size > 5:
+            weights = np.full((self.size, self.size), 0.3 / self.size ** 2)
+            weights[self.size // 2:, :] += 0.7 / ((self.size - self.size // 2) * self.size)
+        else:
+            weights = np.ones((self.size, self.size))
+
+        free_cells = np.flatnonzero(~reserved)
+        probs = weights.ravel()[free_cells]
+        chosen = self._rng.choice(free_cells, min(target_obstacles, len(free_cells)),
+                                  replace=False, p=probs / probs.sum())
+        obs_x, obs_y = np.unravel_index(chosen, reserved.shape)
+        self.obstacles = set(zip(obs_x.tolist(), obs_y.tolist()))
+
+    def _random_route(self, stops):
+        """Random connected cell path visiting stops in order, with a random detour on each leg"""
+        points = [stops[0]]
+        for stop in stops[1:]:
+            if self.size >= 4:
+                points.append((self._rng.randint(self.size), self._rng.randint(self.size)))
+            points.append(stop)
+
+        segments = [np.array([points[0]])]
+        for (x0, y0), (x1, y1) in zip(points[:-1], points[1:]):
+            # Staircase between two points: the x and y moves in random order
+            dx, dy = abs(x1 - x0), abs(y1 - y0)
+            x_moves = self._rng.permutation(np.arange(dx + dy) < dx)
+            xs = x0 + np.sign(x1 - x0) * np.cumsum(x_moves)
+            ys = y0 + np.sign(y1 - y0) * np.cumsum(~x_moves)
+            segments.append(np.column_stack((xs, ys)))
+        return np.concatenate(segments).astype(int)
 
     def _path_exists(self, start, end, obstacles):
         """BFS to check if path exists"""
@@ -96,29 +106,85 @@ class Maze:
                     queue.append((nx, ny))
         return False
 
+    def cell_id(self, pos):
+        """Flat id of an (x, y) cell, matching the replay buffer's state ids"""
+        return pos[0] * self.size + pos[1]
+
+    def compile_transitions(self):
+        """Build the next-cell table and cell flags (call again after changing obstacles)"""
+        blocked = np.zeros((self.size, self.size), dtype=bool)
+        if self.obstacles:
+            blocked[tuple(np.array(list(self.obstacles)).T)] = True
+
+        # next_cell[cell, action]: cell reached from cell by action (the same cell if blocked)
+        xs, ys = np.indices((self.size, self.size))
+        self.next_cell = np.empty((self.size ** 2, len(self.action_effects)), dtype=np.int32)
+        for action, (dx, dy) in enumerate(self.action_effects):
+            nx, ny = np.clip(xs + dx, 0, self.size - 1), np.clip(ys + dy, 0, self.size - 1)
+            # Off-grid moves were clipped back onto the current cell; walls also keep it there
+            moved = ((nx != xs) | (ny != ys)) & ~blocked[nx, ny]
+            self.next_cell[:, action] = np.where(moved, nx * self.size + ny, xs * self.size + ys).ravel()
+
+        self._goal_cell = self.cell_id(self.goal)
+        self._key_cell = self.cell_id(self.key_pos)
+        self.is_goal = np.zeros(self.size ** 2, dtype=bool)
+        self.is_goal[self._goal_cell] = True
+        self.is_key = np.zeros(self.size ** 2, dtype=bool)
+        self.is_key[self._key_cell] = True
+        self._reachable_cells = None  # Flood-filled on first use (see reachable_cells)
+
+    @property
+    def reachable_cells(self):
+        """Sorted ids of the cells reachable from start, computed on first access and cached
+        until the next compile_transitions (generation itself never needs them)"""
+        if self._reachable_cells is None:
+            self._reachable_cells = self._flood_fill()
+        return self._reachable_cells
+
+    def _flood_fill(self):
+        """Sorted ids of the cells reachable from start (one breadth-first sweep over next_cell)"""
+        reached = np.zeros(self.size ** 2, dtype=bool)
+        frontier = np.array([self.cell_id(self.start)])
+        reached[frontier] = True
+        while len(frontier):
+            neighbours = self.next_cell[frontier].ravel()
+            frontier = np.unique(neighbours[~reached[neighbours]])
+            reached[frontier] = True
+        return np.flatnonzero(reached).astype(np.int32)
+
     def reset(self):
         self.has_key = False
         self.state = self.start
+        self._cell = self.cell_id(self.start)
         return self.state
 
     def step(self, action):
-        x, y = self.state
-        dx, dy = self.action_effects[action]
-        new_x, new_y = x + dx, y + dy
-
-        # Movement validity check
-        if (0 <= new_x < self.size and 0 <= new_y < self.size and
-                (new_x, new_y) not in self.obstacles):
-            self.state = (new_x, new_y)
+        # Movement (walls and borders are already folded into the table)
+        self._cell = self.next_cell.item(self._cell, action)
+        self.state = divmod(self._cell, self.size)
 
-            # Check if key is obtained
-            if self.state == self.key_pos:
-                self.has_key = True
+        # Check if key is obtained
+        if self._cell == self._key_cell:
+            self.has_key = True
 
         # Goal check (must have key to pass)
-        done = (self.state == self.goal) and self.has_key
+        done = (self._cell == self._goal_cell) and self.has_key
         return self.state, done
 
+    def step_many(self, cells, has_key, actions):
+        """
+        Advance many agents at once (does not touch this maze's own state)
+        Parameters:
+            cells: Array of current cell ids
+            has_key: Boolean array, whether each agent holds the key
+            actions: Array of action indices
+        Returns:
+            (next cell ids, updated has_key flags, done flags)
+        """
+        next_cells = self.next_cell[cells, actions]
+        has_key = has_key | self.is_key[next_cells]
+        return next_cells, has_key, self.is_goal[next_cells] & has_key
+
     def bfs_distance(self, start, end, include_key=False):
         """Calculate shortest path distance between two points (considering obstacles)"""
         if start == end:
@@ -152,6 +218,47 @@ class Maze:
 
         return float('inf')  # Unreachable
 
+    def _distance_field(self, target):
+        """BFS outward from target over the grid, returning a (size, size) distance array"""
+        dist = np.full((self.size, self.size), np.inf)
+        dist[target] = 0
+        queue = deque([target])
+
+        while queue:
+            x, y = queue.popleft()
+
+            # Shaping paths may not pass through the key cell (same rule as bfs_distance)
+            if (x, y) == self.key_pos and (x, y) != target:
+                continue
+
+            for dx, dy in self.action_effects:
+                nx, ny = x + dx, y + dy
+                if (0 <= nx < self.size and 0 <= ny < self.size and
+                        (nx, ny) not in self.obstacles and dist[nx, ny] == np.inf):
+                    dist[nx, ny] = dist[x, y] + 1
+                    queue.append((nx, ny))
+
+        # The key cell itself never expands, so only the key target can reach it
+        if self.key_pos != target:
+            dist[self.key_pos] = np.inf
+        return dist
+
+    def refresh_distance_fields(self):
+        """Recompute the cached key/goal distance fields (call after changing obstacles)"""
+        self._distance_fields = {}
+        self.distance_field(self.key_pos)
+        self.distance_field(self.goal)
+
+    def cache_distance_field(self, target, field):
+        """Install a precomputed distance field (e.g. loaded from a maze corpus)"""
+        self._distance_fields[target] = field
+
+    def distance_field(self, target):
+        """Get the cached distance field towards target (key or goal)"""
+        if target not in self._distance_fields:
+            self._distance_fields[target] = self._distance_field(target)
+        return self._distance_fields[target]
+
     def get_key_state(self, pos):
         """Get key state for specified position"""
         x, y = pos
@@ -0,0 +1,131 @@
+import os
+import numpy as np
+from maze import Maze
+
+# File layout (little endian):
+#   16-byte header: magic b"MAZC", format version (u2), maze size (u2), record count (u4), 4 pad bytes
+#   record count fixed-size records, see record_dtype
+CORPUS_MAGIC = b"MAZC"
+CORPUS_VERSION = 1
+HEADER_DTYPE = np.dtype([('magic', 'S4'), ('version', '<u2'), ('size', '<u2'),
+                         ('count', '<u4'), ('pad', 'V4')])
+UNREACHABLE = -1  # Stored in place of inf in the distance fields
+
+
+def record_dtype(size):
+    """One maze: seed, start/goal/key positions, bit-packed obstacle grid and both distance fields"""
+    return np.dtype([
+        ('seed', '<i8'),  # -1 for mazes built without a seed
+        ('start', '<i2', (2,)),
+        ('goal', '<i2', (2,)),
+        ('key', '<i2', (2,)),
+        ('obstacles', 'u1', ((size * size + 7) // 8,)),
+        ('key_distance', '<i4', (size, size)),
+        ('goal_distance', '<i4', (size, size)),
+    ])
+
+
+def encode_maze(maze):
+    """Pack a maze (and its key/goal distance fields) into one corpus record"""
+    record = np.zeros((), dtype=record_dtype(maze.size))
+    record['seed'] = -1 if maze.seed is None else maze.seed
+    record['start'] = maze.start
+    record['goal'] = maze.goal
+    record['key'] = maze.key_pos
+
+    grid = np.zeros((maze.size, maze.size), dtype=bool)
+    if maze.obstacles:
+        grid[tuple(np.array(list(maze.obstacles)).T)] = True
+    record['obstacles'] = np.packbits(grid.ravel())
+
+    for field, target in (('key_distance', maze.key_pos), ('goal_distance', maze.goal)):
+        distance = maze.distance_field(target)
+        record[field] = np.where(np.isinf(distance), UNREACHABLE, distance)
+    return record
+
+
+def decode_maze(record, size):
+    """Rebuild a Maze from a corpus record without regenerating it or rerunning BFS"""
+    grid = np.unpackbits(record['obstacles'], count=size * size).reshape(size, size).astype(bool)
+    seed = int(record['seed'])
+    maze = Maze(size=size, seed=None if seed < 0 else seed,
+                layout=(zip(*np.nonzero(grid)), record['key'].tolist()))
+
+    for field, target in (('key_distance', maze.key_pos), ('goal_distance', maze.goal)):
+        distance = np.asarray(record[field], dtype=np.float64)
+        distance[distance == UNREACHABLE] = np.inf
+        maze.cache_distance_field(target, distance)
+    return maze
+
+
+def write_corpus(path, mazes):
+    """Write equally sized mazes to path in the corpus format"""
+    mazes = list(mazes)
+    size = mazes[0].size
+    if any(maze.size != size for maze in mazes):
+        raise ValueError("All mazes in a corpus must have the same size")
+
+    header = np.zeros((), dtype=HEADER_DTYPE)
+    header['magic'] = CORPUS_MAGIC
+    header['version'] = CORPUS_VERSION
+    header['size'] = size
+    header['count'] = len(mazes)
+
+    records = np.stack([encode_maze(maze) for maze in mazes])
+    with open(path, 'wb') as f:
+        f.write(header.tobytes())
+        f.write(records.tobytes())
+
+
+def build_corpus(path, size, seeds):
+    """Generate one maze per seed and save them as a corpus"""
+    write_corpus(path, (Maze(size=size, seed=int(seed)) for seed in seeds))
+    return MazeCorpus(path)
+
+
+def load_or_build_corpus(path, size, seeds):
+    """Open the corpus at path, generating it first if it does not exist yet"""
+    if not os.path.exists(path):
+        return build_corpus(path, size, seeds)
+    corpus = MazeCorpus(path)
+    if corpus.size != size:
+        raise ValueError(f"Corpus {path} holds {corpus.size}x{corpus.size} mazes, not {size}x{size}")
+    return corpus
+
+
+class MazeCorpus:
+    """Read-only, memory-mapped view of a corpus file; mazes are decoded on access"""
+
+    def __init__(self, path):
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header[0]['magic'] != CORPUS_MAGIC:
+            raise ValueError(f"{path} is not a maze corpus")
+        if header[0]['version'] != CORPUS_VERSION:
+            raise ValueError(f"Unsupported maze corpus version {header[0]['version']} in {path}")
+
+        self.path = path
+        self.size = int(header[0]['size'])
+        count = int(header[0]['count'])
+        self.records = np.memmap(path, dtype=record_dtype(self.size), mode='r',
+                                 offset=HEADER_DTYPE.itemsize, shape=(count,))
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return decode_maze(self.records[index], self.size)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    @property
+    def seeds(self):
+        return np.asarray(self.records['seed'])
+
+    def by_seed(self, seed):
+        """Get the maze generated from seed"""
+        matches = np.flatnonzero(self.records['seed'] == seed)
+        if len(matches) == 0:
+            raise KeyError(seed)
+        return self[int(matches[0])]
@@ -0,0 +1,166 @@
+import json
+import os
+import time
+
+import numpy as np
+
+MAGIC = b"METRICS1"
+HEADER_SIZE = 512  # Magic + JSON field list, space padded; records start here
+
+
+class MetricsWriter:
+    def __init__(self, path, fields, buffer_size=1024, flush_seconds=5.0):
+        """
+        Per-episode metrics sink with constant memory.
+        Records are fixed-width rows of a NumPy structured dtype. They are collected
+        in a preallocated buffer and appended to an append-only binary file whenever
+        the buffer fills or flush_seconds have passed, so a killed run loses at most
+        one buffer. Each flush also appends one JSON line (means of the rows just
+        written) to path's summary file, which can be tailed while training runs.
+        Parameters:
+            path: Binary metrics file, appended to if it exists with the same fields;
+                  None keeps every record in memory instead (no files, and memory then
+                  grows with the record count: only file mode is constant-memory)
+            fields: (name, dtype) pairs of one record
+            buffer_size: Records buffered between writes
+            flush_seconds: Longest time a record waits in the buffer
+        """
+        self.path = path
+        self.dtype = np.dtype(fields)
+        self.flush_seconds = flush_seconds
+        self._buffer = np.zeros(buffer_size, dtype=self.dtype)
+        self._pending = 0
+        self._last_flush = time.perf_counter()
+        self._chunks = []  # In-memory mode only
+        self.count = 0  # Records written so far, including any already in the file
+
+        if path is None:
+            self._file = self._summary_file = None
+            return
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE:
+            existing = _read_header(path)
+            if existing != self.dtype:
+                raise ValueError(f"{path} holds records of {existing}, not {self.dtype}")
+            # Drop a torn trailing record left by a killed writer
+            self.count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+            with open(path, "r+b") as f:
+                f.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_header(self.dtype))
+            self._file.flush()
+        self._summary_file = open(summary_path(path), "a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, **values):
+        """Append one record; fields not given are stored as 0"""
+        self._buffer[self._pending] = tuple(values.get(name, 0) for name in self.dtype.names)
+        self._pending += 1
+        self.count += 1
+        if self._pending == len(self._buffer) or time.perf_counter() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """Write out the buffered records and their summary line"""
+        self._last_flush = time.perf_counter()
+        if not self._pending:
+            return
+        chunk = self._buffer[:self._pending]
+        if self._file is None:
+            self._chunks.append(chunk.copy())
+        else:
+            self._file.write(chunk.tobytes())
+            self._file.flush()
+            summary = {'first': self.count - self._pending, 'count': self._pending}
+            summary.update({name: float(chunk[name].mean()) for name in self.dtype.names})
+            self._summary_file.write(json.dumps(summary) + "\n")
+            self._summary_file.flush()
+        self._pending = 0
+
+    def rewind(self, count, records=None):
+        """
+        Drop everything after the first count records (resuming from a checkpoint)
+        Parameters:
+            count: Records to keep
+            records: In-memory mode only: the records to start from
+        """
+        self._pending = 0
+        self.count = count
+        if self._file is None:
+            self._chunks = [np.array(records, dtype=self.dtype)]
+            return
+        self._file.truncate(HEADER_SIZE + count * self.dtype.itemsize)
+        with open(summary_path(self.path)) as f:
+            lines = [line for line in f if sum(json.loads(line)[key] for key in ('first', 'count')) <= count]
+        self._summary_file.seek(0)
+        self._summary_file.truncate()
+        self._summary_file.writelines(lines)
+        self._summary_file.flush()
+
+    def records(self):
+        """All records so far (a read-only memory map of the file in file mode)"""
+        self.flush()
+        if self._file is None:
+            return np.concatenate(self._chunks) if self._chunks else np.zeros(0, dtype=self.dtype)
+        return read_metrics(self.path)
+
+    def close(self):
+        self.flush()
+        for f in (self._file, self._summary_file):
+            if f is not None:
+                f.close()
+
+
+def summary_path(path):
+    """Summary JSONL file written next to a metrics file"""
+    return os.path.splitext(path)[0] + "_summary.jsonl"
+
+
+def _header(dtype):
+    text = json.dumps([[name, dtype[name].str] for name in dtype.names]).encode()
+    if len(MAGIC) + len(text) + 1 > HEADER_SIZE:
+        raise ValueError("Too many metrics fields for the file header")
+    return (MAGIC + text).ljust(HEADER_SIZE - 1) + b"\n"
+
+
+def _read_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if not header.startswith(MAGIC):
+        raise ValueError(f"{path} is not a metrics file")
+    return np.dtype([tuple(field) for field in json.loads(header[len(MAGIC):])])
+
+
+def read_metrics(path):
+    """
+    Memory-map the complete records of a metrics file (safe while it is being written)
+    Returns:
+        Structured array, one row per episode
+    """
+    dtype = _read_header(path)
+    count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def downsample(records, points=1000):
+    """
+    Means of each field over at most `points` equal runs of consecutive records
+    Returns:
+        {field name: array of bucket means}, plus 'episode' (index of each bucket's last record)
+    """
+    bucket = max(1, -(-len(records) // points))
+    starts = np.arange(0, len(records), bucket)
+    ends = np.minimum(starts + bucket, len(records))
+    result = {'episode': ends - 1}
+    for name in records.dtype.names:
+        values = np.asarray(records[name], dtype=np.float64)
+        result[name] = np.add.reduceat(values, starts) / (ends - starts) if len(starts) else values
+    return result
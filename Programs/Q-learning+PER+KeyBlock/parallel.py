@@ -0,0 +1,219 @@
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+import numpy as np
+from maze import Maze
+from agent import QLearningAgent
+from memory import PrioritizedReplayBuffer
+from rewards import REWARD_CONSTANTS
+from state_index import StateIndex
+from evaluation import PolicyEvaluator
+from profiling import StageProfiler
+from metrics import MetricsWriter
+from main import METRICS_FIELDS, apply_overrides, precision, run_episode
+
+
+class SharedQLearningAgent(QLearningAgent):
+    def __init__(self, maze_size_x, maze_size_y, q_table, locks=(), **kwargs):
+        """
+        Q-learning agent whose Q-table is an array shared with other processes. Updates are
+        lock-free (Hogwild) unless locks are given: then the Q-table rows are striped over the
+        locks (row % len(locks)) and learn() holds the stripes of the rows it writes.
+        Parameters:
+            maze_size_x, maze_size_y: Maze dimensions
+            q_table: Shared (states, 2, actions) array the agent reads and updates in place
+            locks: Stripe locks shared by all workers (empty for lock-free updates)
+            kwargs: Other QLearningAgent arguments (state_index, dtype)
+        """
+        super().__init__(maze_size_x, maze_size_y, action_size=q_table.shape[-1], dtype=q_table.dtype, **kwargs)
+        self.q_table = q_table
+        self.locks = locks
+
+    def learn(self, batch, env=None):
+        if not self.locks:
+            return super().learn(batch, env)
+        stripes = np.unique(batch[0] % len(self.locks))  # Acquired in ascending order, so no deadlock
+        for stripe in stripes:
+            self.locks[stripe].acquire()
+        try:
+            return super().learn(batch, env)
+        finally:
+            for stripe in stripes[::-1]:
+                self.locks[stripe].release()
+
+
+def _attach(name, shape, dtype):
+    """Open a shared memory block by name and view it as an array (keep the block to close it)"""
+    block = shared_memory.SharedMemory(name=name)
+    return block, np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+
+def _worker(rank, episodes, seed, layout, q_spec, control_name, locks, params, start_time, results):
+    """Train on a private copy of the maze against the shared Q-table and send back per-episode records"""
+    np.random.seed(None if seed is None else seed + rank)  # Rank 0 replays train(seed)'s random stream
+    size, maze_seed, obstacles, key_pos = layout
+    env = Maze(size=size, seed=maze_seed, layout=(obstacles, key_pos))
+    q_block, q_table = _attach(*q_spec)
+    control_block, control = _attach(control_name, (params['workers'] + 1,), np.int64)
+    state_index = StateIndex.from_mazes(env)
+    agent = SharedQLearningAgent(env.size, env.size, q_table, locks=locks, state_index=state_index)
+    apply_overrides(agent, params['agent_params'])
+    memory = None
+    if params['replay']:
+        memory = PrioritizedReplayBuffer(10000, state_shape=(env.size, env.size), state_index=state_index,
+                                         **precision(params['dtype']))
+        apply_overrides(memory, params['memory_params'])
+    profiler = StageProfiler(False)
+
+    metrics = MetricsWriter(None, METRICS_FIELDS)
+    finished = []  # Seconds since start_time at which each episode ended
+    best_path, best_reward = None, -float('inf')
+    for _ in range(episodes):
+        if control[0]:  # Stop flag raised by the parent once the policy converged
+            break
+        path, total_reward, steps, done = run_episode(env, agent, memory, params['max_steps'],
+                                                      params['constants'], profiler)
+        metrics.write(reward=total_reward, steps=steps, success=done, epsilon=agent.epsilon)
+        finished.append(time.time() - start_time)
+        if done and total_reward > best_reward:
+            best_path, best_reward = path, total_reward
+        control[rank + 1] += 1  # Only this worker writes its counter
+    metrics.close()
+    results.put({'rank': rank, 'records': metrics.records(), 'finished': np.array(finished),
+                 'best_path': best_path, 'best_reward': best_reward,
+                 'replay_bytes': 0 if memory is None else sum(memory.memory_usage().values())})
+
+    del agent, q_table, control  # Views must go before their blocks can be closed
+    q_block.close()
+    control_block.close()
+
+
+def train_parallel(workers=4, seed=None, env=None, episodes=1000, max_steps=400, agent_params=None,
+                   memory_params=None, reward_constants=None, replay=True, lock_stripes=0, dtype=None,
+                   eval_interval=1.0, target_success_rate=None, start_method=None, verbose=True):
+    """
+    Hogwild-style training: `workers` processes each play their share of the episodes on their
+    own copy of the maze (own epsilon schedule and replay buffer) and all update one Q-table
+    in multiprocessing.shared_memory. Meanwhile the parent evaluates the shared greedy policy
+    from every start cell every eval_interval seconds (see evaluation.PolicyEvaluator).
+    With workers=1 and a seed the run reproduces train(seed=seed) exactly.
+    Parameters:
+        workers: Number of learner processes
+        seed: Seeds the maze layout; worker k seeds np.random with seed + k
+        env: Prebuilt Maze to train on instead of generating one
+        episodes: Total training episodes, split evenly over the workers
+        max_steps: Maximum steps per episode
+        agent_params: QLearningAgent attribute overrides for every worker
+        memory_params: PrioritizedReplayBuffer attribute overrides for every worker
+        reward_constants: Overrides for rewards.REWARD_CONSTANTS
+        replay: Give each worker its own prioritized replay buffer (as train() does); False
+                learns online from every transition as it happens
+        lock_stripes: Number of locks striped over the Q-table rows; 0 updates lock-free
+        dtype: Floating type of the Q-table, replay rewards and priorities
+        eval_interval: Seconds between evaluations of the shared greedy policy
+        target_success_rate: Stop all workers once the greedy policy solves this fraction of
+                             the start cells (None trains every episode)
+        start_method: multiprocessing start method (None for the platform default)
+        verbose: Print every evaluation
+    Returns:
+        dict with the agent (holding a copy of the final Q-table), best path, per-episode
+        rewards / successes / steps of all workers in the order they finished, wall time,
+        memory_bytes (replay buffers summed over the workers), the evaluations (dicts with
+        elapsed seconds and episodes done), time_to_converge (elapsed seconds of the first
+        evaluation reaching target_success_rate, None if none did) and episodes per worker
+    """
+    start_time = time.perf_counter()
+    agent_params = agent_params or {}
+    if lock_stripes and agent_params.get('planning_steps', 0) > 0:
+        raise ValueError("Dyna-Q planning writes arbitrary Q-table rows and cannot run with lock_stripes")
+    if env is None:
+        env = Maze(size=10, seed=seed)  # Same seed, same layout
+    state_index = StateIndex.from_mazes(env)
+    agent = QLearningAgent(env.size, env.size, state_index=state_index,
+                           dtype=np.float64 if dtype is None else dtype)
+    apply_overrides(agent, agent_params)
+    evaluator = PolicyEvaluator(env, state_index)
+
+    context = multiprocessing.get_context(start_method)
+    q_block = shared_memory.SharedMemory(create=True, size=agent.q_table.nbytes)
+    control_block = shared_memory.SharedMemory(create=True, size=8 * (workers + 1))
+    q_table = np.ndarray(agent.q_table.shape, dtype=agent.q_table.dtype, buffer=q_block.buf)
+    control = np.ndarray(workers + 1, dtype=np.int64, buffer=control_block.buf)  # Stop flag, episodes per worker
+    q_table[:] = agent.q_table
+    control[:] = 0
+
+    layout = (env.size, env.seed, sorted(env.obstacles), env.key_pos)
+    q_spec = (q_block.name, q_table.shape, q_table.dtype)
+    locks = [context.Lock() for _ in range(lock_stripes)]
+    params = {'workers': workers, 'agent_params': agent_params, 'memory_params': memory_params,
+              'replay': replay, 'dtype': dtype, 'max_steps': max_steps,
+              'constants': {**REWARD_CONSTANTS, **(reward_constants or {})}}
+    results = context.Queue()
+    shares = [episodes // workers + (rank < episodes % workers) for rank in range(workers)]
+    wall_start = time.time()
+    processes = [context.Process(target=_worker, args=(rank, shares[rank], seed, layout, q_spec, control_block.name,
+                                                       locks, params, wall_start, results))
+                 for rank in range(workers)]
+
+    evaluations, finished = [], []
+    time_to_converge = None
+    try:
+        for process in processes:
+            process.start()
+        while len(finished) < workers:
+            try:
+                finished.append(results.get(timeout=eval_interval))
+                continue
+            except queue.Empty:
+                pass
+            crashed = [p.exitcode for p in processes if p.exitcode not in (None, 0)]
+            if crashed:
+                raise RuntimeError(f"A training worker exited with code {crashed[0]}")
+            evaluations.append({'elapsed': time.perf_counter() - start_time, 'episodes': int(control[1:].sum()),
+                                **evaluator.evaluate(q_table.copy())})
+            if verbose:
+                print(f"{evaluations[-1]['elapsed']:.1f}s, {evaluations[-1]['episodes']} episodes: greedy policy "
+                      f"solves {evaluations[-1]['success_rate']:.1%} of starts")
+            if (time_to_converge is None and target_success_rate is not None
+                    and evaluations[-1]['success_rate'] >= target_success_rate):
+                time_to_converge = evaluations[-1]['elapsed']
+                control[0] = 1  # Workers stop after their current episode
+        for process in processes:
+            process.join()
+        agent.q_table = q_table.copy()
+        episodes_done = int(control[1:].sum())
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        del q_table, control
+        for block in (q_block, control_block):
+            block.close()
+            block.unlink()
+
+    evaluations.append({'elapsed': time.perf_counter() - start_time, 'episodes': episodes_done,
+                        **evaluator.evaluate(agent.q_table)})
+    if time_to_converge is None and target_success_rate is not None \
+            and evaluations[-1]['success_rate'] >= target_success_rate:
+        time_to_converge = evaluations[-1]['elapsed']
+
+    finished.sort(key=lambda result: result['rank'])
+    order = np.argsort(np.concatenate([result['finished'] for result in finished]), kind="stable")
+    records = np.concatenate([result['records'] for result in finished])[order]
+    best = max(finished, key=lambda result: result['best_reward'])
+    report = dict(agent.memory_usage())
+    report['replay'] = sum(result['replay_bytes'] for result in finished)
+    report['total'] = sum(report.values())
+    return {
+        'agent': agent,
+        'best_path': best['best_path'],
+        'episode_rewards': records['reward'],
+        'successes': records['success'],
+        'episode_steps': records['steps'],
+        'wall_time': time.perf_counter() - start_time,
+        'memory_bytes': report,
+        'evaluations': evaluations,
+        'time_to_converge': time_to_converge,
+        'worker_episodes': [len(result['records']) for result in finished],
+    }
@@ -0,0 +1,91 @@
+import numpy as np
+from SumTree import SumTree
+
+
+class DynaModel:
+    def __init__(self, num_rows, num_actions, max_predecessors=None):
+        """
+        Tabular model of observed transitions for Dyna-Q / prioritized sweeping.
+        Maze.step is deterministic, so each (Q-table row, action) entry remembers the
+        single next row it leads to and the last reward seen. Rows are (state, key flag)
+        pairs, row = state * 2 + has_key; entries are numbered like the flattened Q-table
+        (row * num_actions + action) and a SumTree over them holds the planning
+        priorities (TD-error magnitudes).
+        Parameters:
+            num_rows: Number of Q-table rows
+            num_actions: Number of actions
+            max_predecessors: Predecessor slots kept per row (default: 4 * num_actions)
+        """
+        num_entries = num_rows * num_actions
+        self.num_actions = num_actions
+        self.next_rows = np.full(num_entries, -1, dtype=np.int32)  # -1 until observed
+        self.rewards = np.zeros(num_entries)
+        self.dones = np.zeros(num_entries, dtype=bool)
+        self.tree = SumTree(num_entries)
+
+        # predecessors[row] lists the entries observed to lead into row
+        self.predecessors = np.full((num_rows, max_predecessors or 4 * num_actions), -1, dtype=np.int64)
+        self.predecessor_counts = np.zeros(num_rows, dtype=np.int64)
+
+    def __len__(self):
+        """Number of distinct transitions observed so far"""
+        return int(np.count_nonzero(self.next_rows >= 0))
+
+    def observe(self, entries, next_rows, rewards, dones):
+        """Record transitions; entries seen for the first time are linked to their next row."""
+        entries, next_rows = np.atleast_1d(entries), np.atleast_1d(next_rows)
+        new = self.next_rows[entries] < 0
+        new_entries, first = np.unique(entries[new], return_index=True)
+        new_next_rows = next_rows[new][first]
+
+        # Several new entries can lead into the same row: fill its slots one pass at a time
+        while len(new_entries):
+            rows, first = np.unique(new_next_rows, return_index=True)
+            slots = self.predecessor_counts[rows]
+            room = slots < self.predecessors.shape[1]  # A full row drops further predecessors
+            self.predecessors[rows[room], slots[room]] = new_entries[first[room]]
+            self.predecessor_counts[rows[room]] += 1
+            new_entries = np.delete(new_entries, first)
+            new_next_rows = np.delete(new_next_rows, first)
+
+        self.next_rows[entries] = next_rows
+        self.rewards[entries] = rewards
+        self.dones[entries] = dones
+
+    def sample(self, batch_size):
+        """
+        Draw up to batch_size distinct entries in proportion to their priority
+        Returns:
+            Sampled entries (pass them to requeue as popped once backed up)
+        """
+        total = self.tree.total()
+        if total <= 0:
+            return np.zeros(0, dtype=np.int64)
+        _, priorities, entries = self.tree.get_batch(np.random.uniform(0, total, batch_size))
+        return np.unique(entries[priorities > 0])
+
+    def predecessors_of(self, rows):
+        """Distinct observed entries leading into any of rows"""
+        entries = self.predecessors[rows].ravel()
+        return np.unique(entries[entries >= 0])
+
+    def requeue(self, popped, entries, priorities):
+        """
+        Clear the priority of the popped entries and raise each of entries to at least
+        its given priority, in a single tree update
+        Parameters:
+            popped: Entries just backed up (their priority becomes 0 unless re-raised)
+            entries: Distinct entries to queue
+            priorities: New priority of each of entries
+        """
+        popped_leaves = np.asarray(popped, dtype=np.int64) + self.tree.leaf_base
+        leaves = np.asarray(entries) + self.tree.leaf_base
+        self.tree.tree[popped_leaves] = 0.0  # Leaf only; the update below refreshes the sums
+        raised = np.maximum(self.tree.tree[leaves], priorities)
+        self.tree.update_batch(np.concatenate([popped_leaves, leaves]),
+                               np.concatenate([np.zeros(len(popped_leaves)), raised]))
+
+    @property
+    def nbytes(self):
+        return (self.next_rows.nbytes + self.rewards.nbytes + self.dones.nbytes + self.tree.tree.nbytes
+                + self.predecessors.nbytes + self.predecessor_counts.nbytes)
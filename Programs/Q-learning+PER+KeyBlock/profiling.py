@@ -0,0 +1,66 @@
+import json
+import time
+
+
+def _no_clock():
+    return 0
+
+
+def _no_lap(stage, started):
+    return 0
+
+
+class StageProfiler:
+    def __init__(self, enabled=True):
+        """
+        Call counts and cumulative perf_counter_ns time per named stage of a loop.
+        Stages are timed back to back: clock() starts the first one and each lap() closes
+        a stage and returns the start of the next, so one clock read separates two stages:
+
+            t = profiler.clock()
+            next_state, done = env.step(action)
+            t = profiler.lap('env.step', t)
+
+        A disabled profiler swaps both methods for functions returning 0, leaving one
+        extra call per stage in the loop.
+        Parameters:
+            enabled: Record timings; False turns clock and lap into no-ops
+        """
+        self.enabled = enabled
+        self.calls = {}
+        self.total_ns = {}
+        if not enabled:
+            self.clock = _no_clock
+            self.lap = _no_lap
+
+    def clock(self):
+        return time.perf_counter_ns()
+
+    def lap(self, stage, started):
+        """Charge the time since started to stage; returns the current clock"""
+        now = time.perf_counter_ns()
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        self.total_ns[stage] = self.total_ns.get(stage, 0) + now - started
+        return now
+
+    def to_dict(self):
+        """{stage: {'calls', 'total_ns', 'mean_ns'}} in order of first use"""
+        return {stage: {'calls': calls, 'total_ns': self.total_ns[stage],
+                        'mean_ns': self.total_ns[stage] / calls}
+                for stage, calls in self.calls.items()}
+
+    def report(self):
+        """Breakdown table, slowest stage first"""
+        total = sum(self.total_ns.values()) or 1
+        lines = [f"{'stage':<20} {'calls':>10} {'total ms':>10} {'mean us':>9} {'share':>7}"]
+        for stage in sorted(self.calls, key=self.total_ns.get, reverse=True):
+            ns = self.total_ns[stage]
+            lines.append(f"{stage:<20} {self.calls[stage]:>10} {ns / 1e6:>10.1f} "
+                         f"{ns / self.calls[stage] / 1e3:>9.2f} {ns / total:>7.1%}")
+        lines.append(f"{'total':<20} {'':>10} {total / 1e6:>10.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Write to_dict() as JSON"""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
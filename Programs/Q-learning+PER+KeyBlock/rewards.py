@@ -1,4 +1,22 @@
-def get_reward(state, next_state, done, maze, step_count, max_steps=50):
+import numpy as np
+
+# Reward constants; pass a modified copy as `constants` to experiment (e.g. from sweep.py)
+REWARD_CONSTANTS = {
+    'stay': -10,  # Staying in the same place
+    'goal': 10.0,  # Success reward
+    'step_bonus': 5,  # Extra success reward, scaled by the fraction of max_steps left
+    'key': 5.0,  # Obtaining the key (first time)
+    'wall': -5.0,  # Hitting a wall
+    'goal_without_key': -3.0,  # Trying to pass the goal without a key
+    'step': -0.1,  # Step penalty
+    'toward_key': 1.8,  # Getting closer to the key
+    'toward_goal': 2,  # Getting closer to the goal (with key)
+    'away': -1.8,  # Moving away from the current target
+    'no_progress': -10,  # Distance to the current target unchanged
+}
+
+
+def get_reward(state, next_state, done, maze, step_count, max_steps=50, constants=REWARD_CONSTANTS):
     """
     Improved reward function:
     - Add step penalty
@@ -7,42 +25,74 @@ def get_reward(state, next_state, done, maze, step_count, max_steps=50):
     """
     # Significantly increase the penalty for staying in the same place
     if state == next_state:
-        return -10
+        return constants['stay']
 
     if done:
         # Success reward + step reward (the earlier the completion, the higher the reward)
-        step_bonus = (1 - step_count / max_steps) * 5
-        return 10.0 + step_bonus
+        step_bonus = (1 - step_count / max_steps) * constants['step_bonus']
+        return constants['goal'] + step_bonus
 
     # Reward for obtaining the key (first time)
     if next_state == maze.key_pos and not maze.has_key:
-        return 5.0
+        return constants['key']
 
     # Penalty for invalid actions
     if next_state in maze.obstacles:
-        return -5.0  # Hitting a wall
+        return constants['wall']  # Hitting a wall
     if next_state == maze.goal and not maze.has_key:
-        return -3.0  # Trying to pass the goal without a key
+        return constants['goal_without_key']  # Trying to pass the goal without a key
 
     # Step penalty (small penalty for each step)
-    step_penalty = -0.1
+    step_penalty = constants['step']
 
     # Directional guidance reward
     if not maze.has_key:
         target = maze.key_pos
-        move_reward = 1.8
+        move_reward = constants['toward_key']
     else:
         target = maze.goal
-        move_reward = 2
+        move_reward = constants['toward_goal']
 
-    # Calculate the change in distance
-    old_dist = maze.bfs_distance(state, target, include_key=True)
-    new_dist = maze.bfs_distance(next_state, target, include_key=True)
+    # Calculate the change in distance (lookups into the maze's precomputed BFS field)
+    distance = maze.distance_field(target)
+    old_dist = distance[state]
+    new_dist = distance[next_state]
 
     # Combined reward
     if new_dist < old_dist:
         return move_reward + step_penalty
     elif new_dist > old_dist:
-        return -1.8 + step_penalty
+        return constants['away'] + step_penalty
     else:
-        return -10 + step_penalty
\ No newline at end of file
+        return constants['no_progress'] + step_penalty
+
+
+def get_rewards(cells, next_cells, dones, has_key, step_counts, vec_env, max_steps=50,
+                constants=REWARD_CONSTANTS):
+    """
+    Vectorised get_reward for a batch of VecMaze transitions.
+    cells/next_cells are flat ids, has_key is the key flag after the move and
+    step_counts the per-env step index (as step_count in get_reward).
+    """
+    rows = vec_env.layout
+    step_penalty = constants['step']
+
+    # Directional guidance reward towards the key, then towards the goal
+    old_dist = np.where(has_key, vec_env.goal_distance[rows, cells], vec_env.key_distance[rows, cells])
+    new_dist = np.where(has_key, vec_env.goal_distance[rows, next_cells], vec_env.key_distance[rows, next_cells])
+    move_reward = np.where(has_key, constants['toward_goal'], constants['toward_key'])
+    shaping = np.where(new_dist < old_dist, move_reward + step_penalty,
+                       np.where(new_dist > old_dist, constants['away'] + step_penalty,
+                                constants['no_progress'] + step_penalty))
+
+    # Same precedence as get_reward: first matching condition wins
+    return np.select(
+        [cells == next_cells,
+         dones,
+         (next_cells == vec_env.key_cells) & ~has_key,
+         (next_cells == vec_env.goal_cells) & ~has_key],
+        [constants['stay'],
+         constants['goal'] + (1 - step_counts / max_steps) * constants['step_bonus'],
+         constants['key'],
+         constants['goal_without_key']],
+        default=shaping)
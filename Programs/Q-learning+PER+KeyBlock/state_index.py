@@ -0,0 +1,41 @@
+import numpy as np
+
+
+class StateIndex:
+    def __init__(self, cells, num_cells):
+        """
+        Contiguous state ids for a subset of maze cells. Tables indexed by state
+        (Q-values, visit counts) only need one row per indexed cell, so walls and
+        unreachable pockets cost nothing beyond this lookup. The key flag is not part
+        of the id; the KeyBlock tables keep it as a separate axis.
+        Parameters:
+            cells: Cell ids that get a state; cells[i] becomes state i
+            num_cells: Number of cells in the full grid (size ** 2)
+        """
+        self.cells = np.asarray(cells, dtype=np.int32)
+        self.num_cells = num_cells
+        self.index = np.full(num_cells, -1, dtype=np.int32)  # cell id -> state id, -1 if not indexed
+        self.index[self.cells] = np.arange(len(self.cells), dtype=np.int32)
+
+    def __len__(self):
+        return len(self.cells)
+
+    @classmethod
+    def dense(cls, num_cells):
+        """Index every cell; state id equals cell id"""
+        return cls(np.arange(num_cells), num_cells)
+
+    @classmethod
+    def from_mazes(cls, mazes):
+        """Index the cells reachable in any of the given equally sized mazes"""
+        mazes = mazes if isinstance(mazes, (list, tuple)) else [mazes]
+        cells = np.unique(np.concatenate([maze.reachable_cells for maze in mazes]))
+        return cls(cells, mazes[0].size ** 2)
+
+    def state_ids(self, cells):
+        """State ids of an array of cell ids"""
+        return self.index[cells]
+
+    @property
+    def nbytes(self):
+        return self.cells.nbytes + self.index.nbytes
@@ -0,0 +1,66 @@
+import numpy as np
+
+
+class VecMaze:
+    def __init__(self, mazes, num_envs, max_steps=400):
+        """
+        Run num_envs independent episodes at once on one or more same-sized mazes.
+        Positions are flat cell ids and key flags are booleans, both held in NumPy arrays;
+        every step is a single lookup into the stacked next-cell tables compiled by Maze.
+        Parameters:
+            mazes: A Maze or a list of equally sized Mazes; env k plays mazes[k % len(mazes)]
+            num_envs: Number of parallel episodes
+            max_steps: Episodes are truncated and restarted after this many steps
+        """
+        mazes = mazes if isinstance(mazes, (list, tuple)) else [mazes]
+        if len({maze.size for maze in mazes}) != 1:
+            raise ValueError("All mazes in a VecMaze must have the same size")
+
+        self.mazes = mazes
+        self.size = mazes[0].size
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+
+        self.layout = np.arange(num_envs) % len(mazes)  # Maze index of each env
+        self.next_cell = np.stack([maze.next_cell for maze in mazes])  # (layouts, cells, actions)
+        self.is_goal = np.stack([maze.is_goal for maze in mazes])
+        self.is_key = np.stack([maze.is_key for maze in mazes])
+        self.start_cells = np.array([maze.cell_id(maze.start) for maze in mazes])[self.layout]
+        self.key_cells = np.array([maze.cell_id(maze.key_pos) for maze in mazes])[self.layout]
+        self.goal_cells = np.array([maze.cell_id(maze.goal) for maze in mazes])[self.layout]
+
+        # Reward shaping distances, flattened to (layouts, cells)
+        self.key_distance = np.stack([maze.distance_field(maze.key_pos).ravel() for maze in mazes])
+        self.goal_distance = np.stack([maze.distance_field(maze.goal).ravel() for maze in mazes])
+
+        self.cells = self.start_cells.copy()
+        self.has_key = np.zeros(num_envs, dtype=bool)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self):
+        self.cells = self.start_cells.copy()
+        self.has_key[:] = False
+        self.steps[:] = 0
+        return self.cells, self.has_key
+
+    def step(self, actions):
+        """
+        Advance every env by one action. Finished envs (goal reached with the key, or
+        max_steps hit) are restarted automatically, so afterwards self.cells/self.has_key
+        already hold the start state for them.
+        Returns:
+            (next cell ids, key flags after the move, done flags, truncated flags,
+             episode lengths including this step) - all taken before any reset
+        """
+        next_cells = self.next_cell[self.layout, self.cells, actions]
+        has_key = self.has_key | self.is_key[self.layout, next_cells]
+        dones = self.is_goal[self.layout, next_cells] & has_key
+        self.steps += 1
+        lengths = self.steps.copy()
+        truncated = ~dones & (self.steps >= self.max_steps)
+
+        finished = dones | truncated
+        self.cells = np.where(finished, self.start_cells, next_cells)
+        self.has_key = has_key & ~finished
+        self.steps[finished] = 0
+        return next_cells, has_key, dones, truncated, lengths
@@ -1,8 +1,15 @@
+import numpy as np
+
+
 class SumTree:
-    def __init__(self, capacity):
+    def __init__(self, capacity, dtype=np.float64):
         self.capacity = capacity
-        self.tree = [0] * (2 * capacity - 1)
-        self.data = [None] * capacity
+        # Perfect binary heap: node i has children 2i+1 and 2i+2. The leaf count is
+        # rounded up to a power of two so every leaf sits on the same level; the
+        # padding leaves keep priority 0 and are never sampled.
+        self.depth = max(int(capacity - 1).bit_length(), 1)
+        self.leaf_base = (1 << self.depth) - 1  # Tree index of the first leaf
+        self.tree = np.zeros(2 * self.leaf_base + 1, dtype=dtype)
         self.write_pos = 0
         self.size = 0
 
@@ -12,37 +19,73 @@ class SumTree:
     def total(self):
         return self.tree[0]
 
-    def add(self, priority, data):
-        idx = self.write_pos + self.capacity - 1
-        self.data[self.write_pos] = data
+    def add(self, priority):
+        """Write priority into the next slot; the transition itself lives with the caller"""
+        idx = self.write_pos + self.leaf_base
         self.update(idx, priority)
         self.write_pos = (self.write_pos + 1) % self.capacity
         self.size = min(self.size + 1, self.capacity)
 
+    def add_batch(self, priorities):
+        """Write len(priorities) consecutive slots at once; returns the data indices written"""
+        positions = (self.write_pos + np.arange(len(priorities))) % self.capacity
+        self.update_batch(positions + self.leaf_base, priorities)
+        self.write_pos = (self.write_pos + len(priorities)) % self.capacity
+        self.size = min(self.size + len(priorities), self.capacity)
+        return positions
+
     def update(self, idx, priority):
-        change = priority - self.tree[idx]
         self.tree[idx] = priority
-        self._propagate(idx, change)
+        # Walk up to the root, recomputing each parent from its children
+        while idx != 0:
+            idx = (idx - 1) // 2
+            self.tree[idx] = self.tree[2 * idx + 1] + self.tree[2 * idx + 2]
 
-    def _propagate(self, idx, change):
-        parent = (idx - 1) // 2
-        self.tree[parent] += change
-        if parent != 0:
-            self._propagate(parent, change)
+    def update_batch(self, indices, priorities):
+        """Set several leaves at once and refresh their ancestors one tree level per pass"""
+        indices = np.asarray(indices, dtype=np.int64)
+        priorities = np.broadcast_to(np.asarray(priorities, dtype=self.tree.dtype), indices.shape)
+
+        # Repeated leaves behave as sequential updates: the last priority wins
+        nodes, last = np.unique(indices[::-1], return_index=True)
+        self.tree[nodes] = priorities[::-1][last]
+
+        # Siblings share a parent, so a level can list a node twice; both writes store the
+        # same sum, which is cheaper than deduplicating every level
+        for _ in range(self.depth):
+            nodes = (nodes - 1) // 2
+            self.tree[nodes] = self.tree[2 * nodes + 1] + self.tree[2 * nodes + 2]
 
     def _retrieve(self, idx, s):
-        left = 2 * idx + 1
-        right = left + 1
+        for _ in range(self.depth):
+            left = 2 * idx + 1
+            if s <= self.tree[left] or self.tree[left + 1] <= 0:
+                idx = left
+            else:
+                s -= self.tree[left]
+                idx = left + 1
+        return idx
 
-        if left >= len(self.tree):
-            return idx
+    def _retrieve_batch(self, s):
+        """Descend all prefix sums in s together, one tree level per pass"""
+        idx = np.zeros(len(s), dtype=np.int64)
+        s = np.array(s, dtype=np.float64)
 
-        if s <= self.tree[left]:
-            return self._retrieve(left, s)
-        else:
-            return self._retrieve(right, s - self.tree[left])
+        for _ in range(self.depth):
+            left = 2 * idx + 1
+            left_sum = self.tree[left]
+            # Never step into an empty subtree, even if rounding pushes s past the total
+            go_right = (s > left_sum) & (self.tree[left + 1] > 0)
+            s -= left_sum * go_right
+            idx = left + go_right
+        return idx
 
     def get(self, s):
         idx = self._retrieve(0, s)
-        data_idx = idx - self.capacity + 1
-        return (idx, self.tree[idx], self.data[data_idx])
\ No newline at end of file
+        data_idx = idx - self.leaf_base
+        return (idx, self.tree[idx], data_idx)
+
+    def get_batch(self, s):
+        """Vectorised get: returns (tree indices, priorities, data indices) for an array of prefix sums"""
+        idx = self._retrieve_batch(s)
+        return idx, self.tree[idx], idx - self.leaf_base
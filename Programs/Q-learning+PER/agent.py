@@ -1,22 +1,70 @@
 import numpy as np
+from state_index import StateIndex
+from planning import DynaModel
+
+
+def sequential_update(q_values, flat_indices, step_sizes, td_targets):
+    """Apply a batch of Q-value updates in place, equivalent to applying them one by one.
+
+    Repeated (state, action) entries are applied in batch order, each one seeing
+    the value left by the previous, so duplicates compose exactly as in a Python
+    loop. Distinct entries are updated together; TD targets are taken as given.
+
+    Args:
+        q_values: Flat view of the Q-table (modified in place)
+        flat_indices: Flat Q-table index of each sample
+        step_sizes: Per-sample step size (learning rate times weight)
+        td_targets: Per-sample TD target
+
+    Returns:
+        np.ndarray: Signed TD error of each sample at the moment it was applied
+    """
+    # Rank of each sample among earlier samples hitting the same entry
+    order = np.argsort(flat_indices, kind="stable")
+    sorted_indices = flat_indices[order]
+    positions = np.arange(len(order))
+    group_start = np.r_[True, sorted_indices[1:] != sorted_indices[:-1]]
+    ranks = np.empty_like(positions)
+    ranks[order] = positions - np.maximum.accumulate(np.where(group_start, positions, 0))
+
+    td_errors = np.empty(len(order))
+    for rank in range(ranks.max() + 1 if len(order) else 0):
+        mask = ranks == rank
+        entries = flat_indices[mask]
+        errors = td_targets[mask] - q_values[entries]
+        q_values[entries] += step_sizes[mask] * errors
+        td_errors[mask] = errors
+    return td_errors
 
 
 class QLearningAgent:
-    def __init__(self, maze_size_x, maze_size_y, action_size=4):
+    def __init__(self, maze_size_x, maze_size_y, action_size=4, state_index=None, dtype=np.float64):
         """Initialize Q-learning agent with Q-table and learning parameters.
 
         Args:
             maze_size_x (int): Width of the maze
             maze_size_y (int): Height of the maze
             action_size (int): Number of possible actions (default: 4)
+            state_index (StateIndex): Cells that get a Q-table row (default: every cell)
+            dtype: Floating type of the Q-table (float64, float32 or float16)
         """
-        self.q_table = np.zeros((maze_size_x, maze_size_y, action_size))
+        self.maze_size_y = maze_size_y
+        if state_index is None:
+            state_index = StateIndex.dense(maze_size_x * maze_size_y)
+        self.state_index = state_index
+        self.q_table = np.zeros((len(self.state_index), action_size), dtype=dtype)  # One row per state id
         self.lr = 0.1  # Learning rate
         self.gamma = 0.95  # Discount factor
         self.epsilon = 1.0  # Initial high exploration rate
         self.epsilon_min = 0.01  # Minimum exploration rate
         self.epsilon_decay = 0.995  # Exploration decay rate
 
+        # Dyna-Q / prioritized sweeping (off while planning_steps is 0)
+        self.planning_steps = 0  # Model backups per real step
+        self.planning_batch = 64  # Backups applied together
+        self.planning_threshold = 1e-4  # Smaller TD errors are not queued
+        self.model = None  # DynaModel, built on the first observe
+
     def get_action(self, state, epsilon=0.1):
         """Select an action using ε-greedy policy.
 
@@ -30,35 +78,110 @@ class QLearningAgent:
         if np.random.random() < epsilon:
             return np.random.randint(4)  # Random action within fixed range
 
+        return np.argmax(self.q_table[self.state_id(state)])
+
+    def state_id(self, state):
+        """Q-table row of an (x, y) state"""
         x, y = map(int, state)  # Ensure coordinates are integers
-        return np.argmax(self.q_table[x, y])  # Safe indexing for Q-table
+        return self.state_index.index.item(x * self.maze_size_y + y)
+
+    def memory_usage(self):
+        """Bytes held by the Q-table and the state index"""
+        usage = {'q_table': self.q_table.nbytes, 'state_index': self.state_index.nbytes}
+        if self.model is not None:
+            usage['model'] = self.model.nbytes
+        return usage
+
+    def get_actions(self, cells, epsilon=0.1):
+        """Vectorised ε-greedy selection for many agents at once.
+
+        Args:
+            cells: Array of flat cell ids
+            epsilon: Exploration probability (default: 0.1)
+
+        Returns:
+            np.ndarray: Action index for each cell
+        """
+        greedy = self.q_table[self.state_index.state_ids(cells)].argmax(axis=1)
+        explore = np.random.random(len(cells)) < epsilon
+        return np.where(explore, np.random.randint(self.q_table.shape[-1], size=len(cells)), greedy)
 
     def learn(self, batch, weights):
         """Update Q-values using experience replay with prioritized sampling.
 
+        TD targets for the whole batch bootstrap from the Q-table as it was before
+        the batch; updates are then applied with sequential_update.
+
         Args:
-            batch: List of experiences (state, action, reward, next_state, done)
+            batch: Arrays (states, actions, rewards, next_states, dones), states as state ids
             weights: Importance sampling weights
 
         Returns:
-            list: TD errors for each experience in the batch
+            np.ndarray: Absolute TD errors for each experience in the batch
         """
-        states, actions, rewards, next_states, dones = zip(*batch)
-        td_errors = []
+        states, actions, rewards, next_states, dones = batch
 
-        for i in range(len(batch)):
-            state = states[i]
-            action = actions[i]
-            next_state = next_states[i]
+        # Calculate TD targets
+        td_targets = rewards + self.gamma * self.q_table[next_states].max(axis=1)
 
-            # Calculate TD target and error
-            td_target = rewards[i] + self.gamma * np.max(self.q_table[next_state])
-            td_error = td_target - self.q_table[state][action]
-
-            # Update Q-value with weighted learning
-            self.q_table[state][action] += self.lr * td_error * weights[i]
-            td_errors.append(abs(td_error))
+        # Update Q-values with weighted learning
+        flat_indices = np.ravel_multi_index((states, actions), self.q_table.shape)
+        td_errors = sequential_update(self.q_table.reshape(-1), flat_indices,
+                                      self.lr * np.asarray(weights), td_targets)
 
         # Decay exploration rate
         self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
-        return td_errors  # Return list of TD errors for each experience
\ No newline at end of file
+        return np.abs(td_errors)  # TD error magnitude for each experience
+
+    def _model_errors(self, entries):
+        """|TD error| of model entries against the current Q-table"""
+        q_rows = self.q_table.reshape(-1, self.q_table.shape[-1])
+        model = self.model
+        next_max = q_rows[model.next_rows[entries]].max(axis=1)
+        targets = model.rewards[entries] + self.gamma * next_max * ~model.dones[entries]
+        return targets, np.abs(targets - self.q_table.reshape(-1)[entries])
+
+    def observe(self, states, actions, rewards, next_states, dones):
+        """Record real transitions (states as state ids) in the Dyna model and queue them
+        by TD error. Does nothing while planning_steps is 0.
+        """
+        if self.planning_steps <= 0:
+            return
+        if self.model is None:
+            self.model = DynaModel(len(self.state_index), self.q_table.shape[-1])
+
+        entries = np.atleast_1d(states) * self.q_table.shape[-1] + np.atleast_1d(actions)
+        self.model.observe(entries, next_states, rewards, dones)
+        entries = np.unique(entries)
+        _, errors = self._model_errors(entries)
+        self.model.requeue([], entries, np.where(errors > self.planning_threshold, errors, 0.0))
+
+    def plan(self):
+        """Run up to planning_steps prioritized-sweeping backups on the model.
+
+        Each pass pops the highest-priority entries (sampled in proportion to priority),
+        backs them up together, then re-queues the entries observed to lead into the
+        updated states by their new TD error.
+
+        Returns:
+            int: Number of backups applied
+        """
+        if self.model is None or self.planning_steps <= 0:
+            return 0
+
+        q_values = self.q_table.reshape(-1)
+        num_actions = self.q_table.shape[-1]
+        backups = 0
+        while backups < self.planning_steps:
+            entries = self.model.sample(min(self.planning_batch, self.planning_steps - backups))
+            if len(entries) == 0:
+                break
+            targets, _ = self._model_errors(entries)
+            q_values[entries] += self.lr * (targets - q_values[entries])  # Entries are distinct
+            backups += len(entries)
+
+            predecessors = self.model.predecessors_of(np.unique(entries // num_actions))
+            _, errors = self._model_errors(predecessors)
+            self.model.requeue(entries, predecessors, np.where(errors > self.planning_threshold, errors, 0.0))
+        return backups
+
@@ -0,0 +1,141 @@
+import json
+import os
+import shutil
+
+import numpy as np
+from planning import DynaModel
+
+CHECKPOINT_VERSION = 1
+
+# Attributes saved per component; arrays are restored in place, scalars by setattr
+AGENT_FIELDS = ('q_table', 'epsilon')
+MEMORY_FIELDS = ('states', 'actions', 'rewards', 'next_states', 'dones', 'write_pos', 'size',
+                 'max_priority', 'visit_counts', 'visit_scale')
+TREE_FIELDS = ('tree', 'write_pos', 'size')
+MODEL_FIELDS = ('next_rows', 'rewards', 'dones', 'predecessors', 'predecessor_counts')
+STOPPING_FIELDS = ('previous', 'successes', 'count', 'streak', 'stopped_at', 'checks')
+
+
+def save_checkpoint(path, state):
+    """Write a checkpoint directory: one .npy file per array and checkpoint.json for the rest.
+
+    The directory is written under a temporary name and swapped in afterwards, so a run
+    killed mid-save still leaves the previous checkpoint intact.
+
+    Args:
+        path (str): Checkpoint directory (replaced if it exists)
+        state (dict): name -> np.ndarray or JSON-serialisable value
+    """
+    tmp_path, old_path = path + ".tmp", path + ".old"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    arrays = {name: value for name, value in state.items() if isinstance(value, np.ndarray)}
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, name + ".npy"), array)
+    meta = {'version': CHECKPOINT_VERSION, 'arrays': sorted(arrays),
+            'values': {name: value for name, value in state.items() if name not in arrays}}
+    with open(os.path.join(tmp_path, "checkpoint.json"), "w") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def load_checkpoint(path):
+    """Read a checkpoint written by save_checkpoint; arrays are memory-mapped read-only.
+
+    Returns:
+        dict: name -> np.ndarray or value
+    """
+    if not os.path.exists(path) and os.path.exists(path + ".old"):
+        path += ".old"  # Killed between the two renames of save_checkpoint
+    with open(os.path.join(path, "checkpoint.json")) as f:
+        meta = json.load(f)
+    if meta['version'] != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} is a version {meta['version']} checkpoint, "
+                         f"expected version {CHECKPOINT_VERSION}")
+    state = dict(meta['values'])
+    for name in meta['arrays']:
+        state[name] = np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+    return state
+
+
+def _collect(state, prefix, obj, fields):
+    for name in fields:
+        value = getattr(obj, name)
+        if isinstance(value, np.ndarray):
+            value = value.copy()
+        elif isinstance(value, np.generic):
+            value = value.item()
+        state[prefix + name] = value
+
+
+def _restore(state, prefix, obj, fields):
+    for name in fields:
+        value = state[prefix + name]
+        if isinstance(value, np.ndarray):
+            target = getattr(obj, name)
+            if target.shape != value.shape:
+                raise ValueError(f"Checkpoint {prefix + name} has shape {value.shape}, expected {target.shape}")
+            np.copyto(target, value)
+        else:
+            setattr(obj, name, value)
+
+
+def maze_state(maze):
+    """Size, seed and obstacle cells of a maze, to check a checkpoint against the maze it resumes on"""
+    obstacles = np.array(sorted(maze.cell_id(cell) for cell in maze.obstacles), dtype=np.int64)
+    return {'maze.size': maze.size, 'maze.seed': maze.seed, 'maze.obstacles': obstacles}
+
+
+def check_maze(state, maze):
+    """Raise ValueError unless state was saved on the same maze layout"""
+    saved = state['maze.obstacles']
+    current = maze_state(maze)['maze.obstacles']
+    if state['maze.size'] != maze.size or not np.array_equal(saved, current):
+        raise ValueError(f"Checkpoint was saved on a different maze (size {state['maze.size']}, "
+                         f"seed {state['maze.seed']})")
+
+
+def training_state(agent, memory, stopping=None):
+    """Checkpoint state of the agent (including its Dyna model), the replay buffer, the
+    early-stopping controller (if any) and np.random.
+
+    Returns:
+        dict: Flat name -> value state for save_checkpoint
+    """
+    state = {}
+    _collect(state, "agent.", agent, AGENT_FIELDS)
+    if agent.model is not None:
+        _collect(state, "model.", agent.model, MODEL_FIELDS)
+        _collect(state, "model.tree.", agent.model.tree, TREE_FIELDS)
+    _collect(state, "memory.", memory, MEMORY_FIELDS)
+    _collect(state, "memory.tree.", memory.tree, TREE_FIELDS)
+    if stopping is not None:
+        _collect(state, "stopping.", stopping, STOPPING_FIELDS)
+
+    bit_generator, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    state.update({'rng.keys': keys, 'rng.bit_generator': bit_generator, 'rng.pos': int(pos),
+                  'rng.has_gauss': int(has_gauss), 'rng.cached_gaussian': float(cached_gaussian)})
+    return state
+
+
+def restore_training_state(state, agent, memory, stopping=None):
+    """Load a training_state checkpoint into a freshly built agent, replay buffer and
+    early-stopping controller and reset np.random to where it was"""
+    _restore(state, "agent.", agent, AGENT_FIELDS)
+    if "model.next_rows" in state:
+        predecessors = state["model.predecessors"]
+        agent.model = DynaModel(predecessors.shape[0], agent.q_table.shape[-1], predecessors.shape[1])
+        _restore(state, "model.", agent.model, MODEL_FIELDS)
+        _restore(state, "model.tree.", agent.model.tree, TREE_FIELDS)
+    _restore(state, "memory.", memory, MEMORY_FIELDS)
+    _restore(state, "memory.tree.", memory.tree, TREE_FIELDS)
+    if stopping is not None and "stopping.previous" in state:
+        _restore(state, "stopping.", stopping, STOPPING_FIELDS)
+
+    np.random.set_state((state['rng.bit_generator'], np.array(state['rng.keys']), state['rng.pos'],
+                         state['rng.has_gauss'], state['rng.cached_gaussian']))
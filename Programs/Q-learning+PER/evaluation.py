@@ -0,0 +1,119 @@
+import numpy as np
+
+
+def distances_to(successors, target):
+    """Fewest moves from every node to target (breadth-first over the reversed graph).
+
+    Args:
+        successors (np.ndarray): (nodes, actions) table of the node each action leads to
+        target (int): Node to reach
+
+    Returns:
+        np.ndarray: Distance per node, -1 where target cannot be reached
+    """
+    nodes, actions = successors.shape
+    targets = successors.ravel()
+    predecessors = np.repeat(np.arange(nodes), actions)[np.argsort(targets, kind="stable")]
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(targets, minlength=nodes))])
+
+    distance = np.full(nodes, -1, dtype=np.int64)
+    distance[target] = 0
+    frontier = np.array([target])
+    level = 0
+    while len(frontier):
+        level += 1
+        # Predecessor lists of the whole frontier, gathered as one ragged slice
+        starts, counts = offsets[frontier], offsets[frontier + 1] - offsets[frontier]
+        slots = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        frontier = np.unique(predecessors[slots])
+        frontier = frontier[distance[frontier] < 0]
+        distance[frontier] = level
+    return distance
+
+
+def hitting_times(successor, starts, target):
+    """Moves a deterministic walk needs from each start to target, by pointer doubling.
+
+    successor[n] is the single node after n, with target absorbing. The table of 2^k-step
+    jumps is built for k up to log2(nodes), then every walk advances by the largest jumps
+    that stay short of target. A walk that has not reached target after as many moves as
+    there are nodes has entered a cycle.
+
+    Args:
+        successor (np.ndarray): Next node of every node
+        starts (np.ndarray): Start nodes (not target itself)
+        target (int): Absorbing node to reach
+
+    Returns:
+        np.ndarray: Moves per start, -1 for walks caught in a cycle
+    """
+    jumps = [successor]
+    for _ in range(len(successor).bit_length() - 1):
+        jumps.append(jumps[-1][jumps[-1]])
+
+    current = np.asarray(starts)
+    moves = np.zeros(len(current), dtype=np.int64)
+    for k in range(len(jumps) - 1, -1, -1):
+        ahead = jumps[k][current]
+        short = ahead != target
+        current = np.where(short, ahead, current)
+        moves += short.astype(np.int64) << k
+    return np.where(successor[current] == target, moves + 1, -1)
+
+
+class PolicyEvaluator:
+    def __init__(self, maze, state_index):
+        """Greedy-policy evaluation from every reachable start cell at once.
+
+        The maze's transitions are compiled once into a table over state ids (goal
+        folded into one absorbing node) together with the breadth-first optimum of every
+        start; evaluate() then only has to follow the greedy action of each state.
+
+        Args:
+            maze (Maze): Maze the agent is trained on
+            state_index (StateIndex): The agent's state index (rows of its Q-table)
+        """
+        cells = state_index.cells
+        self.goal = len(cells)  # Absorbing node standing in for the goal cell
+        goal_state = state_index.index[maze.cell_id(maze.goal)]
+        successors = state_index.index[maze.next_cell[cells]].astype(np.int64)
+        successors[successors == goal_state] = self.goal
+        self.successors = np.vstack([successors, np.full((1, successors.shape[1]), self.goal)])
+
+        self.optimal = distances_to(self.successors, self.goal)
+        self.starts = np.flatnonzero(self.optimal > 0)
+        self.starts = self.starts[self.starts != goal_state]
+        start = np.flatnonzero(self.starts == state_index.index[maze.cell_id(maze.start)])
+        self.start_slot = int(start[0]) if len(start) else None  # Position of maze.start in starts
+
+    def evaluate(self, q_table):
+        """Roll the greedy policy of q_table out from every start.
+
+        Args:
+            q_table (np.ndarray): (states, actions) Q-values
+
+        Returns:
+            dict: starts, success_rate, mean_path_length and mean_optimal_length (over the
+                successful starts), path_ratio (their total greedy / optimal length),
+                loops (starts whose walk cycles forever) and start_path_length (greedy
+                length from the maze's start cell, None if it loops)
+        """
+        greedy = q_table.argmax(axis=1)
+        successor = np.append(self.successors[np.arange(len(greedy)), greedy], self.goal)
+        lengths = hitting_times(successor, self.starts, self.goal)
+        return _summary(lengths, self.optimal[self.starts],
+                        -1 if self.start_slot is None else lengths[self.start_slot])
+
+
+def _summary(lengths, optimal, start_length):
+    """Evaluation summary of greedy path lengths (-1 = loop) against their optimum"""
+    solved = lengths > 0
+    return {
+        'starts': len(lengths),
+        'success_rate': float(solved.mean()) if len(lengths) else 0.0,
+        'mean_path_length': float(lengths[solved].mean()) if solved.any() else None,
+        'mean_optimal_length': float(optimal[solved].mean()) if solved.any() else None,
+        'path_ratio': float(lengths[solved].sum() / optimal[solved].sum()) if solved.any() else None,
+        'loops': int((~solved).sum()),
+        'start_path_length': int(start_length) if start_length > 0 else None,
+    }
@@ -1,12 +1,21 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import ListedColormap
 from collections import deque
 
 
 class Maze:
-    def __init__(self, size=10):
+    def __init__(self, size=10, seed=None, layout=None):
+        """Square grid maze from (0, 0) to the opposite corner.
+
+        Args:
+            size (int): Side length of the maze
+            seed (int): Seed for a private generator, so the same seed always gives the same
+                layout (None uses the global np.random state)
+            layout: Obstacle cells of a stored maze (e.g. from a maze corpus) to rebuild it
+                without generating; the goal must be reachable from the start
+        """
         self.size = size
+        self.seed = seed  # None uses the global np.random state
+        self._rng = np.random.RandomState(seed) if seed is not None else np.random
         self.start = (0, 0)
         self.goal = (size - 1, size - 1)
 
@@ -15,26 +24,51 @@ class Maze:
 
         # Then generate maze (will use action_effects)
         self.obstacles = set()
-        self._generate_valid_maze()
+        if layout is None:
+            self._generate_valid_maze()
+        else:
+            self.obstacles = set(map(tuple, layout))
+        self.compile_transitions()
 
         self.state = self.start
+        self._cell = self.cell_id(self.start)
         self.fig, self.ax = None, None
 
     def _generate_valid_maze(self):
-        """Generate a maze with guaranteed path"""
-        all_positions = [(i, j) for i in range(self.size)
-                         for j in range(self.size)
-                         if (i, j) not in [self.start, self.goal]]
-        np.random.shuffle(all_positions)
-
-        self.obstacles = set()
-        for pos in all_positions:
-            temp_obstacles = self.obstacles | {pos}
-            if self._path_exists(temp_obstacles):
-                self.obstacles = temp_obstacles
-
-            if len(self.obstacles) >= self.size ** 2 * 0.2:
-                break
+        """Generate a maze with guaranteed path.
+
+        A random start-goal route is reserved first and obstacles are drawn from the
+        remaining cells, so connectivity holds by construction and generation is
+        linear in the number of cells.
+        """
+        target_obstacles = int(np.ceil(self.size ** 2 * 0.2))
+
+        reserved = np.zeros((self.size, self.size), dtype=bool)
+        route = self._random_route([self.start, self.goal])
+        reserved[route[:, 0], route[:, 1]] = True
+
+        free_cells = np.flatnonzero(~reserved)
+        chosen = self._rng.choice(free_cells, min(target_obstacles, len(free_cells)), replace=False)
+        xs, ys = np.unravel_index(chosen, reserved.shape)
+        self.obstacles = set(zip(xs.tolist(), ys.tolist()))
+
+    def _random_route(self, stops):
+        """Random connected cell path visiting stops in order, with a random detour on each leg"""
+        points = [stops[0]]
+        for stop in stops[1:]:
+            if self.size >= 4:
+                points.append((self._rng.randint(self.size), self._rng.randint(self.size)))
+            points.append(stop)
+
+        segments = [np.array([points[0]])]
+        for (x0, y0), (x1, y1) in zip(points[:-1], points[1:]):
+            # Staircase between two points: the x and y moves in random order
+            dx, dy = abs(x1 - x0), abs(y1 - y0)
+            x_moves = self._rng.permutation(np.arange(dx + dy) < dx)
+            xs = x0 + np.sign(x1 - x0) * np.cumsum(x_moves)
+            ys = y0 + np.sign(y1 - y0) * np.cumsum(~x_moves)
+            segments.append(np.column_stack((xs, ys)))
+        return np.concatenate(segments).astype(int)
 
     def _path_exists(self, obstacles):
         """Check if path exists using BFS"""
@@ -59,24 +93,78 @@ class Maze:
 
         return False
 
+    def cell_id(self, pos):
+        """Flat id of an (x, y) cell, matching the replay buffer's state ids"""
+        return pos[0] * self.size + pos[1]
+
+    def compile_transitions(self):
+        """Build the (num_cells, 4) next-cell table (call again after changing obstacles)"""
+        blocked = np.zeros((self.size, self.size), dtype=bool)
+        if self.obstacles:
+            blocked[tuple(np.array(list(self.obstacles)).T)] = True
+
+        xs, ys = np.indices((self.size, self.size))
+        self.next_cell = np.empty((self.size ** 2, len(self.action_effects)), dtype=np.int32)
+        for action, (dx, dy) in enumerate(self.action_effects):
+            nx, ny = np.clip(xs + dx, 0, self.size - 1), np.clip(ys + dy, 0, self.size - 1)
+            # Off-grid moves were clipped back onto the current cell; walls also keep it there
+            moved = ((nx != xs) | (ny != ys)) & ~blocked[nx, ny]
+            self.next_cell[:, action] = np.where(moved, nx * self.size + ny, xs * self.size + ys).ravel()
+
+        self.is_goal = np.zeros(self.size ** 2, dtype=bool)
+        self.is_goal[self.cell_id(self.goal)] = True
+        self._goal_cell = self.cell_id(self.goal)
+        self._reachable_cells = None  # Flood-filled on first use (see reachable_cells)
+
+    @property
+    def reachable_cells(self):
+        """Sorted ids of the cells reachable from start, computed on first access and cached
+        until the next compile_transitions (generation itself never needs them)"""
+        if self._reachable_cells is None:
+            self._reachable_cells = self._flood_fill()
+        return self._reachable_cells
+
+    def _flood_fill(self):
+        """Sorted ids of the cells reachable from start (one breadth-first sweep over next_cell)"""
+        reached = np.zeros(self.size ** 2, dtype=bool)
+        frontier = np.array([self.cell_id(self.start)])
+        reached[frontier] = True
+        while len(frontier):
+            neighbours = self.next_cell[frontier].ravel()
+            frontier = np.unique(neighbours[~reached[neighbours]])
+            reached[frontier] = True
+        return np.flatnonzero(reached).astype(np.int32)
+
     def reset(self):
         self.state = self.start
+        self._cell = self.cell_id(self.start)
         return self.state
 
     def step(self, action):
-        x, y = self.state
-        dx, dy = self.action_effects[action]
-        new_x, new_y = x + dx, y + dy
-
-        if (0 <= new_x < self.size and 0 <= new_y < self.size and
-                (new_x, new_y) not in self.obstacles):
-            self.state = (new_x, new_y)
+        self._cell = self.next_cell.item(self._cell, action)
+        self.state = divmod(self._cell, self.size)
 
-        done = (self.state == self.goal)
+        done = (self._cell == self._goal_cell)
         return self.state, done
 
+    def step_many(self, cells, actions):
+        """Advance many agents at once.
+
+        Args:
+            cells: Array of current cell ids
+            actions: Array of action indices
+
+        Returns:
+            tuple: (next cell ids, done flags)
+        """
+        next_cells = self.next_cell[cells, actions]
+        return next_cells, self.is_goal[next_cells]
+
     def render(self):
         """Visualize the maze"""
+        import matplotlib.pyplot as plt  # Only needed when rendering
+        from matplotlib.colors import ListedColormap
+
         if self.fig is None:
             plt.ion()
             self.fig, self.ax = plt.subplots(figsize=(8, 8))
@@ -1,74 +1,160 @@
 import numpy as np
 from SumTree import SumTree
+from state_index import StateIndex
 
 
 class PrioritizedReplayBuffer:
-    def __init__(self, capacity, alpha=0.6, beta=0.4):
+    def __init__(self, capacity, state_shape, alpha=0.6, beta=0.4, state_index=None,
+                 reward_dtype=np.float32, priority_dtype=np.float64):
+        """Prioritized replay over a columnar transition store.
+
+        Args:
+            capacity (int): Maximum number of stored transitions
+            state_shape (tuple): Maze grid shape
+            alpha (float): Priority exponent
+            beta (float): Importance-sampling exponent
+            state_index (StateIndex): Maps cells to the state ids that are stored and
+                visit-counted (default: every cell, state id = cell id)
+            reward_dtype: Floating type of the stored rewards
+            priority_dtype: Floating type of the priority sum tree; float16 is widened to
+                float32 because the tree's internal sums would overflow it
+        """
         self.capacity = capacity
+        self.state_shape = tuple(state_shape)
+        if state_index is None:
+            state_index = StateIndex.dense(self.state_shape[0] * self.state_shape[1])
+        self.state_index = state_index
         self.alpha = alpha
         self.beta = beta
-        self.tree = SumTree(capacity)
-        self.data = [None] * capacity
+        self.tree = SumTree(capacity, dtype=np.promote_types(priority_dtype, np.float32))
         self.write_pos = 0
         self.size = 0
         self.max_priority = 1.0
 
-        self.visited_states = {}
+        # columnar transition storage
+        self.states = np.zeros(capacity, dtype=np.int32)
+        self.actions = np.zeros(capacity, dtype=np.int8)
+        self.rewards = np.zeros(capacity, dtype=reward_dtype)
+        self.next_states = np.zeros(capacity, dtype=np.int32)
+        self.dones = np.zeros(capacity, dtype=bool)
+
+        # true count = visit_counts[state] * visit_scale (decay is one multiply); stays
+        # float64 because visit_scale runs down to visit_renorm_threshold
+        self.visit_counts = np.zeros(len(state_index))
+        self.visit_scale = 1.0
         self.visit_decay = 0.99
+        self.visit_renorm_threshold = 1e-200
 
     def __len__(self):
         return self.size
 
+    def state_id(self, state):
+        """State id of an (x, y) state"""
+        return self.state_index.index.item(int(state[0]) * self.state_shape[1] + int(state[1]))
+
     def add(self, state, action, reward, next_state, done):
-        state_key = tuple(state)
-        next_state_key = tuple(next_state)
+        state_id = self.state_id(state)
+        next_state_id = self.state_id(next_state)
 
-        visit_count = self.visited_states.get(state_key, 0)
+        visit_count = self.visit_counts[state_id] * self.visit_scale
         if visit_count > 0:
             reward -= 0.3 * visit_count
 
         # update access times
-        self.visited_states[state_key] = visit_count + 1
-        self.visited_states[next_state_key] = self.visited_states.get(next_state_key, 0) + 1
+        self.visit_counts[state_id] = (visit_count + 1) / self.visit_scale
+        self.visit_counts[next_state_id] += 1 / self.visit_scale
 
-        for k in self.visited_states:
-            self.visited_states[k] *= self.visit_decay
+        self.visit_scale *= self.visit_decay
+        if self.visit_scale < self.visit_renorm_threshold:
+            self.visit_counts *= self.visit_scale
+            self.visit_scale = 1.0
 
         # store experience
-        data = (state, action, reward, next_state, done)
-        self.tree.add(self.max_priority, data)
-        self.data[self.write_pos] = data
+        pos = self.write_pos
+        self.states[pos] = state_id
+        self.actions[pos] = action
+        self.rewards[pos] = reward
+        self.next_states[pos] = next_state_id
+        self.dones[pos] = done
+        self.tree.add(self.max_priority)
         self.write_pos = (self.write_pos + 1) % self.capacity
         self.size = min(self.size + 1, self.capacity)
 
+    def add_batch(self, cells, actions, rewards, next_cells, dones):
+        """Add many transitions at once (states given as cell ids), same result as add in order."""
+        rewards = np.array(rewards, dtype=np.float64)
+        state_ids = self.state_index.state_ids(cells)
+        next_state_ids = self.state_index.state_ids(next_cells)
+
+        # The repeat-visit penalty depends on every earlier insert, so it is applied in order
+        for i in range(len(rewards)):
+            state_id, next_state_id = state_ids[i], next_state_ids[i]
+            visit_count = self.visit_counts[state_id] * self.visit_scale
+            if visit_count > 0:
+                rewards[i] -= 0.3 * visit_count
+
+            self.visit_counts[state_id] = (visit_count + 1) / self.visit_scale
+            self.visit_counts[next_state_id] += 1 / self.visit_scale
+
+            self.visit_scale *= self.visit_decay
+            if self.visit_scale < self.visit_renorm_threshold:
+                self.visit_counts *= self.visit_scale
+                self.visit_scale = 1.0
+
+        positions = self.tree.add_batch(np.full(len(rewards), self.max_priority))
+        self.states[positions] = state_ids
+        self.actions[positions] = actions
+        self.rewards[positions] = rewards
+        self.next_states[positions] = next_state_ids
+        self.dones[positions] = dones
+        self.write_pos = self.tree.write_pos
+        self.size = self.tree.size
+
     def sample(self, batch_size):
-        indices = []
-        samples = []
-        weights = []
-        segment = self.tree.total() / batch_size
-
-        for i in range(batch_size):
-            s = np.random.uniform(segment * i, segment * (i + 1))
-            idx, priority, data = self.tree.get(s)
-            prob = priority / self.tree.total()
-            weight = (1.0 / prob) ** self.beta
-            indices.append(idx)
-            samples.append(data)
-            weights.append(weight)
-
-        weights = np.array(weights) / np.max(weights)
-        return indices, samples, weights
+        """Draw a stratified prioritized batch.
+
+        Returns:
+            tuple: (tree indices, (states, actions, rewards, next_states, dones) arrays
+                with states as state ids, importance-sampling weights)
+        """
+        total = self.tree.total()
+        segment = total / batch_size
+
+        bounds = segment * np.arange(batch_size)
+        s = np.random.uniform(bounds, bounds + segment)
+        indices, priorities, data_indices = self.tree.get_batch(s)
+        batch = (self.states[data_indices], self.actions[data_indices], self.rewards[data_indices],
+                 self.next_states[data_indices], self.dones[data_indices])
+
+        probs = priorities / total
+        weights = (1.0 / probs) ** self.beta
+        weights = weights / np.max(weights)
+        return indices, batch, weights
 
     def update_priorities(self, indices, priorities):
-        try:
-            iter(priorities)
-        except TypeError:
-            priorities = [priorities] * len(indices)
+        priorities = np.maximum(np.asarray(priorities, dtype=np.float64), 1e-6)
+        priorities = np.broadcast_to(priorities, np.shape(indices))
+        if priorities.size == 0:
+            return
+
+        self.tree.update_batch(indices, priorities ** self.alpha)
+        self.max_priority = max(self.max_priority, float(priorities.max()))
 
-        for idx, priority in zip(indices, priorities):
-            priority = max(float(priority), 1e-6)
-            self.tree.update(idx, priority ** self.alpha)
-            self.max_priority = max(self.max_priority, priority)
+    def visit_count(self, state):
+        return self.visit_counts[self.state_id(state)] * self.visit_scale
 
     def clear_visited(self):
-        self.visited_states = {}
\ No newline at end of file
+        self.visit_counts = np.zeros_like(self.visit_counts)
+        self.visit_scale = 1.0
+
+    def memory_usage(self):
+        """Bytes held by each preallocated array (the state index is shared with the agent)"""
+        return {
+            'states': self.states.nbytes,
+            'actions': self.actions.nbytes,
+            'rewards': self.rewards.nbytes,
+            'next_states': self.next_states.nbytes,
+            'dones': self.dones.nbytes,
+            'priorities': self.tree.tree.nbytes,
+            'visit_counts': self.visit_counts.nbytes,
+        }
@@ -1,16 +1,43 @@
-def get_reward(state, next_state, done, maze):
+import numpy as np
+
+# Reward constants; pass a modified copy as `constants` to experiment (e.g. from sweep.py)
+REWARD_CONSTANTS = {
+    'goal': 10.0,  # Reward for reaching the goal
+    'wall': -5.0,  # Penalty for hitting a wall
+    'closer': 0.3,  # Moving closer to goal
+    'farther': -0.5,  # Moving away from goal
+    'same': -0.1,  # Penalty for staying in place
+}
+
+
+def get_reward(state, next_state, done, maze, constants=REWARD_CONSTANTS):
     if done:
-        return 10.0  # Reward for reaching the goal
+        return constants['goal']  # Reward for reaching the goal
     elif next_state in maze.obstacles:
-        return -5.0  # Penalty for hitting a wall
+        return constants['wall']  # Penalty for hitting a wall
     else:
         # Calculate Manhattan distance to goal
         old_dist = abs(state[0] - maze.goal[0]) + abs(state[1] - maze.goal[1])
         new_dist = abs(next_state[0] - maze.goal[0]) + abs(next_state[1] - maze.goal[1])
 
         if new_dist < old_dist:  # Moving closer to goal
-            return 0.3
+            return constants['closer']
         elif new_dist > old_dist:  # Moving away from goal
-            return -0.5
+            return constants['farther']
         else:
-            return -0.1  # Penalty for staying in place
\ No newline at end of file
+            return constants['same']  # Penalty for staying in place
+
+
+def get_rewards(cells, next_cells, dones, vec_env, constants=REWARD_CONSTANTS):
+    """Vectorised get_reward for a batch of VecMaze transitions (cells are flat ids)"""
+    x, y = np.divmod(cells, vec_env.size)
+    next_x, next_y = np.divmod(next_cells, vec_env.size)
+    goal_x, goal_y = np.divmod(vec_env.goal_cells, vec_env.size)
+
+    # Manhattan distance to goal before and after the move
+    old_dist = np.abs(x - goal_x) + np.abs(y - goal_y)
+    new_dist = np.abs(next_x - goal_x) + np.abs(next_y - goal_y)
+
+    rewards = np.where(new_dist < old_dist, constants['closer'],
+                       np.where(new_dist > old_dist, constants['farther'], constants['same']))
+    return np.where(dones, constants['goal'], rewards)
@@ -0,0 +1,58 @@
+import numpy as np
+
+
+class VecMaze:
+    def __init__(self, mazes, num_envs, max_steps=100):
+        """Run num_envs independent episodes at once on one or more same-sized mazes.
+
+        Positions are flat cell ids held in NumPy arrays and every step is a single
+        lookup into the stacked next-cell tables compiled by Maze.
+
+        Args:
+            mazes: A Maze or a list of equally sized Mazes; env k plays mazes[k % len(mazes)]
+            num_envs (int): Number of parallel episodes
+            max_steps (int): Episodes are truncated and restarted after this many steps
+        """
+        mazes = mazes if isinstance(mazes, (list, tuple)) else [mazes]
+        if len({maze.size for maze in mazes}) != 1:
+            raise ValueError("All mazes in a VecMaze must have the same size")
+
+        self.mazes = mazes
+        self.size = mazes[0].size
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+
+        self.layout = np.arange(num_envs) % len(mazes)  # Maze index of each env
+        self.next_cell = np.stack([maze.next_cell for maze in mazes])  # (layouts, cells, actions)
+        self.is_goal = np.stack([maze.is_goal for maze in mazes])
+        self.start_cells = np.array([maze.cell_id(maze.start) for maze in mazes])[self.layout]
+        self.goal_cells = np.array([maze.cell_id(maze.goal) for maze in mazes])[self.layout]
+
+        self.cells = self.start_cells.copy()
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+    def reset(self):
+        self.cells = self.start_cells.copy()
+        self.steps[:] = 0
+        return self.cells
+
+    def step(self, actions):
+        """Advance every env by one action.
+
+        Finished envs (goal reached or max_steps hit) are restarted automatically, so
+        after the call self.cells already holds the start cell for them.
+
+        Returns:
+            tuple: (next cell ids before any reset, done flags, truncated flags,
+                episode lengths including this step)
+        """
+        next_cells = self.next_cell[self.layout, self.cells, actions]
+        dones = self.is_goal[self.layout, next_cells]
+        self.steps += 1
+        lengths = self.steps.copy()
+        truncated = ~dones & (self.steps >= self.max_steps)
+
+        finished = dones | truncated
+        self.cells = np.where(finished, self.start_cells, next_cells)
+        self.steps[finished] = 0
+        return next_cells, dones, truncated, lengths
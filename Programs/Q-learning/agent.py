@@ -14,6 +14,7 @@ class QLearningAgent:
         self._stuck_counter = 0
         # 动作空间：上、下、左、右
         self.actions = ['up', 'down', 'left', 'right']
+        self.action_index = {a: i for i, a in enumerate(self.actions)}  # 与 maze.ACTION_EFFECTS 顺序一致
         self.action_map = {
             'up': (0, -1),
             'down': (0, 1),
@@ -21,49 +22,61 @@ class QLearningAgent:
             'right': (1, 0)
         }
 
-        # 初始化Q表
-        self.q_table = {}
+        # 初始化Q表：q_values[格子编号, 动作编号]，格子编号与 maze.cell_id 一致
+        self.q_values = np.zeros((maze.width * maze.height, len(self.actions)))
+
+    def state_id(self, state):
+        """坐标状态 (x, y) 转格子编号"""
+        x, y = state
+        return y * self.maze.width + x
+
+    @property
+    def q_table(self):
+        """旧接口：{状态: {动作: Q值}} 形式的只读快照（仅含非零行）"""
+        width = self.maze.width
+        return {(cell % width, cell // width): dict(zip(self.actions, self.q_values[cell].tolist()))
+                for cell in np.flatnonzero(self.q_values.any(axis=1))}
 
     def get_q_value(self, state, action):
-        """获取Q值，如果状态不存在则初始化为0"""
-        if state not in self.q_table:
-            self.q_table[state] = {a: 0 for a in self.actions}
-        return self.q_table[state][action]
+        """获取Q值"""
+        return self.q_values.item(self.state_id(state), self.action_index[action])
 
-    def choose_action(self, state):
-        """选择动作（ε-贪婪策略）"""
+    def choose_action_index(self, cell):
+        """按格子编号选择动作编号（ε-贪婪策略，最大值并列时等概率随机选择）"""
         if random.random() < self.exploration_rate:
-            return random.choice(self.actions)
+            return random.randrange(len(self.actions))
 
-        if state not in self.q_table:
-            self.q_table[state] = {a: 0 for a in self.actions}
+        # 第 k 个并列最大值，不构造候选列表
+        row = self.q_values[cell].tolist()
+        max_q = max(row)
+        k = random.randrange(row.count(max_q))
+        action = row.index(max_q)
+        for _ in range(k):
+            action = row.index(max_q, action + 1)
+        return action
 
-        # 选择Q值最大的动作
-        max_q = max(self.q_table[state].values())
-        best_actions = [a for a, q in self.q_table[state].items() if q == max_q]
-        return random.choice(best_actions)
-
-    def update_q_value(self, state, action, reward, next_state):
-        """更新Q值"""
-        current_q = self.get_q_value(state, action)
-
-        # 计算下一个状态的最大Q值
-        if next_state not in self.q_table:
-            self.q_table[next_state] = {a: 0 for a in self.actions}
-        max_next_q = max(self.q_table[next_state].values())
+    def choose_action(self, state):
+        """选择动作（ε-贪婪策略）"""
+        return self.actions[self.choose_action_index(self.state_id(state))]
 
-        # Q-learning更新公式
-        new_q = current_q + self.learning_rate * (
+    def update(self, cell, action, reward, next_cell):
+        """按格子编号 / 动作编号做一次 Q-learning 更新"""
+        current_q = self.q_values.item(cell, action)
+        max_next_q = max(self.q_values[next_cell].tolist())
+        self.q_values[cell, action] = current_q + self.learning_rate * (
                 reward + self.discount_factor * max_next_q - current_q
         )
-        self.q_table[state][action] = new_q
+
+    def update_q_value(self, state, action, reward, next_state):
+        """更新Q值"""
+        self.update(self.state_id(state), self.action_index[action], reward, self.state_id(next_state))
 
     def take_action(self, action):
         """执行动作并返回结果"""
-        dx, dy = self.action_map[action]
-        current_x, current_y = self.maze.agent_position
-        new_x, new_y = current_x + dx, current_y + dy
+        return self.take_action_index(self.action_index[action])
 
+    def take_action_index(self, action):
+        """按动作编号执行动作（查表移动，不再逐步检查边界与墙体集合）"""
         action_result = {
             'hit_wall': False,
             'in_trap': False,
@@ -71,15 +84,15 @@ class QLearningAgent:
             'valid_move': False
         }
 
-        if self.maze.is_valid_position(new_x, new_y):
+        next_cell, moved = self.maze.move(action)
+        if moved:
             action_result['valid_move'] = True
-            self.maze.set_agent_position(new_x, new_y)
 
-            if (new_x, new_y) in self.maze.trap_positions:
+            if self.maze.is_trap.item(next_cell):
                 action_result['in_trap'] = True
-            elif (new_x, new_y) == self.maze.exit_position:
+            elif self.maze.is_exit.item(next_cell):
                 action_result['reached_exit'] = True
         else:
             action_result['hit_wall'] = True
 
-        return action_result
\ No newline at end of file
+        return action_result
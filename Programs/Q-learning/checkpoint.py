@@ -0,0 +1,92 @@
+import json
+import os
+import random
+import shutil
+
+import numpy as np
+
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(path, state):
+    """写入检查点目录：每个数组一个 .npy 文件，其余值写入 checkpoint.json
+
+    先写到临时目录再整体替换，保存过程中进程被杀时旧检查点仍然完好。
+    path: 检查点目录（已存在则替换）
+    state: {名称: np.ndarray 或可 JSON 序列化的值}
+    """
+    tmp_path, old_path = path + ".tmp", path + ".old"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    arrays = {name: value for name, value in state.items() if isinstance(value, np.ndarray)}
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, name + ".npy"), array)
+    meta = {'version': CHECKPOINT_VERSION, 'arrays': sorted(arrays),
+            'values': {name: value for name, value in state.items() if name not in arrays}}
+    with open(os.path.join(tmp_path, "checkpoint.json"), "w") as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(old_path, ignore_errors=True)
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+
+def load_checkpoint(path):
+    """读取 save_checkpoint 写入的检查点，数组以只读内存映射方式加载，返回 {名称: 值}"""
+    if not os.path.exists(path) and os.path.exists(path + ".old"):
+        path += ".old"  # 进程在 save_checkpoint 的两次重命名之间被杀
+    with open(os.path.join(path, "checkpoint.json")) as f:
+        meta = json.load(f)
+    if meta['version'] != CHECKPOINT_VERSION:
+        raise ValueError(f"{path} 是第 {meta['version']} 版检查点，当前需要第 {CHECKPOINT_VERSION} 版")
+    state = dict(meta['values'])
+    for name in meta['arrays']:
+        state[name] = np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+    return state
+
+
+def _positions(positions):
+    """坐标集合 -> (n, 2) 数组（排序后保存，与集合的遍历顺序无关）"""
+    return np.array(sorted(positions), dtype=np.int64).reshape(-1, 2)
+
+
+def training_state(maze, agent, reward_system, stopping=None):
+    """智能体 Q 表、奖励系统的跨轮状态、提前停止控制器（如有）、random 模块状态和迷宫布局，
+    返回扁平的 {名称: 值}"""
+    version, internal, gauss_next = random.getstate()
+    state = {
+        'maze.grid': maze.grid.copy(),
+        'agent.q_values': agent.q_values.copy(),
+        'agent.exploration_rate': agent.exploration_rate,
+        'rewards.visited_positions': _positions(reward_system._visited_positions),
+        'rng.version': version,
+        'rng.internal': np.array(internal, dtype=np.int64),
+        'rng.gauss_next': gauss_next,
+    }
+    if hasattr(reward_system, '_visited'):  # get_reward 首次调用时才创建
+        state['rewards.visited'] = _positions(reward_system._visited)
+    if stopping is not None:
+        state.update({'stopping.previous': stopping.previous.copy(),
+                      'stopping.successes': stopping.successes.copy(), 'stopping.count': stopping.count,
+                      'stopping.streak': stopping.streak, 'stopping.stopped_at': stopping.stopped_at,
+                      'stopping.checks': stopping.checks})
+    return state
+
+
+def restore_training_state(state, maze, agent, reward_system, stopping=None):
+    """把检查点加载到新建的智能体、奖励系统和提前停止控制器中，并恢复 random 模块状态"""
+    if not np.array_equal(state['maze.grid'], maze.grid):
+        raise ValueError("检查点保存时使用的是另一个迷宫")
+    np.copyto(agent.q_values, state['agent.q_values'])
+    agent.exploration_rate = state['agent.exploration_rate']
+    reward_system._visited_positions = set(map(tuple, state['rewards.visited_positions'].tolist()))
+    if 'rewards.visited' in state:
+        reward_system._visited = set(map(tuple, state['rewards.visited'].tolist()))
+    if stopping is not None and 'stopping.previous' in state:
+        np.copyto(stopping.previous, state['stopping.previous'])
+        np.copyto(stopping.successes, state['stopping.successes'])
+        stopping.count, stopping.streak = state['stopping.count'], state['stopping.streak']
+        stopping.stopped_at, stopping.checks = state['stopping.stopped_at'], list(state['stopping.checks'])
+    random.setstate((state['rng.version'], tuple(state['rng.internal'].tolist()), state['rng.gauss_next']))
@@ -0,0 +1,38 @@
+from collections import deque
+
+_MOD = (1 << 61) - 1  # 梅森素数模数，哈希碰撞概率可以忽略
+_BASE = 1_000_003
+
+
+class CycleDetector:
+    """用滚动哈希检测回合内重复出现的 (状态, 动作) 片段
+
+    把最近 window 步的 (格子, 动作) 序列哈希成一个整数，每步 O(1) 更新；
+    同一片段在本回合内第 repeats 次出现时判定智能体在兜圈子。
+    """
+
+    def __init__(self, num_actions, window=8, repeats=3):
+        self.num_actions = num_actions
+        self.window = window
+        self.repeats = repeats
+        self._drop = pow(_BASE, window, _MOD)  # 移出窗口的最早一步的权重
+        self.reset()
+
+    def reset(self):
+        """每回合开始时清空"""
+        self._tokens = deque(maxlen=self.window)
+        self._hash = 0
+        self._seen = {}  # 片段哈希 -> 本回合出现次数
+
+    def push(self, cell, action):
+        """记录一步，返回 True 表示检测到重复循环"""
+        token = cell * self.num_actions + action + 1
+        self._hash = (self._hash * _BASE + token) % _MOD
+        if len(self._tokens) == self.window:
+            self._hash = (self._hash - self._tokens[0] * self._drop) % _MOD
+        self._tokens.append(token)
+        if len(self._tokens) < self.window:
+            return False
+        count = self._seen.get(self._hash, 0) + 1
+        self._seen[self._hash] = count
+        return count >= self.repeats
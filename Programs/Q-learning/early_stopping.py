@@ -0,0 +1,55 @@
+import numpy as np
+
+
+class EarlyStopping:
+    """Q 表、贪心策略和成功率都稳定后提前结束训练
+
+    每 check_every 轮把 Q 表与上一次检查时的副本比较，同时满足以下条件即通过一次检查：
+    Q 表变化量的范数不超过 Q 表范数的 max_delta；贪心动作改变的格子比例不超过
+    max_policy_change；最近 window 轮的成功率不低于 min_success_rate（不足 window 轮不通过）。
+    连续 patience 次检查通过后停止训练。
+    """
+
+    def __init__(self, q_values, check_every=50, patience=3, window=100, min_success_rate=0.9,
+                 max_delta=0.1, max_policy_change=0.15):
+        self.check_every = check_every
+        self.patience = patience
+        self.min_success_rate = min_success_rate
+        self.max_delta = max_delta
+        self.max_policy_change = max_policy_change
+        self.previous = np.array(q_values)  # 上一次检查时的 Q 表
+        self.successes = np.zeros(window, dtype=bool)  # 最近 window 轮是否成功（环形缓冲区）
+        self.count = 0
+        self.streak = 0  # 连续通过的检查次数
+        self.stopped_at = None  # 判定收敛时的轮数
+        self.checks = []
+
+    def update(self, episode, q_values, success):
+        """记录结束的一轮（episode 从 1 开始计），到检查点时做检查；返回 True 表示应停止训练"""
+        self.successes[self.count % len(self.successes)] = success
+        self.count += 1
+        if episode % self.check_every:
+            return False
+        return self.check(episode, q_values)
+
+    def check(self, episode, q_values):
+        """与上一次检查的 Q 表比较；返回 True 表示应停止训练"""
+        delta = float(np.linalg.norm(q_values - self.previous) / max(np.linalg.norm(q_values), 1e-12))
+        policy_change = float(np.mean(q_values.argmax(axis=-1) != self.previous.argmax(axis=-1)))
+        success_rate = float(self.successes[:self.count].mean())
+        np.copyto(self.previous, q_values)
+
+        passed = (delta <= self.max_delta and policy_change <= self.max_policy_change
+                  and success_rate >= self.min_success_rate and self.count >= len(self.successes))
+        self.streak = self.streak + 1 if passed else 0
+        self.checks.append({'episode': episode, 'delta': delta, 'policy_change': policy_change,
+                            'success_rate': success_rate, 'passed': passed})
+        if self.streak >= self.patience and self.stopped_at is None:
+            self.stopped_at = episode
+        return self.stopped_at is not None
+
+    def report(self, episodes):
+        """停止时的轮数、相对计划轮数节省的轮数以及每次检查的结果"""
+        return {'stopped_at': self.stopped_at,
+                'episodes_saved': 0 if self.stopped_at is None else episodes - self.stopped_at,
+                'checks': self.checks}
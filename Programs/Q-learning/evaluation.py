@@ -0,0 +1,99 @@
+import numpy as np
+
+
+def distances_to(successors, target):
+    """每个节点到 target 的最少步数（在反向图上广度优先搜索），到不了的为 -1
+
+    successors: (节点数, 动作数) 的表，successors[n, a] 是节点 n 执行动作 a 后到达的节点
+    """
+    nodes, actions = successors.shape
+    targets = successors.ravel()
+    predecessors = np.repeat(np.arange(nodes), actions)[np.argsort(targets, kind="stable")]
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(targets, minlength=nodes))])
+
+    distance = np.full(nodes, -1, dtype=np.int64)
+    distance[target] = 0
+    frontier = np.array([target])
+    level = 0
+    while len(frontier):
+        level += 1
+        # 一次性取出整层前沿的所有前驱（不规则切片拼接）
+        starts, counts = offsets[frontier], offsets[frontier + 1] - offsets[frontier]
+        slots = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        frontier = np.unique(predecessors[slots])
+        frontier = frontier[distance[frontier] < 0]
+        distance[frontier] = level
+    return distance
+
+
+def hitting_times(successor, starts, target):
+    """确定性策略从每个起点走到 target 的步数（指针倍增），陷入循环的为 -1
+
+    successor[n] 是节点 n 的下一个节点，target 为吸收节点。先构造 2^k 步跳转表
+    （k 到 log2(节点数) 为止），再让所有起点同时按从大到小的跳跃前进、停在 target 之前；
+    走了节点数那么多步仍未到达的，必定已进入循环。
+    """
+    jumps = [successor]
+    for _ in range(len(successor).bit_length() - 1):
+        jumps.append(jumps[-1][jumps[-1]])
+
+    current = np.asarray(starts)
+    moves = np.zeros(len(current), dtype=np.int64)
+    for k in range(len(jumps) - 1, -1, -1):
+        ahead = jumps[k][current]
+        short = ahead != target
+        current = np.where(short, ahead, current)
+        moves += short.astype(np.int64) << k
+    return np.where(successor[current] == target, moves + 1, -1)
+
+
+class PolicyEvaluator:
+    """从所有可达起点同时评估贪心策略
+
+    构造时把迷宫转移表编译成节点表（出口、陷阱各合并为一个吸收节点），并用广度优先搜索
+    求出每个起点到出口的最短步数；evaluate() 只需沿每个格子的贪心动作走。
+    起点是能到达出口的空地（不含墙体、陷阱和出口本身）。
+    """
+
+    def __init__(self, maze):
+        if maze._transitions_dirty:
+            maze.compile_transitions()
+        cells = maze.width * maze.height
+        self.exit, self.trap = cells, cells + 1  # 吸收节点
+        next_cells = maze.next_cell.astype(np.int64)
+        successors = np.where(maze.is_exit[next_cells], self.exit,
+                              np.where(maze.is_trap[next_cells], self.trap, next_cells))
+        sinks = np.array([[self.exit] * successors.shape[1], [self.trap] * successors.shape[1]])
+        self.successors = np.vstack([successors, sinks])
+
+        self.optimal = distances_to(self.successors, self.exit)
+        open_cells = (maze.grid.ravel() != 1) & ~maze.is_trap & ~maze.is_exit  # grid 中 1 为墙体
+        self.starts = np.flatnonzero(open_cells & (self.optimal[:cells] > 0))
+        start = np.flatnonzero(self.starts == maze.cell_id(0, 0))  # reset() 的起点
+        self.start_slot = int(start[0]) if len(start) else None
+
+    def evaluate(self, q_values):
+        """沿 q_values（格子数 × 动作数）的贪心动作从每个起点走到底
+
+        返回 dict：starts（起点数）、success_rate（到达出口的比例）、mean_path_length /
+        mean_optimal_length（成功起点的平均贪心步数 / 最短步数）、path_ratio（两者总和之比）、
+        loops（兜圈子的起点数）、trapped（掉进陷阱的起点数）、start_path_length（从左上角
+        出发的贪心步数，失败为 None）
+        """
+        greedy = q_values.argmax(axis=1)
+        successor = np.append(self.successors[np.arange(len(greedy)), greedy], [self.exit, self.trap])
+        lengths = hitting_times(successor, self.starts, self.exit)
+        trapped = hitting_times(successor, self.starts, self.trap) > 0
+        solved = lengths > 0
+        optimal = self.optimal[self.starts]
+        start_length = -1 if self.start_slot is None else lengths[self.start_slot]
+        return {
+            'starts': len(lengths),
+            'success_rate': float(solved.mean()) if len(lengths) else 0.0,
+            'mean_path_length': float(lengths[solved].mean()) if solved.any() else None,
+            'mean_optimal_length': float(optimal[solved].mean()) if solved.any() else None,
+            'path_ratio': float(lengths[solved].sum() / optimal[solved].sum()) if solved.any() else None,
+            'loops': int((~solved & ~trapped).sum()),
+            'trapped': int(trapped.sum()),
+            'start_path_length': int(start_length) if start_length > 0 else None,
+        }
@@ -1,17 +1,43 @@
 from maze import Maze, create_simple_maze, create_complex_maze, create_spiral_maze
 from agent import QLearningAgent
 from rewards import RewardSystem
-from visualizer import MazeVisualizer
+from cycles import CycleDetector
+from metrics import MetricsWriter, summary_path
+from profiling import StageProfiler
+from evaluation import PolicyEvaluator
+from early_stopping import EarlyStopping
+from checkpoint import load_checkpoint, restore_training_state, save_checkpoint, training_state
+import argparse
+import json
+import random
 import threading
 import time
-import matplotlib.pyplot as plt
 import os
 import datetime
-import os
-Path="C:\\Users\\zhang\\Desktop\\Q-learning走迷宫"
-os.chdir(Path)
-plt.rcParams['font.sans-serif'] = ['SimHei']
-plt.rcParams['axes.unicode_minus'] = False
+import numpy as np
+
+# 可选迷宫及默认训练轮数
+MAZES = {
+    'simple': (create_simple_maze, 3000),  # 简单迷宫 (5x5)
+    'complex': (create_complex_maze, 5000),  # 复杂迷宫 (8x8)
+    'spiral': (create_spiral_maze, 4000),  # 螺旋迷宫 (6x6)
+}
+
+# 每轮截断原因，记录中保存其下标（0 表示未截断）
+TRUNCATIONS = (None, 'max_steps', 'cycle', 'step_budget')
+# 每轮一条指标记录
+METRICS_FIELDS = [('reward', np.float64), ('steps', np.int32), ('success', np.bool_),
+                  ('exploration_rate', np.float32), ('truncated', np.int8)]
+
+
+def _pyplot():
+    """按需导入 matplotlib（无界面训练时不加载）；图表只保存为文件，使用不需要显示器的 Agg 后端"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.rcParams['font.sans-serif'] = ['SimHei']
+    plt.rcParams['axes.unicode_minus'] = False
+    return plt
 
 
 def get_maze_choice():
@@ -23,18 +49,17 @@ def get_maze_choice():
         print("3. 螺旋迷宫 (6x6)")
         choice = input("请输入选项 (1/2/3): ")
 
-        if choice == '1':
-            return create_simple_maze(), 3000  # 简单迷宫训练3000轮
-        elif choice == '2':
-            return create_complex_maze(), 5000  # 复杂迷宫训练5000轮
-        elif choice == '3':
-            return create_spiral_maze(), 4000  # 螺旋迷宫训练4000轮
+        names = {'1': 'simple', '2': 'complex', '3': 'spiral'}
+        if choice in names:
+            create_maze, episodes = MAZES[names[choice]]
+            return create_maze(), episodes
         else:
             print("无效的选项，请重新选择")
 
 
 def plot_training_stats(episode_rewards, success_rates, avg_steps, exploration_rates, save_dir):
     """绘制训练统计图表并保存到指定目录"""
+    plt = _pyplot()
     plt.figure(figsize=(15, 10))
 
     # 创建子图
@@ -69,95 +94,241 @@ def plot_training_stats(episode_rewards, success_rates, avg_steps, exploration_r
     plt.close()
 
 
-def train_agent(maze, episodes=2000, visualize=False):
-    """训练智能体（完整保留统计图表功能）"""
+def _save_checkpoint(path, maze, agent, reward_system, metrics, first_record, episode,
+                     success_count, window_steps, best_reward, steps_used, elapsed, evaluations, stopping):
+    """保存训练状态及训练循环的计数器（episode 为下一轮的编号）"""
+    state = training_state(maze, agent, reward_system, stopping)
+    state.update({'episode': episode, 'success_count': success_count, 'window_steps': window_steps,
+                  'best_reward': best_reward, 'steps_used': steps_used, 'elapsed': elapsed,
+                  'metrics.first_record': first_record, 'evaluations': evaluations})
+    if metrics.path is None:
+        state['metrics.records'] = metrics.records()
+    else:
+        metrics.flush()
+    save_checkpoint(path, state)
+
+
+def train_agent(maze, episodes=2000, visualize=False, agent_params=None, seed=None,
+                save_plots=True, verbose=True, output_dir="output", max_steps=None,
+                step_budget=None, time_budget=None, cycle_window=8, cycle_repeats=3, metrics_path=None,
+                checkpoint_dir=None, checkpoint_every=100, resume=False, profile=False, eval_every=None,
+                early_stopping=None, loop_penalty=False):
+    """训练智能体（完整保留统计图表功能）
+
+    agent_params: 覆盖 QLearningAgent 参数 (learning_rate, discount_factor, exploration_rate)
+    seed: 设置 random 种子，使训练可复现
+    save_plots / verbose: 为 False 时不导入 matplotlib、不打印进度（批量/无界面运行）
+    output_dir: 图表保存在 output_dir/<时间戳>/ 下
+    max_steps: 单轮步数上限（默认 20 × 格子数），超出即截断本轮
+    step_budget / time_budget: 全部训练的总步数 / 墙钟秒数预算，用完后提前结束训练
+    cycle_window / cycle_repeats: 同一段 cycle_window 步的 (状态, 动作) 序列在一轮内
+        出现 cycle_repeats 次即截断本轮；cycle_repeats=0 关闭循环检测
+    metrics_path: 把逐轮指标流式写入该文件（见 metrics.MetricsWriter），不在内存中累积；
+        此时 stats 中的逐轮数组是文件的内存映射。为 None 时全部记录保存在内存中（随轮数增长），
+        每次保存检查点都会重新写入全部记录
+    checkpoint_dir: 每 checkpoint_every 轮及训练结束时把完整训练状态保存到该目录
+    resume: 从 checkpoint_dir 中的检查点继续训练（如果存在）；其余参数需与中断的训练相同，
+        结果与不中断时完全一致
+    profile: 统计训练循环各阶段的耗时（见 profiling.StageProfiler），结果在 stats['profile']
+    eval_every: 每 eval_every 轮从所有起点评估一次贪心策略（见 evaluation.PolicyEvaluator），
+        结果列表在 stats['evaluations']
+    early_stopping: 训练收敛后提前结束（见 early_stopping.EarlyStopping），传入其参数 dict
+        （{} 为默认参数）；None 时训练全部轮数。检查记录和节省的轮数在 stats['early_stopping']
+    loop_penalty: 最近 10 步内回到走过的位置时给予绕路惩罚（见 rewards.RewardSystem）；
+        关闭时每步不维护位置历史
+    """
+    start_time = time.perf_counter()
+    if max_steps is None:
+        max_steps = 20 * maze.width * maze.height
+    if seed is not None:
+        random.seed(seed)
     # 初始化系统和统计变量
-    reward_system = RewardSystem(maze)
-    agent = QLearningAgent(maze, reward_system)
+    reward_system = RewardSystem(maze, penalize_loops=loop_penalty)
+    agent = QLearningAgent(maze, reward_system, **(agent_params or {}))
     if visualize:
+        from visualizer import MazeVisualizer  # pygame 仅在可视化时导入
         visualizer = MazeVisualizer(maze)
         os.environ['SDL_VIDEO_WINDOW_POS'] = "100,100"
 
-    # 训练统计数据容器（必须保留的变量）
-    episode_rewards = []  # 每轮总奖励
-    success_rates = []  # 累计成功率
-    avg_steps_list = []  # 平均步数
-    exploration_rates = []  # 探索率变化
+    # 训练统计（逐轮记录写入 metrics，内存占用不随轮数增长）
+    metrics = MetricsWriter(metrics_path, METRICS_FIELDS)
+    first_record = metrics.count  # 指标文件中已有的记录数
+    profiler = StageProfiler(profile)
+    evaluator = PolicyEvaluator(maze) if eval_every else None
+    evaluations = []  # 每次评估的结果（含轮数 episode）
+    stopping = None if early_stopping is None else EarlyStopping(agent.q_values, **early_stopping)
     success_count = 0  # 成功次数计数器
     total_steps = 0  # 总步数计数器
     best_reward = float('-inf')  # 最佳奖励记录
-
-    print(f"\n开始训练，共{episodes}轮...")
-    for episode in range(episodes):
-        state = maze.reset()
+    steps_used = 0  # 已用总步数（预算用）
+    stop_reason = None  # 提前结束训练的原因：'step_budget' / 'time_budget' / 'converged'
+    cycles = CycleDetector(len(agent.actions), cycle_window, cycle_repeats) if cycle_repeats else None
+    first_episode = 0
+    if resume and checkpoint_dir is not None and os.path.exists(os.path.join(checkpoint_dir, "checkpoint.json")):
+        state = load_checkpoint(checkpoint_dir)
+        restore_training_state(state, maze, agent, reward_system, stopping)
+        first_episode = state['episode']
+        success_count, total_steps = state['success_count'], state['window_steps']
+        best_reward, steps_used = state['best_reward'], state['steps_used']
+        start_time -= state['elapsed']  # 时间预算和 wall_time 包含中断前的训练时间
+        evaluations = list(state.get('evaluations', []))
+        first_record = state['metrics.first_record']
+        metrics.rewind(first_record + first_episode, state.get('metrics.records'))
+        if verbose:
+            print(f"\n从第 {first_episode} 轮继续训练")
+    next_episode = first_episode
+
+    if verbose:
+        print(f"\n开始训练，共{episodes}轮...")
+    for episode in range(first_episode, episodes):
+        if step_budget is not None and steps_used >= step_budget:
+            stop_reason = 'step_budget'
+            break
+        if time_budget is not None and time.perf_counter() - start_time >= time_budget:
+            stop_reason = 'time_budget'
+            break
+        if stopping is not None and stopping.stopped_at is not None:
+            stop_reason = 'converged'
+            break
+        maze.reset()
         episode_reward = 0
         done = False
         steps = 0
+        truncation = None
+        if cycles:
+            cycles.reset()
 
-        # 重置距离记录（如果使用距离奖励）
-        if hasattr(reward_system, '_last_distance'):
-            del reward_system._last_distance
-        print("*******")
+        reward_system.reset()  # 清空每轮的位置历史和距离记录
+        if verbose:
+            print("*******")
         # 单轮训练循环
+        cell = maze.agent_cell
         while not done:
-            action = agent.choose_action(state)
-            action_result = agent.take_action(action)
+            t = profiler.clock()
+            action = agent.choose_action_index(cell)
+            t = profiler.lap('choose_action', t)
+            action_result = agent.take_action_index(action)
+            t = profiler.lap('take_action', t)
 
-            # 更新位置历史（用于防绕路检测）
-            if hasattr(reward_system, 'update_position_history'):
-                reward_system.update_position_history(maze.agent_position)
+            if reward_system.penalize_loops:
+                reward_system.update_position_history(maze.agent_position)  # 用于绕路惩罚
+                t = profiler.lap('position_history', t)
 
             reward = reward_system.get_reward(action_result)
-            next_state = maze.get_state()
+            next_cell = maze.agent_cell
+            t = profiler.lap('get_reward', t)
 
-            agent.update_q_value(state, action, reward, next_state)
+            agent.update(cell, action, reward, next_cell)
+            t = profiler.lap('update', t)
             episode_reward += reward
-            state = next_state
+            cell = next_cell
             steps += 1
             done = action_result['reached_exit'] or action_result['in_trap']
+            if not done:
+                # 截断：不影响本步更新，只结束本轮
+                if steps >= max_steps:
+                    truncation = 'max_steps'
+                elif cycles and cycles.push(cell, action):
+                    truncation = 'cycle'
+                elif step_budget is not None and steps_used + steps >= step_budget:
+                    truncation = 'step_budget'
+                done = truncation is not None
+            profiler.lap('truncation', t)
 
             if visualize and steps % 5 == 0:
                 visualizer.update()
                 time.sleep(0.02)
 
         # 更新统计指标（必须保留的核心逻辑）
+        steps_used += steps
         total_steps += steps
         success_count += int(action_result['reached_exit'])
         best_reward = max(best_reward, episode_reward)
 
         # 记录关键指标（图表数据来源）
-        episode_rewards.append(episode_reward)
-        success_rates.append(success_count / (episode + 1) * 100)
-        avg_steps_list.append(total_steps / (episode + 1))
-        exploration_rates.append(agent.exploration_rate)
+        t = profiler.clock()
+        metrics.write(reward=episode_reward, steps=steps, success=action_result['reached_exit'],
+                      exploration_rate=agent.exploration_rate, truncated=TRUNCATIONS.index(truncation))
+        profiler.lap('metrics', t)
 
         # 训练进度输出
         if (episode + 1) % 100 == 0:
-            print(f"\nEpisode {episode + 1}/{episodes}:")
-            print(f"最近100轮成功率: {(success_count / 100) * 100:.1f}%")
-            print(f"平均步数: {total_steps / 100:.1f}")
-            print(f"最高奖励: {best_reward:.1f}")
+            if verbose:
+                print(f"\nEpisode {episode + 1}/{episodes}:")
+                print(f"最近100轮成功率: {(success_count / 100) * 100:.1f}%")
+                print(f"平均步数: {total_steps / 100:.1f}")
+                print(f"最高奖励: {best_reward:.1f}")
             # 重置窗口统计
             success_count = 0
             total_steps = 0
             best_reward = float('-inf')
-        elif (episode + 1) % 10 == 0:
+        elif verbose and (episode + 1) % 10 == 0:
             print(".", end="", flush=True)
 
+        next_episode = episode + 1
+        if evaluator is not None and next_episode % eval_every == 0:
+            t = profiler.clock()
+            evaluations.append({'episode': next_episode, **evaluator.evaluate(agent.q_values)})
+            profiler.lap('evaluate', t)
+            if verbose:
+                print(f"\n贪心策略评估: {evaluations[-1]['success_rate']:.1%} 的起点能到达出口，"
+                      f"{evaluations[-1]['loops']} 个兜圈子，{evaluations[-1]['trapped']} 个掉入陷阱")
+        converged = stopping is not None and stopping.update(next_episode, agent.q_values,
+                                                             action_result['reached_exit'])
+        if checkpoint_dir is not None and (next_episode % checkpoint_every == 0 or converged) \
+                and next_episode < episodes:
+            _save_checkpoint(checkpoint_dir, maze, agent, reward_system, metrics, first_record, next_episode,
+                             success_count, total_steps, best_reward, steps_used,
+                             time.perf_counter() - start_time, evaluations, stopping)
+
+    if checkpoint_dir is not None:  # 训练结束（含预算用完提前结束）时总是保存
+        _save_checkpoint(checkpoint_dir, maze, agent, reward_system, metrics, first_record, next_episode,
+                         success_count, total_steps, best_reward, steps_used,
+                         time.perf_counter() - start_time, evaluations, stopping)
+    metrics.close()
+    records = metrics.records()[first_record:]
+    # 成功率 / 平均步数曲线：与进度输出一致，每 100 轮重新累计，除以已训练轮数
+    index = np.arange(len(records))
+    window_start = index - index % 100
+    success_sums = np.concatenate([[0], np.cumsum(records['success'])])
+    step_sums = np.concatenate([[0], np.cumsum(records['steps'], dtype=np.int64)])
+    counts = np.bincount(records['truncated'], minlength=len(TRUNCATIONS))
+    stats = {
+        'rewards': records['reward'],
+        'success_rates': (success_sums[index + 1] - success_sums[window_start]) / (index + 1) * 100,
+        'avg_steps': (step_sums[index + 1] - step_sums[window_start]) / (index + 1),
+        'exploration_rates': records['exploration_rate'],
+        'successes': records['success'],
+        'episode_steps': records['steps'],
+        'truncated': records['truncated'],  # TRUNCATIONS 的下标
+        'truncations': {reason: int(n) for reason, n in zip(TRUNCATIONS[1:], counts[1:]) if n},
+        'total_steps': steps_used,
+        'stop_reason': stop_reason,
+        'wall_time': time.perf_counter() - start_time,
+        'profile': profiler,
+        'evaluations': evaluations,
+        'early_stopping': None if stopping is None else stopping.report(episodes),
+    }
+    if verbose and (stop_reason or stats['truncations']):
+        print(f"\n截断: {stats['truncations']}，提前结束: {stop_reason}（完成 {len(records)}/{episodes} 轮）")
+    if not save_plots:
+        return agent, maze, stats
+
     # 图表保存功能（必须保留的核心部分）
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    output_dir = os.path.join("output", timestamp)
+    output_dir = os.path.join(output_dir, timestamp)
     os.makedirs(output_dir, exist_ok=True)
 
+    plt = _pyplot()
     plt.figure(figsize=(15, 10))
-    metrics = [
-        ('每轮奖励', episode_rewards),
-        ('成功率(%)', success_rates),
-        ('平均步数', avg_steps_list),
-        ('探索率', exploration_rates)
+    curves = [
+        ('每轮奖励', stats['rewards']),
+        ('成功率(%)', stats['success_rates']),
+        ('平均步数', stats['avg_steps']),
+        ('探索率', stats['exploration_rates'])
     ]
 
-    for i, (title, data) in enumerate(metrics, 1):
+    for i, (title, data) in enumerate(curves, 1):
         plt.subplot(2, 2, i)
         plt.plot(data)
         plt.title(title)
@@ -167,13 +338,10 @@ def train_agent(maze, episodes=2000, visualize=False):
     plt.savefig(os.path.join(output_dir, 'training_stats.png'))
     plt.close()
 
-    print(f"\n训练完成！图表已保存至: {output_dir}")
-    return agent, maze, {
-        'rewards': episode_rewards,
-        'success_rates': success_rates,
-        'avg_steps': avg_steps_list,
-        'exploration_rates': exploration_rates
-    }
+    if verbose:
+        print(f"\n训练完成！图表已保存至: {output_dir}")
+    stats['output_dir'] = output_dir
+    return agent, maze, stats
 
 def test_agent(agent, maze, visualize=False):
     """测试训练好的智能体"""
@@ -182,6 +350,7 @@ def test_agent(agent, maze, visualize=False):
     steps = 0
 
     if visualize:
+        from visualizer import MazeVisualizer
         visualizer = MazeVisualizer(maze)
 
     print("\n开始测试训练好的智能体:")
@@ -203,15 +372,109 @@ def test_agent(agent, maze, visualize=False):
             break
 
 
-if __name__ == "__main__":
-    # 确保output目录存在
-    os.makedirs("output", exist_ok=True)
-
-    # 获取用户选择的地图和对应的训练轮数
-    maze, episodes = get_maze_choice()
+def metrics_path(args):
+    """--metrics，未指定时为 --output-dir 下的 metrics.bin（内存占用恒定；新训练覆盖旧文件，
+    --resume 时续写）"""
+    if args.metrics is not None:
+        return args.metrics
+    path = os.path.join(args.output_dir, "metrics.bin")
+    if args.resume:
+        return path if os.path.exists(path) else None  # 与中断的训练保持同一模式
+    for stale in (path, summary_path(path)):
+        if os.path.exists(stale):
+            os.remove(stale)
+    os.makedirs(args.output_dir, exist_ok=True)
+    return path
+
+
+def early_stopping_params(args):
+    """由 --early-stop / --stop-* 参数得到 EarlyStopping 的参数（未启用时为 None）"""
+    if not args.early_stop:
+        return None
+    return {'check_every': args.stop_check_every, 'patience': args.stop_patience,
+            'min_success_rate': args.stop_min_success, 'max_delta': args.stop_max_delta,
+            'max_policy_change': args.stop_max_policy_change}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="训练 Q-learning 智能体走迷宫")
+    parser.add_argument("--maze", choices=sorted(MAZES), default='simple', help="迷宫类型")
+    parser.add_argument("--episodes", type=int, default=None, help="训练轮数（默认按迷宫类型）")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    parser.add_argument("--output-dir", default="output", help="图表和 summary.json 的保存目录")
+    parser.add_argument("--no-plots", action="store_true", help="不保存图表（不导入 matplotlib）")
+    parser.add_argument("--render", action="store_true", help="训练后用 pygame 窗口演示测试过程")
+    parser.add_argument("--interactive", action="store_true", help="通过菜单选择迷宫")
+    parser.add_argument("--quiet", action="store_true", help="不打印训练进度")
+    parser.add_argument("--max-steps", type=int, default=None, help="单轮步数上限（默认 20 × 格子数）")
+    parser.add_argument("--step-budget", type=int, default=None, help="训练总步数预算")
+    parser.add_argument("--time-budget", type=float, default=None, help="训练墙钟时间预算（秒）")
+    parser.add_argument("--no-cycle-check", action="store_true", help="关闭兜圈子检测")
+    parser.add_argument("--loop-penalty", action="store_true", help="最近 10 步内回到走过的位置时给予绕路惩罚")
+    parser.add_argument("--metrics", default=None, help="逐轮指标流式写入该文件（已存在则续写；默认 --output-dir 下的 metrics.bin）")
+    parser.add_argument("--checkpoint-dir", default=None, help="检查点保存目录")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="每隔多少轮保存一次检查点")
+    parser.add_argument("--resume", action="store_true", help="从 --checkpoint-dir 中的检查点继续训练")
+    parser.add_argument("--profile", action="store_true", help="打印训练循环各阶段的耗时分解")
+    parser.add_argument("--profile-json", default=None, help="把各阶段耗时写入该 JSON 文件")
+    parser.add_argument("--eval-every", type=int, default=None, help="每隔多少轮从所有起点评估一次贪心策略")
+    parser.add_argument("--early-stop", action="store_true", help="Q 值、贪心策略和成功率都收敛后提前结束训练")
+    parser.add_argument("--stop-check-every", type=int, default=50, help="每隔多少轮做一次收敛检查")
+    parser.add_argument("--stop-patience", type=int, default=3, help="连续通过多少次检查后停止")
+    parser.add_argument("--stop-min-success", type=float, default=0.9, help="判定收敛的最低滚动成功率")
+    parser.add_argument("--stop-max-delta", type=float, default=0.1, help="两次检查间 Q 表变化量与 Q 表范数之比的上限")
+    parser.add_argument("--stop-max-policy-change", type=float, default=0.15,
+                        help="两次检查间贪心动作改变的格子比例上限")
+    args = parser.parse_args(argv)
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.interactive:
+        maze, episodes = get_maze_choice()
+    else:
+        create_maze, episodes = MAZES[args.maze]
+        maze = create_maze()
+    if args.episodes is not None:
+        episodes = args.episodes
 
     # 训练智能体（不带可视化，因为会干扰训练过程）
-    agent, maze, stats = train_agent(maze, episodes=episodes, visualize=False)
+    agent, maze, stats = train_agent(maze, episodes=episodes, visualize=False, seed=args.seed,
+                                     save_plots=not args.no_plots, verbose=not args.quiet,
+                                     output_dir=args.output_dir, max_steps=args.max_steps,
+                                     step_budget=args.step_budget, time_budget=args.time_budget,
+                                     cycle_repeats=0 if args.no_cycle_check else 3, loop_penalty=args.loop_penalty,
+                                     metrics_path=metrics_path(args), checkpoint_dir=args.checkpoint_dir,
+                                     checkpoint_every=args.checkpoint_every, resume=args.resume,
+                                     profile=args.profile or args.profile_json is not None,
+                                     eval_every=args.eval_every, early_stopping=early_stopping_params(args))
+
+    successes = stats['successes']
+    steps = stats['episode_steps'][successes]
+    summary = {
+        'episodes': len(successes),
+        'success_rate': float(successes.mean()) if len(successes) else 0.0,
+        'mean_steps_to_goal': float(steps.mean()) if len(steps) else None,
+        'truncations': stats['truncations'],
+        'stop_reason': stats['stop_reason'],
+        'wall_time': stats['wall_time'],
+        'greedy_policy': stats['evaluations'][-1] if stats['evaluations'] else None,
+        'episodes_saved': stats['early_stopping']['episodes_saved'] if stats['early_stopping'] else 0,
+    }
+    print(json.dumps(summary, ensure_ascii=False))
+    if args.profile:
+        print(stats['profile'].report())
+    if args.profile_json is not None:
+        stats['profile'].dump(args.profile_json)
+    summary_dir = stats.get('output_dir', args.output_dir)
+    os.makedirs(summary_dir, exist_ok=True)
+    with open(os.path.join(summary_dir, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump({'args': vars(args), **summary}, f, ensure_ascii=False, indent=2)
+
+    if args.render:
+        # 测试智能体（带可视化）
+        test_agent(agent, maze, visualize=True)
+    return agent, maze, stats
 
-    # 测试智能体（带可视化）
-    test_agent(agent, maze, visualize=True)
\ No newline at end of file
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 import numpy as np
 
+# 动作顺序：上、下、左、右（与智能体的 actions 列表一致）
+ACTION_EFFECTS = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+
 
 class Maze:
     def __init__(self, width=10, height=10):
@@ -10,29 +13,42 @@ class Maze:
         self.trap_positions = set()  # 陷阱位置
         self.exit_position = None  # 出口位置
         self.agent_position = None  # 智能体位置
+        self.agent_cell = None  # 智能体所在格子编号 (y * width + x)
+        self._transitions_dirty = True  # 布局改变后需重新编译转移表
 
     def add_wall(self, x, y):
         """添加墙体"""
         if 0 <= x < self.width and 0 <= y < self.height:
             self.wall_positions.add((x, y))
             self.grid[y, x] = 1  # 1表示墙体
+            self._transitions_dirty = True
+
+    def remove_wall(self, x, y):
+        """移除墙体（打开通路）"""
+        if (x, y) in self.wall_positions:
+            self.wall_positions.discard((x, y))
+            self.grid[y, x] = 0
+            self._transitions_dirty = True
 
     def add_trap(self, x, y):
         """添加陷阱"""
         if 0 <= x < self.width and 0 <= y < self.height:
             self.trap_positions.add((x, y))
             self.grid[y, x] = 2  # 2表示陷阱
+            self._transitions_dirty = True
 
     def set_exit(self, x, y):
         """设置出口"""
         if 0 <= x < self.width and 0 <= y < self.height:
             self.exit_position = (x, y)
             self.grid[y, x] = 3  # 3表示出口
+            self._transitions_dirty = True
 
     def set_agent_position(self, x, y):
         """设置智能体位置"""
         if 0 <= x < self.width and 0 <= y < self.height:
             self.agent_position = (x, y)
+            self.agent_cell = y * self.width + x
 
     def is_valid_position(self, x, y):
         """检查位置是否有效（不超出边界且不是墙体）"""
@@ -44,9 +60,57 @@ class Maze:
         """获取当前状态"""
         return self.agent_position
 
+    def cell_id(self, x, y):
+        """坐标转格子编号"""
+        return y * self.width + x
+
+    def compile_transitions(self):
+        """编译转移表 next_cell[格子, 动作] 以及陷阱/出口标记数组（布局不变时只需一次）"""
+        blocked = np.zeros((self.height, self.width), dtype=bool)
+        for x, y in self.wall_positions:
+            blocked[y, x] = True
+
+        ys, xs = np.indices((self.height, self.width))
+        cells = ys * self.width + xs
+        self.next_cell = np.empty((self.width * self.height, len(ACTION_EFFECTS)), dtype=np.int32)
+        for action, (dx, dy) in enumerate(ACTION_EFFECTS):
+            nx = np.clip(xs + dx, 0, self.width - 1)
+            ny = np.clip(ys + dy, 0, self.height - 1)
+            # 越界的移动被夹回原格；撞墙同样留在原格
+            moved = ((nx != xs) | (ny != ys)) & ~blocked[ny, nx]
+            self.next_cell[:, action] = np.where(moved, ny * self.width + nx, cells).ravel()
+
+        self.is_trap = np.zeros(self.width * self.height, dtype=bool)
+        for x, y in self.trap_positions:
+            self.is_trap[self.cell_id(x, y)] = True
+        self.is_exit = np.zeros(self.width * self.height, dtype=bool)
+        if self.exit_position is not None:
+            self.is_exit[self.cell_id(*self.exit_position)] = True
+        self._transitions_dirty = False
+
+    def move(self, action_index):
+        """按转移表移动智能体，返回 (新格子编号, 是否移动)"""
+        if self._transitions_dirty:
+            self.compile_transitions()
+        next_cell = self.next_cell.item(self.agent_cell, action_index)
+        if next_cell == self.agent_cell:
+            return next_cell, False
+        self.agent_cell = next_cell
+        self.agent_position = (next_cell % self.width, next_cell // self.width)
+        return next_cell, True
+
+    def step_many(self, cells, actions):
+        """批量移动多个智能体：返回 (新格子编号, 是否陷阱, 是否出口)"""
+        if self._transitions_dirty:
+            self.compile_transitions()
+        next_cells = self.next_cell[cells, actions]
+        return next_cells, self.is_trap[next_cells], self.is_exit[next_cells]
+
     def reset(self):
         """重置迷宫"""
-        self.agent_position = (0, 0)  # 默认从左上角开始
+        self.set_agent_position(0, 0)  # 默认从左上角开始
+        if self._transitions_dirty:
+            self.compile_transitions()
         return self.get_state()
 
 
@@ -86,8 +150,8 @@ def create_complex_maze():
     for y in range(2, 7):
         maze.add_wall(5, y)
     # 留出通路
-    maze.wall_positions.discard((2, 4))  # 打开一个口
-    maze.wall_positions.discard((5, 5))  # 打开一个口
+    maze.remove_wall(2, 4)  # 打开一个口
+    maze.remove_wall(5, 5)  # 打开一个口
     # 陷阱
     maze.add_trap(3, 3)
     maze.add_trap(4, 4)
@@ -0,0 +1,150 @@
+import json
+import os
+import time
+
+import numpy as np
+
+MAGIC = b"METRICS1"
+HEADER_SIZE = 512  # 文件头：魔数 + JSON 字段列表（空格补齐），之后是记录
+
+
+class MetricsWriter:
+    def __init__(self, path, fields, buffer_size=1024, flush_seconds=5.0):
+        """逐轮训练指标写入器，内存占用恒定
+
+        每轮一条定长记录（NumPy 结构化 dtype），先写入预分配的缓冲区，缓冲区写满或
+        距上次写盘超过 flush_seconds 秒时追加到二进制文件；进程被杀最多丢失一个缓冲区。
+        每次写盘还会向摘要文件追加一行 JSON（本批记录各字段的均值），训练中即可查看。
+
+        path: 二进制指标文件，已存在且字段相同时续写；None 时记录保存在内存中（不写文件，
+            内存占用随记录数增长，只有写文件时内存才恒定）
+        fields: 一条记录的 (字段名, dtype) 列表
+        buffer_size: 两次写盘之间缓冲的记录数
+        flush_seconds: 记录在缓冲区中停留的最长时间
+        """
+        self.path = path
+        self.dtype = np.dtype(fields)
+        self.flush_seconds = flush_seconds
+        self._buffer = np.zeros(buffer_size, dtype=self.dtype)
+        self._pending = 0
+        self._last_flush = time.perf_counter()
+        self._chunks = []  # 仅内存模式使用
+        self.count = 0  # 已写入的记录数（含文件中原有的记录）
+
+        if path is None:
+            self._file = self._summary_file = None
+            return
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE:
+            existing = _read_header(path)
+            if existing != self.dtype:
+                raise ValueError(f"{path} 中的记录格式为 {existing}，与 {self.dtype} 不符")
+            # 去掉被杀进程留下的不完整末尾记录
+            self.count = (os.path.getsize(path) - HEADER_SIZE) // self.dtype.itemsize
+            with open(path, "r+b") as f:
+                f.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+            self._file = open(path, "ab")
+        else:
+            self._file = open(path, "wb")
+            self._file.write(_header(self.dtype))
+            self._file.flush()
+        self._summary_file = open(summary_path(path), "a")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, **values):
+        """追加一条记录，未给出的字段记为 0"""
+        self._buffer[self._pending] = tuple(values.get(name, 0) for name in self.dtype.names)
+        self._pending += 1
+        self.count += 1
+        if self._pending == len(self._buffer) or time.perf_counter() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self):
+        """把缓冲区中的记录和对应的摘要行写入文件"""
+        self._last_flush = time.perf_counter()
+        if not self._pending:
+            return
+        chunk = self._buffer[:self._pending]
+        if self._file is None:
+            self._chunks.append(chunk.copy())
+        else:
+            self._file.write(chunk.tobytes())
+            self._file.flush()
+            summary = {'first': self.count - self._pending, 'count': self._pending}
+            summary.update({name: float(chunk[name].mean()) for name in self.dtype.names})
+            self._summary_file.write(json.dumps(summary) + "\n")
+            self._summary_file.flush()
+        self._pending = 0
+
+    def rewind(self, count, records=None):
+        """只保留前 count 条记录（从检查点恢复时使用）；内存模式下 records 为恢复的记录"""
+        self._pending = 0
+        self.count = count
+        if self._file is None:
+            self._chunks = [np.array(records, dtype=self.dtype)]
+            return
+        self._file.truncate(HEADER_SIZE + count * self.dtype.itemsize)
+        with open(summary_path(self.path)) as f:
+            lines = [line for line in f if sum(json.loads(line)[key] for key in ('first', 'count')) <= count]
+        self._summary_file.seek(0)
+        self._summary_file.truncate()
+        self._summary_file.writelines(lines)
+        self._summary_file.flush()
+
+    def records(self):
+        """目前为止的全部记录（文件模式下为文件的只读内存映射）"""
+        self.flush()
+        if self._file is None:
+            return np.concatenate(self._chunks) if self._chunks else np.zeros(0, dtype=self.dtype)
+        return read_metrics(self.path)
+
+    def close(self):
+        self.flush()
+        for f in (self._file, self._summary_file):
+            if f is not None:
+                f.close()
+
+
+def summary_path(path):
+    """指标文件旁的摘要 JSONL 文件"""
+    return os.path.splitext(path)[0] + "_summary.jsonl"
+
+
+def _header(dtype):
+    text = json.dumps([[name, dtype[name].str] for name in dtype.names]).encode()
+    if len(MAGIC) + len(text) + 1 > HEADER_SIZE:
+        raise ValueError("指标字段过多，文件头放不下")
+    return (MAGIC + text).ljust(HEADER_SIZE - 1) + b"\n"
+
+
+def _read_header(path):
+    with open(path, "rb") as f:
+        header = f.read(HEADER_SIZE)
+    if not header.startswith(MAGIC):
+        raise ValueError(f"{path} 不是指标文件")
+    return np.dtype([tuple(field) for field in json.loads(header[len(MAGIC):])])
+
+
+def read_metrics(path):
+    """以内存映射读取指标文件中的完整记录（训练写入过程中也可读取），返回每轮一行的结构化数组"""
+    dtype = _read_header(path)
+    count = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(count,))
+
+
+def downsample(records, points=1000):
+    """降采样：把记录按顺序分成至多 points 段，返回 {字段名: 各段均值}，'episode' 为各段最后一轮的编号"""
+    bucket = max(1, -(-len(records) // points))
+    starts = np.arange(0, len(records), bucket)
+    ends = np.minimum(starts + bucket, len(records))
+    result = {'episode': ends - 1}
+    for name in records.dtype.names:
+        values = np.asarray(records[name], dtype=np.float64)
+        result[name] = np.add.reduceat(values, starts) / (ends - starts) if len(starts) else values
+    return result
@@ -0,0 +1,64 @@
+import json
+import time
+
+
+def _no_clock():
+    return 0
+
+
+def _no_lap(stage, started):
+    return 0
+
+
+class StageProfiler:
+    """按阶段统计循环中每一段代码的调用次数和累计耗时（perf_counter_ns）
+
+    各阶段首尾相接计时：clock() 开始第一段，每次 lap() 结束一段并返回下一段的起点，
+    相邻两段之间只读一次时钟：
+
+        t = profiler.clock()
+        action_result = agent.take_action_index(action)
+        t = profiler.lap('take_action', t)
+
+    enabled=False 时 clock / lap 换成直接返回 0 的函数，循环里每段只多一次空调用。
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.calls = {}
+        self.total_ns = {}
+        if not enabled:
+            self.clock = _no_clock
+            self.lap = _no_lap
+
+    def clock(self):
+        return time.perf_counter_ns()
+
+    def lap(self, stage, started):
+        """把从 started 到现在的时间记到 stage 上，返回当前时钟"""
+        now = time.perf_counter_ns()
+        self.calls[stage] = self.calls.get(stage, 0) + 1
+        self.total_ns[stage] = self.total_ns.get(stage, 0) + now - started
+        return now
+
+    def to_dict(self):
+        """{阶段: {'calls', 'total_ns', 'mean_ns'}}，按首次出现的顺序"""
+        return {stage: {'calls': calls, 'total_ns': self.total_ns[stage],
+                        'mean_ns': self.total_ns[stage] / calls}
+                for stage, calls in self.calls.items()}
+
+    def report(self):
+        """耗时分解表，最慢的阶段在前"""
+        total = sum(self.total_ns.values()) or 1
+        lines = [f"{'stage':<20} {'calls':>10} {'total ms':>10} {'mean us':>9} {'share':>7}"]
+        for stage in sorted(self.calls, key=self.total_ns.get, reverse=True):
+            ns = self.total_ns[stage]
+            lines.append(f"{stage:<20} {self.calls[stage]:>10} {ns / 1e6:>10.1f} "
+                         f"{ns / self.calls[stage] / 1e3:>9.2f} {ns / total:>7.1%}")
+        lines.append(f"{'total':<20} {'':>10} {total / 1e6:>10.1f}")
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """把 to_dict() 写成 JSON 文件"""
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
@@ -1,6 +1,13 @@
 class RewardSystem:
-    def __init__(self, maze):
+    """奖励系统
+
+    penalize_loops: 最近 history_size 步内回到走过的位置时扣除 loop_penalty（绕路惩罚）；
+    关闭时不使用位置历史，训练循环也不调用 update_position_history
+    """
+
+    def __init__(self, maze, history_size=10, penalize_loops=False):
         self.maze=maze
+        self.penalize_loops = penalize_loops
         # 根据迷宫大小调整奖励值
         if maze.width <= 5 or maze.height <= 5: # 简单迷宫
             self.rewards = {
@@ -26,7 +33,18 @@ class RewardSystem:
         })
         # 新增状态跟踪
         self._visited_positions = set()
-        self._position_history = []
+        # 最近 history_size 步位置的环形缓冲区，以及其中各位置的出现次数（增量维护）
+        self._history_size = history_size
+        self._position_history = [None] * history_size
+        self.reset()
+
+    def reset(self):
+        """清空每轮的状态（位置历史、距离记录），每轮开始时调用"""
+        self._position_history[:] = [None] * self._history_size
+        self._history_pos = 0  # 下一次写入的位置
+        self._position_counts = {}  # 位置 -> 在缓冲区中的出现次数
+        self._repeats = 0  # 缓冲区中重复出现的次数之和（sum(count - 1)）
+        self._last_distance = None
 
     def _is_new_area(self, pos):
         """检查是否探索新区域"""
@@ -36,15 +54,25 @@ class RewardSystem:
         return False
 
     def _is_repeating_path(self):
-        """检测是否在绕路（最近5步有重复位置）"""
-        hist = self._position_history[-10:]  # 检查最近10步
-        return len(hist) != len(set(hist))  # 有重复位置
+        """检测是否在绕路（最近 history_size 步有重复位置），O(1)"""
+        return self._repeats > 0
 
     def update_position_history(self, pos):
-        """更新位置历史（需在get_reward外部调用）"""
-        self._position_history.append(pos)
-        if len(self._position_history) > 20:  # 限制历史长度
-            self._position_history.pop(0)
+        """更新位置历史（需在get_reward外部调用）：覆盖最早的一步并增量更新计数"""
+        counts = self._position_counts
+        oldest = self._position_history[self._history_pos]
+        if oldest is not None:
+            count = counts[oldest] - 1
+            if count:
+                counts[oldest] = count
+                self._repeats -= 1
+            else:
+                del counts[oldest]
+        self._position_history[self._history_pos] = pos
+        self._history_pos = (self._history_pos + 1) % self._history_size
+        count = counts.get(pos, 0)
+        counts[pos] = count + 1
+        self._repeats += count > 0
     def _manhattan_distance(self, pos1, pos2):
         """计算两个坐标之间的曼哈顿距离"""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
@@ -72,4 +100,7 @@ class RewardSystem:
         explore_bonus = 1.5 if current_pos not in self._visited else 0
         self._visited.add(current_pos)
 
-        return dist_reward + explore_bonus
\ No newline at end of file
+        # 绕路惩罚（最近几步回到了走过的位置）
+        loop_penalty = self.rewards['loop_penalty'] if self.penalize_loops and self._is_repeating_path() else 0
+
+        return dist_reward + explore_bonus - loop_penalty
\ No newline at end of file
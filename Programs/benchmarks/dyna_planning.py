@@ -0,0 +1,60 @@
+"""Environment steps and wall time to a target success rate with and without Dyna-Q planning.
+
+An agent has converged once the success rate over the last --window episodes reaches
+--target. Wall time to that point is estimated from the run's average time per
+environment step.
+
+Run from the repository root:
+    python Programs/benchmarks/dyna_planning.py --sizes 10 20
+"""
+import argparse
+
+import numpy as np
+
+from variants import load_variant
+
+
+def steps_to_target(successes, episode_steps, window, target):
+    """Environment steps taken until the rolling success rate first reaches target (None if never)"""
+    rolling = np.convolve(successes, np.ones(window) / window, mode="valid")
+    hits = np.flatnonzero(rolling >= target)
+    return int(episode_steps[:hits[0] + window].sum()) if len(hits) else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variants", nargs="+", default=["Q-learning+PER+KeyBlock", "Q-learning+PER"])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10])
+    parser.add_argument("--planning-steps", type=int, nargs="+", default=[0, 10, 50])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1])
+    parser.add_argument("--episodes", type=int, default=150)
+    parser.add_argument("--window", type=int, default=20)
+    parser.add_argument("--target", type=float, default=0.9)
+    args = parser.parse_args()
+
+    print(f"{'variant':>24} {'size':>5} {'planning':>8} {'converged':>9} {'env steps':>10} "
+          f"{'wall (s)':>9} {'late success':>13}")
+    for variant in args.variants:
+        main_module, maze_module = load_variant(variant, "main", "maze")
+        for size in args.sizes:
+            for planning_steps in args.planning_steps:
+                steps, seconds, late = [], [], []
+                for seed in args.seeds:
+                    result = main_module.train(seed=seed, env=maze_module.Maze(size=size, seed=seed),
+                                               episodes=args.episodes, render=False, verbose=False,
+                                               agent_params={'planning_steps': planning_steps})
+                    successes, episode_steps = result['successes'], result['episode_steps']
+                    late.append(successes[args.episodes // 2:].mean())
+                    needed = steps_to_target(successes, episode_steps, args.window, args.target)
+                    if needed is not None:
+                        steps.append(needed)
+                        seconds.append(result['wall_time'] * needed / episode_steps.sum())
+                converged = f"{len(steps)}/{len(args.seeds)}"
+                mean_steps = f"{np.mean(steps):.0f}" if steps else "-"
+                mean_seconds = f"{np.mean(seconds):.2f}" if seconds else "-"
+                print(f"{variant:>24} {size:>5} {planning_steps:>8} {converged:>9} {mean_steps:>10} "
+                      f"{mean_seconds:>9} {np.mean(late):>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Maze generation rate for the PER and KeyBlock variants, with a reachability check.
+
+Run from the repository root:
+    python Programs/benchmarks/maze_generation.py
+"""
+import argparse
+import time
+
+import numpy as np
+
+from variants import load_variant
+
+
+def check_reachable(maze):
+    """True if start, key (KeyBlock only) and goal are connected in the generated maze"""
+    if hasattr(maze, "key_pos"):
+        return (maze._path_exists(maze.start, maze.key_pos, maze.obstacles) and
+                maze._path_exists(maze.key_pos, maze.goal, maze.obstacles))
+    return maze._path_exists(maze.obstacles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent generating per size")
+    parser.add_argument("--checks", type=int, default=20, help="mazes per size verified with BFS")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'variant':>24} {'size':>5} {'mazes/s':>9} {'density':>8} {'reachable':>10}")
+    for variant in ("Q-learning+PER", "Q-learning+PER+KeyBlock"):
+        maze_module, = load_variant(variant, "maze")
+        for size in args.sizes:
+            np.random.seed(args.seed)
+            built = 0
+            start = time.perf_counter()
+            while time.perf_counter() - start < args.min_time:
+                maze = maze_module.Maze(size=size)
+                built += 1
+            rate = built / (time.perf_counter() - start)
+
+            reachable = 0
+            for _ in range(args.checks):
+                maze = maze_module.Maze(size=size)
+                reachable += check_reachable(maze)
+            density = len(maze.obstacles) / size ** 2
+            print(f"{variant:>24} {size:>5} {rate:>9.0f} {density:>8.2f} {reachable:>5}/{args.checks}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Wall time to converge with 1..N Hogwild learner processes on the KeyBlock maze.
+
+Every run trains with parallel.train_parallel and has converged once the shared greedy
+policy solves --target of the start cells. The 1-worker run is the reference for the speedup
+and for the final policy quality of the other runs. With the default per-worker replay it is
+single-process training (it reproduces train() exactly); --no-replay learns online from every
+transition instead, which train() never does.
+
+Run from the repository root:
+    python Programs/benchmarks/parallel_scaling.py --sizes 30 50 --workers 1 2 4 8 16 32
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from variants import PROGRAMS_DIR
+
+# Workers import the variant's modules by name, so its directory stays on the path for any start method
+sys.path.insert(0, os.path.join(PROGRAMS_DIR, "Q-learning+PER+KeyBlock"))
+from maze import Maze  # noqa: E402
+from parallel import train_parallel  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[30])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1])
+    parser.add_argument("--episodes", type=int, default=20000, help="episode budget of each run")
+    parser.add_argument("--target", type=float, default=0.9, help="greedy success rate that counts as converged")
+    parser.add_argument("--eval-interval", type=float, default=0.2)
+    parser.add_argument("--lock-stripes", type=int, default=0)
+    parser.add_argument("--no-replay", action="store_true",
+                        help="learn online from each transition instead of per-worker replay buffers")
+    args = parser.parse_args()
+
+    mode = "online updates" if args.no_replay else "per-worker replay, the 1-worker run reproduces train()"
+    print(f"Reference: 1 worker, {mode}")
+    print(f"{'size':>5} {'workers':>7} {'converged':>9} {'seconds':>8} {'speedup':>8} {'episodes':>9} "
+          f"{'greedy success':>15} {'path ratio':>11}")
+    for size in args.sizes:
+        reference = None
+        for workers in args.workers:
+            seconds, episodes, success, ratio = [], [], [], []
+            for seed in args.seeds:
+                result = train_parallel(workers=workers, seed=seed, env=Maze(size=size, seed=seed),
+                                        episodes=args.episodes, replay=not args.no_replay,
+                                        lock_stripes=args.lock_stripes, eval_interval=args.eval_interval,
+                                        target_success_rate=args.target, verbose=False)
+                final = result['evaluations'][-1]
+                success.append(final['success_rate'])
+                ratio.append(final['path_ratio'] or np.nan)
+                if result['time_to_converge'] is not None:
+                    seconds.append(result['time_to_converge'])
+                    episodes.append(final['episodes'])
+            mean_seconds = np.mean(seconds) if len(seconds) == len(args.seeds) else None
+            if workers == 1:
+                reference = mean_seconds
+            speedup = f"{reference / mean_seconds:.2f}" if reference and mean_seconds else "-"
+            print(f"{size:>5} {workers:>7} {len(seconds)}/{len(args.seeds):<7} "
+                  f"{'-' if mean_seconds is None else f'{mean_seconds:.2f}':>8} {speedup:>8} "
+                  f"{np.mean(episodes) if episodes else float('nan'):>9.0f} {np.mean(success):>15.3f} "
+                  f"{np.nanmean(ratio):>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
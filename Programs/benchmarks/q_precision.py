@@ -0,0 +1,67 @@
+"""Convergence and memory of float64 / float32 / float16 Q-tables in the PER and KeyBlock variants.
+
+Each dtype is trained on the same seeded mazes; the success rate over the last half of
+training is compared with the float64 run, and bytes per component are reported.
+
+Run from the repository root:
+    python Programs/benchmarks/q_precision.py
+"""
+import argparse
+
+import numpy as np
+
+from variants import load_variant
+
+DTYPES = ("float64", "float32", "float16")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variants", nargs="+", default=["Q-learning+PER", "Q-learning+PER+KeyBlock"])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--episodes", type=int, default=200)
+    parser.add_argument("--tolerance", type=float, default=0.05,
+                        help="largest allowed drop in late success rate against float64")
+    parser.add_argument("--memory-size", type=int, default=1000,
+                        help="also report bytes for an untrained agent and buffer on a maze this large")
+    args = parser.parse_args()
+
+    print(f"{'variant':>24} {'dtype':>8} {'late success':>13} {'steps to goal':>14} "
+          f"{'Q-table B':>10} {'total B':>9} {'within tol':>10}")
+    for variant in args.variants:
+        main_module, maze_module, agent_module, memory_module = load_variant(
+            variant, "main", "maze", "agent", "memory")
+        baseline = None
+        for dtype in DTYPES:
+            late_success, steps = [], []
+            for seed in args.seeds:
+                result = main_module.train(seed=seed, episodes=args.episodes, render=False,
+                                           verbose=False, dtype=dtype)
+                half = args.episodes // 2
+                late_success.append(result['successes'][half:].mean())
+                successful = result['episode_steps'][result['successes']]
+                steps.append(successful.mean() if len(successful) else np.nan)
+            success = float(np.mean(late_success))
+            baseline = success if baseline is None else baseline
+            ok = "-" if dtype == "float64" else ("yes" if baseline - success <= args.tolerance else "NO")
+            memory_bytes = result['memory_bytes']
+            print(f"{variant:>24} {dtype:>8} {success:>13.3f} {np.nanmean(steps):>14.1f} "
+                  f"{memory_bytes['q_table']:>10} {memory_bytes['total']:>9} {ok:>10}")
+
+        if args.memory_size:
+            maze = maze_module.Maze(size=args.memory_size, seed=args.seeds[0])
+            state_index = main_module.StateIndex.from_mazes(maze)
+            print(f"  bytes on a {args.memory_size}x{args.memory_size} maze "
+                  f"({len(state_index)} reachable of {maze.size ** 2} cells):")
+            for dtype in DTYPES:
+                agent = agent_module.QLearningAgent(maze.size, maze.size, state_index=state_index, dtype=dtype)
+                memory = memory_module.PrioritizedReplayBuffer(
+                    10000, (maze.size, maze.size), state_index=state_index, **main_module.precision(dtype))
+                report = main_module.memory_report(agent, memory)
+                parts = ", ".join(f"{name}={nbytes / 2 ** 20:.1f}MiB" for name, nbytes in report.items()
+                                  if nbytes >= 2 ** 16)
+                print(f"    {dtype:>8}: {parts}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""Seeded throughput benchmarks for the environment, replay buffer, learner and whole training runs.
+
+Measures, for each variant that has the component:
+  env.step / get_reward / learn  in steps (or batches) per second at each --sizes maze size
+  replay.add / sample / update_priorities  per second at each --capacities buffer capacity
+  train  episodes per second and time (and episodes) to the first success
+
+Results are written as JSON, one record per measurement keyed by name, so two runs can be
+compared; --compare flags every measurement that got worse by more than --tolerance.
+
+The PER and KeyBlock benchmarks run on one maze layout per size, loaded from a maze corpus
+in --corpus-dir (generated on the first run), so both variants and successive runs measure
+the same mazes without regenerating them.
+
+Run from the repository root:
+    python Programs/benchmarks/suite.py --output bench.json
+    python Programs/benchmarks/suite.py --output new.json --compare bench.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from variants import PROGRAMS_DIR, VARIANTS, load_variant
+
+PER_VARIANTS = VARIANTS[1:]  # The variants with Maze.step, a replay buffer and a batched learner
+CHUNK = 1000  # Operations per timed call
+
+
+def throughput(run_chunk, min_time):
+    """Call run_chunk() (which returns the number of operations it did) until min_time has
+    elapsed and return operations per second. One untimed call first warms up lazily built
+    state (e.g. the KeyBlock maze's distance fields)."""
+    run_chunk()
+    operations = 0
+    start = time.perf_counter()
+    while True:
+        operations += run_chunk()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return operations / elapsed
+
+
+def random_walk(env, actions):
+    """Step env through actions (resetting at the goal); returns the (state, next_state, done) list"""
+    transitions = []
+    state = env.reset()
+    for action in actions:
+        next_state, done = env.step(action)
+        transitions.append((state, next_state, done))
+        state = env.reset() if done else next_state
+    return transitions
+
+
+class Suite:
+    def __init__(self, seed, min_time, corpus_dir):
+        self.seed = seed
+        self.min_time = min_time
+        self.corpus_dir = corpus_dir
+        self.results = []
+
+    def maze(self, variant, size):
+        """The seed's size x size maze from the corpus, as a Maze of variant (KeyBlock layout; the
+        PER maze keeps its obstacles and ignores the key)"""
+        (maze_corpus,) = load_variant("Q-learning+PER+KeyBlock", "maze_corpus")
+        os.makedirs(self.corpus_dir, exist_ok=True)
+        path = os.path.join(self.corpus_dir, f"size{size}-seed{self.seed}.mazc")
+        maze = maze_corpus.load_or_build_corpus(path, size, [self.seed]).by_seed(self.seed)
+        if variant == "Q-learning+PER":
+            (maze_module,) = load_variant(variant, "maze")
+            maze = maze_module.Maze(size=size, seed=self.seed, layout=maze.obstacles)
+        return maze
+
+    def record(self, name, value, unit, higher_is_better=True):
+        self.results.append({'name': name, 'value': value, 'unit': unit,
+                             'higher_is_better': higher_is_better})
+        print(f"{name:<72} {value:>14.6g} {unit}", flush=True)
+
+    def env_benchmarks(self, variant, size):
+        (rewards_module,) = load_variant(variant, "rewards")
+        np.random.seed(self.seed)
+        env = self.maze(variant, size)
+        actions = np.random.randint(4, size=CHUNK).tolist()
+        prefix = f"{variant}/size={size}"
+
+        def steps():
+            env.reset()
+            for action in actions:
+                if env.step(action)[1]:
+                    env.reset()
+            return CHUNK
+
+        self.record(f"{prefix}/env.step", throughput(steps, self.min_time), "steps/s")
+
+        transitions = random_walk(env, actions)
+        get_reward = rewards_module.get_reward
+        if variant == "Q-learning+PER":
+            def rewards():
+                for state, next_state, done in transitions:
+                    get_reward(state, next_state, done, env)
+                return CHUNK
+        else:
+            env.reset()
+            max_steps = 4 * size * size
+
+            def rewards():
+                for step_count, (state, next_state, done) in enumerate(transitions):
+                    get_reward(state, next_state, done, env, step_count, max_steps)
+                return CHUNK
+
+        self.record(f"{prefix}/get_reward", throughput(rewards, self.min_time), "calls/s")
+
+    def learn_benchmark(self, variant, size, batch_size):
+        agent_module, memory_module, state_index_module = load_variant(variant, "agent", "memory", "state_index")
+        np.random.seed(self.seed)
+        env = self.maze(variant, size)
+        state_index = state_index_module.StateIndex.from_mazes(env)
+        agent = agent_module.QLearningAgent(size, size, state_index=state_index)
+        memory = memory_module.PrioritizedReplayBuffer(10000, (size, size), state_index=state_index)
+        fill_buffer(variant, memory, env, 10000)
+        batches = [memory.sample(batch_size) for _ in range(100)]
+
+        def learn():
+            for _, batch, weights in batches:
+                if variant == "Q-learning+PER":
+                    agent.learn(batch, weights)
+                else:
+                    agent.learn(batch)
+            return len(batches)
+
+        self.record(f"{variant}/size={size}/agent.learn[batch={batch_size}]",
+                    throughput(learn, self.min_time), "batches/s")
+
+    def replay_benchmarks(self, variant, capacity, size, batch_size):
+        memory_module, state_index_module = load_variant(variant, "memory", "state_index")
+        np.random.seed(self.seed)
+        env = self.maze(variant, size)
+        state_index = state_index_module.StateIndex.from_mazes(env)
+        memory = memory_module.PrioritizedReplayBuffer(capacity, (size, size), state_index=state_index)
+        prefix = f"{variant}/capacity={capacity}"
+
+        transitions = random_walk(env, np.random.randint(4, size=CHUNK).tolist())
+        rewards = np.random.uniform(-1.0, 1.0, CHUNK).tolist()
+        actions = np.random.randint(4, size=CHUNK).tolist()
+
+        def add():
+            for (state, next_state, done), action, reward in zip(transitions, actions, rewards):
+                memory.add(state, action, reward, next_state, done)
+            return CHUNK
+
+        self.record(f"{prefix}/replay.add", throughput(add, self.min_time), "transitions/s")
+
+        fill_buffer(variant, memory, env, capacity)
+        samples = [memory.sample(batch_size) for _ in range(100)]
+        priorities = [np.random.uniform(0.0, 2.0, batch_size) for _ in samples]
+
+        def sample():
+            for _ in range(100):
+                memory.sample(batch_size)
+            return 100
+
+        def update():
+            for (indices, _, _), errors in zip(samples, priorities):
+                memory.update_priorities(indices, errors)
+            return len(samples)
+
+        self.record(f"{prefix}/replay.sample[batch={batch_size}]",
+                    throughput(sample, self.min_time), "batches/s")
+        self.record(f"{prefix}/replay.update_priorities[batch={batch_size}]",
+                    throughput(update, self.min_time), "batches/s")
+
+    def classic_benchmarks(self, size):
+        maze_module, agent_module, rewards_module = load_variant("Q-learning", "maze", "agent", "rewards")
+        maze = maze_module.Maze(size, size)
+        maze.set_exit(size - 1, size - 1)
+        maze.reset()
+        reward_system = rewards_module.RewardSystem(maze)
+        agent = agent_module.QLearningAgent(maze, reward_system)
+        np.random.seed(self.seed)
+        actions = np.random.randint(4, size=CHUNK).tolist()
+        prefix = f"Q-learning/size={size}"
+
+        def steps():
+            maze.reset()
+            for action in actions:
+                if agent.take_action_index(action)['reached_exit']:
+                    maze.reset()
+            return CHUNK
+
+        self.record(f"{prefix}/take_action", throughput(steps, self.min_time), "steps/s")
+
+        maze.reset()
+        results = [agent.take_action_index(action) for action in actions]
+
+        def rewards():
+            maze.reset()
+            reward_system.reset()
+            for action_result in results:
+                if reward_system.penalize_loops:  # As in the trainer
+                    reward_system.update_position_history(maze.agent_position)
+                reward_system.get_reward(action_result)
+            return CHUNK
+
+        self.record(f"{prefix}/get_reward", throughput(rewards, self.min_time), "calls/s")
+
+        cells = np.random.randint(size * size, size=CHUNK).tolist()
+        next_cells = [maze.next_cell.item(cell, action) for cell, action in zip(cells, actions)]
+
+        def update():
+            for cell, action, next_cell in zip(cells, actions, next_cells):
+                agent.update(cell, action, -0.1, next_cell)
+            return CHUNK
+
+        self.record(f"{prefix}/agent.update", throughput(update, self.min_time), "updates/s")
+
+    def training_benchmark(self, variant, episodes):
+        if variant == "Q-learning":
+            main_module, maze_module = load_variant(variant, "main", "maze")
+            start = time.perf_counter()
+            _, _, result = main_module.train_agent(maze_module.create_simple_maze(), episodes=episodes,
+                                                   seed=self.seed, save_plots=False, verbose=False)
+            wall_time = time.perf_counter() - start
+        else:
+            (main_module,) = load_variant(variant, "main")
+            env = self.maze(variant, 10)
+            start = time.perf_counter()
+            result = main_module.train(seed=self.seed, env=env,
+                                       episodes=episodes, render=False, verbose=False)
+            wall_time = time.perf_counter() - start
+        successes = np.asarray(result['successes'], dtype=bool)
+        episode_steps = np.asarray(result['episode_steps'], dtype=np.int64)
+
+        self.record(f"{variant}/train/episodes_per_s", len(successes) / wall_time, "episodes/s")
+        if successes.any():
+            # Wall time up to the end of the first successful episode, prorated by steps taken
+            first = int(np.argmax(successes))
+            seconds = wall_time * episode_steps[:first + 1].sum() / episode_steps.sum()
+            self.record(f"{variant}/train/time_to_first_success", seconds, "s", higher_is_better=False)
+            self.record(f"{variant}/train/episodes_to_first_success", first + 1, "episodes",
+                        higher_is_better=False)
+
+
+def fill_buffer(variant, memory, env, count):
+    """Top memory up to count transitions of a random walk, in bulk"""
+    cells = np.random.choice(env.reachable_cells, count)
+    actions = np.random.randint(4, size=count)
+    next_cells = env.next_cell[cells, actions]
+    rewards = np.random.uniform(-1.0, 1.0, count)
+    dones = np.zeros(count, dtype=bool)
+    if variant == "Q-learning+PER":
+        memory.add_batch(cells, actions, rewards, next_cells, dones)
+    else:
+        has_keys = np.random.random(count) < 0.5
+        memory.add_batch(cells, actions, rewards, next_cells, dones, has_keys, has_keys)
+
+
+def revision():
+    """Short git revision of the working tree (with -dirty if it has changes), or None"""
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=PROGRAMS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, tolerance):
+    """Print each measurement against the baseline run; returns the names that regressed"""
+    previous = {entry['name']: entry for entry in baseline['results']}
+    regressions = []
+    print(f"\n{'benchmark':<72} {'baseline':>12} {'current':>12} {'change':>8}")
+    for entry in results:
+        old = previous.get(entry['name'])
+        if old is None or not old['value']:
+            continue
+        change = entry['value'] / old['value'] - 1
+        worse = -change if entry['higher_is_better'] else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        if flag:
+            regressions.append(entry['name'])
+        print(f"{entry['name']:<72} {old['value']:>12.6g} {entry['value']:>12.6g} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variants", nargs="+", choices=VARIANTS, default=list(VARIANTS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 10, 50, 200])
+    parser.add_argument("--capacities", type=float, nargs="+", default=[1e4, 1e5, 1e6])
+    parser.add_argument("--replay-size", type=int, default=50, help="maze size for the replay benchmarks")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--episodes", type=int, default=300, help="episodes of each end-to-end training run")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds spent timing each benchmark")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus-dir", default=os.path.join(PROGRAMS_DIR, "benchmarks", "corpus"),
+                        help="maze corpus files of the benchmark layouts (built on first use)")
+    parser.add_argument("--skip", nargs="+", default=[], choices=["env", "learn", "replay", "train"])
+    parser.add_argument("--output", default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="baseline JSON file from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="relative slowdown against --compare that counts as a regression")
+    args = parser.parse_args()
+
+    suite = Suite(args.seed, args.min_time, args.corpus_dir)
+    for variant in args.variants:
+        for size in args.sizes:
+            if variant == "Q-learning":
+                if "env" not in args.skip:
+                    suite.classic_benchmarks(size)
+                continue
+            if "env" not in args.skip:
+                suite.env_benchmarks(variant, size)
+            if "learn" not in args.skip:
+                suite.learn_benchmark(variant, size, args.batch_size)
+        if variant in PER_VARIANTS and "replay" not in args.skip:
+            for capacity in map(int, args.capacities):
+                suite.replay_benchmarks(variant, capacity, args.replay_size, args.batch_size)
+        if "train" not in args.skip:
+            suite.training_benchmark(variant, args.episodes)
+
+    report = {
+        'meta': {'revision': revision(), 'timestamp': datetime.datetime.now().isoformat(timespec="seconds"),
+                 'python': platform.python_version(), 'numpy': np.__version__,
+                 'machine': platform.machine(), 'platform': platform.platform(), 'args': vars(args)},
+        'results': suite.results,
+    }
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare is not None:
+        with open(args.compare) as f:
+            regressions = compare(suite.results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Sampling throughput of the array-backed SumTree against the original recursive list version.
+
+Run from the repository root:
+    python Programs/benchmarks/sumtree_sampling.py
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Q-learning+PER"))
+from SumTree import SumTree  # noqa: E402
+
+
+class LegacySumTree:
+    """The list-backed, recursive SumTree this repo used before, kept as the baseline"""
+
+    def __init__(self, capacity, tree):
+        self.capacity = capacity
+        self.tree = tree
+
+    @classmethod
+    def from_priorities(cls, priorities):
+        """Build the legacy layout (2 * capacity - 1 nodes, leaves from capacity - 1) over priorities"""
+        capacity = len(priorities)
+        tree = np.zeros(2 * capacity - 1)
+        tree[capacity - 1:] = priorities
+        # Fill the internal nodes bottom-up in blocks whose children are all already summed
+        end = capacity - 1
+        while end > 0:
+            start = end // 2
+            tree[start:end] = tree[2 * start + 1:2 * end + 1:2] + tree[2 * start + 2:2 * end + 2:2]
+            end = start
+        return cls(capacity, tree.tolist())
+
+    def total(self):
+        return self.tree[0]
+
+    def _retrieve(self, idx, s):
+        left = 2 * idx + 1
+        right = left + 1
+
+        if left >= len(self.tree):
+            return idx
+
+        if s <= self.tree[left]:
+            return self._retrieve(left, s)
+        else:
+            return self._retrieve(right, s - self.tree[left])
+
+    def get(self, s):
+        idx = self._retrieve(0, s)
+        return idx, self.tree[idx]
+
+
+def legacy_sample(tree, batch_size):
+    segment = tree.total() / batch_size
+    return [tree.get(np.random.uniform(segment * i, segment * (i + 1)))[0] for i in range(batch_size)]
+
+
+def batched_sample(tree, batch_size):
+    segment = tree.total() / batch_size
+    bounds = segment * np.arange(batch_size)
+    return tree.get_batch(np.random.uniform(bounds, bounds + segment))[0]
+
+
+def time_batches(sample_fn, tree, batch_size, min_time):
+    """Repeat sample_fn until min_time has elapsed and return batches per second"""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        sample_fn(tree, batch_size)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--capacities", type=float, nargs="+", default=[1e4, 1e5, 1e6, 1e7])
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--min-time", type=float, default=1.0, help="seconds spent timing each variant")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'capacity':>10} {'legacy batch/s':>15} {'array batch/s':>15} {'speedup':>8}")
+    for capacity in map(int, args.capacities):
+        np.random.seed(args.seed)
+        priorities = np.random.uniform(1e-3, 1.0, capacity)
+        tree = SumTree(capacity)
+        tree.update_batch(np.arange(capacity) + tree.leaf_base, priorities)
+        legacy = LegacySumTree.from_priorities(priorities)
+        # Both trees must sample real leaves only, or the timings compare broken trees
+        assert (tree.get_batch(np.random.uniform(0, tree.total(), 1000))[1] > 0).all()
+        assert all(legacy.get(s)[0] >= capacity - 1 for s in np.random.uniform(0, legacy.total(), 1000))
+
+        legacy_rate = time_batches(legacy_sample, legacy, args.batch_size, args.min_time)
+        array_rate = time_batches(batched_sample, tree, args.batch_size, args.min_time)
+        print(f"{capacity:>10} {legacy_rate:>15.0f} {array_rate:>15.0f} {array_rate / legacy_rate:>7.1f}x")
+        del legacy
+
+
+if __name__ == "__main__":
+    main()
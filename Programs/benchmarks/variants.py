@@ -0,0 +1,29 @@
+"""Import helpers for loading the three program variants side by side.
+
+Each variant is a flat directory of scripts that import one another by bare name
+(``from maze import Maze``), so two variants cannot share ``sys.modules``. load_variant
+imports the requested modules from one directory and then removes that directory's
+names from ``sys.modules`` again, leaving the returned module objects usable.
+"""
+import importlib
+import os
+import sys
+
+PROGRAMS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VARIANTS = ("Q-learning", "Q-learning+PER", "Q-learning+PER+KeyBlock")
+
+
+def load_variant(variant, *modules):
+    """Import modules (by bare name) from one variant directory and return them in order"""
+    path = os.path.join(PROGRAMS_DIR, variant)
+    local_names = {name[:-3] for name in os.listdir(path) if name.endswith(".py")}
+    saved = {name: sys.modules.pop(name) for name in local_names if name in sys.modules}
+
+    sys.path.insert(0, path)
+    try:
+        return [importlib.import_module(name) for name in modules]
+    finally:
+        sys.path.remove(path)
+        for name in local_names:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
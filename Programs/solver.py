@@ -0,0 +1,230 @@
+"""Exact planning baseline: value iteration over the maze MDP.
+
+Every maze variant is deterministic, so its MDP is fully described by the compiled
+next-cell table. MazeMDP turns a Maze from any of the three variants into a table of
+next states over which value iteration runs as a handful of NumPy gathers per sweep:
+
+- Q-learning+PER: one state per cell, reaching the goal ends the episode
+- Q-learning+PER+KeyBlock: one state per (cell, has_key) pair, numbered cell * 2 + has_key
+  like the agent's Q-table rows; the goal only ends the episode once the key is held
+- Q-learning: one state per cell; the exit ends the episode and so does a trap, which
+  counts as never arriving
+
+The reference reward is a unit cost per step, so Q*(s, a) is minus the number of steps
+to the goal when a is taken first (-inf if the goal can no longer be reached). The
+training rewards are shaped and not Markov in the cell, so learned Q-values are not on
+this scale; policy_distance therefore compares the learned greedy policy with Q*.
+
+Run from the repository root, e.g.:
+    python Programs/solver.py --variant Q-learning+PER+KeyBlock --size 100 --seed 0
+    python Programs/solver.py --variant Q-learning+PER --size 10 --seed 0 --episodes 300
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from benchmarks.variants import VARIANTS, load_variant  # noqa: E402
+
+CLASSIC_MAZES = ("simple", "complex", "spiral")
+
+
+class MazeMDP:
+    def __init__(self, next_states, success, failure, start):
+        """Deterministic episodic MDP.
+
+        next_states[s, a] is the state reached from s by a; success / failure mark the
+        (s, a) pairs that end the episode at the goal / in a trap, start is the initial state.
+        """
+        self.next_states = np.asarray(next_states, dtype=np.int64)
+        self.success = np.asarray(success, dtype=bool)
+        self.failure = np.asarray(failure, dtype=bool)
+        self.start = int(start)
+        self.num_states, self.num_actions = self.next_states.shape
+
+        # Terminal pairs point at two extra sink states: value 0 (goal) and -inf (trap)
+        self._targets = np.where(self.success, self.num_states, self.next_states)
+        self._targets[self.failure] = self.num_states + 1
+
+    @classmethod
+    def from_maze(cls, maze):
+        """Build the MDP of a Maze from any of the three variants"""
+        if hasattr(maze, 'trap_positions'):  # Classic Q-learning maze (cell = y * width + x)
+            if maze._transitions_dirty:
+                maze.compile_transitions()
+            next_cells = maze.next_cell
+            return cls(next_cells, maze.is_exit[next_cells], maze.is_trap[next_cells], maze.cell_id(0, 0))
+
+        next_cells = maze.next_cell
+        start = maze.cell_id(maze.start)
+        if not hasattr(maze, 'is_key'):
+            return cls(next_cells, maze.is_goal[next_cells], np.zeros(next_cells.shape, dtype=bool), start)
+
+        # KeyBlock: state = cell * 2 + has_key, the key is picked up on entering its cell
+        has_key = np.array([0, 1])[None, :, None]
+        next_has_key = has_key | maze.is_key[next_cells][:, None, :]
+        next_states = (next_cells[:, None, :] * 2 + next_has_key).reshape(-1, next_cells.shape[1])
+        success = (maze.is_goal[next_cells][:, None, :] & next_has_key.astype(bool)).reshape(next_states.shape)
+        return cls(next_states, success, np.zeros(next_states.shape, dtype=bool),
+                   start * 2 + int(maze.is_key[start]))
+
+    def reachable(self):
+        """Boolean mask of the states reachable from start without ending the episode"""
+        reached = np.zeros(self.num_states, dtype=bool)
+        frontier = np.array([self.start])
+        reached[frontier] = True
+        while len(frontier):
+            ongoing = ~(self.success[frontier] | self.failure[frontier])
+            neighbours = self.next_states[frontier][ongoing]
+            frontier = np.unique(neighbours[~reached[neighbours]])
+            reached[frontier] = True
+        return reached
+
+    def solve(self, gamma=1.0, tol=1e-9, max_iterations=None):
+        """Value iteration to convergence.
+
+        Values start at -inf and only ever rise, so sweeps stop as soon as no state
+        improves by more than tol. With gamma=1 that takes one sweep more than the
+        longest shortest path.
+
+        Returns:
+            (Q* of shape (num_states, num_actions), number of sweeps)
+        """
+        values = np.full(self.num_states + 2, -np.inf)
+        values[self.num_states] = 0.0  # Goal sink; the trap sink stays at -inf
+        targets = np.ascontiguousarray(self._targets.T)  # Reducing over the leading axis is much faster
+        limit = max_iterations or self.num_states + 1
+        for iteration in range(1, limit + 1):
+            # max_a (-1 + gamma * V[next]) = -1 + gamma * max_a V[next]
+            new_values = gamma * values[targets].max(axis=0) - 1.0
+            improved = new_values > values[:self.num_states] + tol
+            values[:self.num_states] = new_values
+            if not improved.any():
+                break
+        q_values = gamma * values[self._targets] - 1.0
+        return q_values, iteration
+
+    def rollout(self, policy, max_steps=None):
+        """Number of steps policy (an action per state) takes from start to the goal, or None
+        if it falls into a trap, loops or runs out of steps"""
+        visited = np.zeros(self.num_states, dtype=bool)
+        state = self.start
+        for steps in range(1, (max_steps or self.num_states) + 1):
+            visited[state] = True
+            action = policy[state]
+            if self.success[state, action]:
+                return steps
+            if self.failure[state, action]:
+                return None
+            state = self.next_states[state, action]
+            if visited[state]:
+                return None  # Deterministic, so a revisit means the policy loops forever
+        return None
+
+
+def shortest_path_length(mdp, q_star):
+    """Steps on the shortest path from start to the goal (None if the goal is unreachable)"""
+    return mdp.rollout(q_star.argmax(axis=1))
+
+
+def learned_q_values(agent):
+    """(MDP state ids, Q-value rows) of a trained agent from any of the three variants"""
+    if hasattr(agent, 'q_values'):  # Classic agent: rows are cell ids already
+        return np.arange(len(agent.q_values)), agent.q_values
+    cells = agent.state_index.cells.astype(np.int64)
+    if agent.q_table.ndim == 3:  # KeyBlock: (state, has_key, action)
+        states = (cells[:, None] * 2 + np.arange(2)).ravel()
+        return states, agent.q_table.reshape(-1, agent.q_table.shape[-1])
+    return cells, agent.q_table
+
+
+def policy_distance(mdp, q_star, agent, tol=1e-9):
+    """How far a trained agent's greedy policy is from optimal.
+
+    Compared over the states reachable from start that can still reach the goal and
+    that training touched (learned row not all zero).
+
+    Returns:
+        dict: coverage (touched share of those states), agreement (share of touched
+        states whose greedy action is optimal), mean_regret (extra steps caused by one
+        greedy action, averaged over touched states where it does not lose the goal),
+        fatal (touched states whose greedy action loses the goal), greedy_path_length
+        and shortest_path_length
+    """
+    states, q_learned = learned_q_values(agent)
+    q_learned = np.asarray(q_learned, dtype=np.float64)
+    policy = np.zeros(mdp.num_states, dtype=np.int64)
+    policy[states] = q_learned.argmax(axis=1)
+    touched = np.zeros(mdp.num_states, dtype=bool)
+    touched[states] = np.any(q_learned != 0, axis=1)
+
+    optimal_values = q_star.max(axis=1)
+    candidates = mdp.reachable() & np.isfinite(optimal_values)
+    compared = np.flatnonzero(candidates & touched)
+
+    chosen = q_star[compared, policy[compared]]
+    regret = optimal_values[compared] - chosen
+    finite = np.isfinite(regret)
+    return {
+        'coverage': len(compared) / max(int(candidates.sum()), 1),
+        'agreement': float(np.mean(regret <= tol)) if len(compared) else 0.0,
+        'mean_regret': float(regret[finite].mean()) if finite.any() else 0.0,
+        'fatal': int(np.count_nonzero(~finite)),
+        'greedy_path_length': mdp.rollout(policy),
+        'shortest_path_length': shortest_path_length(mdp, q_star),
+    }
+
+
+def make_maze(variant, size=10, seed=None, maze_name="simple"):
+    if variant == "Q-learning":
+        maze_module, = load_variant(variant, "maze")
+        return getattr(maze_module, f"create_{maze_name}_maze")()
+    maze_module, = load_variant(variant, "maze")
+    return maze_module.Maze(size=size, seed=seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variant", choices=VARIANTS, default="Q-learning+PER")
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--maze", choices=CLASSIC_MAZES, default="simple",
+                        help="built-in maze for the classic Q-learning variant")
+    parser.add_argument("--gamma", type=float, default=1.0)
+    parser.add_argument("--episodes", type=int, default=0,
+                        help="also train a headless agent this long and compare it with Q*")
+    args = parser.parse_args(argv)
+
+    if args.episodes and args.variant == "Q-learning":
+        main_module, = load_variant(args.variant, "main")
+        maze = make_maze(args.variant, maze_name=args.maze)
+        agent, maze, _ = main_module.train_agent(maze, episodes=args.episodes, seed=args.seed,
+                                                 save_plots=False, verbose=False)
+    elif args.episodes:
+        main_module, = load_variant(args.variant, "main")
+        maze = make_maze(args.variant, args.size, args.seed)
+        agent = main_module.train(seed=args.seed, env=maze, episodes=args.episodes,
+                                  render=False, verbose=False)['agent']
+    else:
+        maze, agent = make_maze(args.variant, args.size, args.seed, args.maze), None
+
+    start_time = time.perf_counter()
+    mdp = MazeMDP.from_maze(maze)
+    q_star, iterations = mdp.solve(gamma=args.gamma)
+    shortest = shortest_path_length(mdp, q_star)
+    elapsed = time.perf_counter() - start_time
+    print(f"{mdp.num_states} states, {iterations} sweeps in {elapsed * 1000:.1f} ms; "
+          f"shortest path: {shortest if shortest is not None else 'unreachable'}")
+
+    if agent is not None:
+        distance = policy_distance(mdp, q_star, agent)
+        print(" ".join(f"{name}={value:.3f}" if isinstance(value, float) else f"{name}={value}"
+                       for name, value in distance.items()))
+    return q_star
+
+
+if __name__ == "__main__":
+    main()
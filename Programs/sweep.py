@@ -0,0 +1,170 @@
+"""Hyperparameter and seed sweeps, one training run per worker process.
+
+Every (configuration, seed) pair is an independent headless training run. Runs are
+spread over a process pool, streamed to a CSV as they finish and summarised per
+configuration (mean / std over seeds) at the end.
+
+Run from the repository root, e.g.:
+    python Programs/sweep.py --variant Q-learning+PER --seeds 0-7 --episodes 300 \\
+        --param lr=0.05,0.1 --param alpha=0.4,0.6 --param reward.goal=50,100 --output sweep.csv
+
+Parameter names: alpha/beta go to the replay buffer, reward.<name> overrides a reward
+constant and anything else is set on the agent (lr, gamma, epsilon_decay, ...; for the
+classic Q-learning variant learning_rate, discount_factor, exploration_rate).
+"""
+import argparse
+import csv
+import itertools
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from benchmarks.variants import VARIANTS, load_variant  # noqa: E402
+
+MEMORY_PARAMS = ("alpha", "beta")
+CLASSIC_MAZES = ("simple", "complex", "spiral")
+FIELDS = ["variant", "seed", "params", "success_rate", "mean_steps_to_goal", "wall_time"]
+
+
+def parse_value(text):
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def parse_seeds(text):
+    """'0-7' or '1,2,5' -> list of ints"""
+    if "-" in text.lstrip("-"):
+        low, high = text.split("-", 1)
+        return list(range(int(low), int(high) + 1))
+    return [int(seed) for seed in text.split(",")]
+
+
+def parse_grid(specs):
+    """['lr=0.05,0.1', 'alpha=0.6'] -> list of {name: value} configurations (cartesian product)"""
+    names, values = [], []
+    for spec in specs:
+        name, _, options = spec.partition("=")
+        if not options:
+            raise ValueError(f"Expected name=v1,v2,... but got {spec!r}")
+        names.append(name)
+        values.append([parse_value(option) for option in options.split(",")])
+    return [dict(zip(names, combo)) for combo in itertools.product(*values)]
+
+
+def split_params(params):
+    """Route sweep parameters to agent, replay buffer and reward overrides"""
+    agent_params, memory_params, reward_constants = {}, {}, {}
+    for name, value in params.items():
+        if name.startswith("reward."):
+            reward_constants[name[len("reward."):]] = value
+        elif name in MEMORY_PARAMS:
+            memory_params[name] = value
+        else:
+            agent_params[name] = value
+    return agent_params, memory_params, reward_constants
+
+
+def run_one(variant, seed, params, episodes, maze_name="simple"):
+    """Worker entry point: one headless training run, returns a result row"""
+    agent_params, memory_params, reward_constants = split_params(params)
+
+    if variant == "Q-learning":
+        if memory_params or reward_constants:
+            raise ValueError("The classic Q-learning variant only takes agent parameters")
+        main, maze_module = load_variant(variant, "main", "maze")
+        random.seed(seed)
+        maze = getattr(maze_module, f"create_{maze_name}_maze")()
+        _, _, stats = main.train_agent(maze, episodes=episodes, agent_params=agent_params,
+                                       seed=seed, save_plots=False, verbose=False)
+    else:
+        main, = load_variant(variant, "main")
+        stats = main.train(seed=seed, episodes=episodes, agent_params=agent_params,
+                           memory_params=memory_params, reward_constants=reward_constants,
+                           render=False, verbose=False)
+
+    # Headless runs must never pull in a GUI toolkit
+    loaded = [name for name in ("matplotlib", "pygame") if name in sys.modules]
+    if loaded:
+        raise RuntimeError(f"Headless {variant} run imported {', '.join(loaded)}")
+
+    successes = np.asarray(stats["successes"], dtype=bool)
+    steps = np.asarray(stats["episode_steps"])
+    return {
+        "variant": variant,
+        "seed": seed,
+        "params": params,
+        "success_rate": successes.mean(),
+        "mean_steps_to_goal": steps[successes].mean() if successes.any() else float("nan"),
+        "wall_time": stats["wall_time"],
+    }
+
+
+def format_params(params):
+    return " ".join(f"{name}={value}" for name, value in params.items()) or "-"
+
+
+def summarise(rows):
+    """Mean / std of each metric over seeds, one line per configuration"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(format_params(row["params"]), []).append(row)
+
+    print(f"\n{'params':<40} {'seeds':>5} {'success':>15} {'steps to goal':>17} {'wall (s)':>9}")
+    for key in sorted(groups, key=lambda k: -np.mean([r["success_rate"] for r in groups[k]])):
+        group = groups[key]
+        success = np.array([r["success_rate"] for r in group])
+        steps = np.array([r["mean_steps_to_goal"] for r in group])
+        steps = steps[~np.isnan(steps)]
+        steps_text = f"{steps.mean():7.1f} ± {steps.std():6.1f}" if len(steps) else f"{'-':>16}"
+        wall = np.mean([r["wall_time"] for r in group])
+        print(f"{key:<40} {len(group):>5} {success.mean():6.3f} ± {success.std():5.3f} "
+              f"{steps_text:>17} {wall:9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--variant", choices=VARIANTS, default="Q-learning+PER")
+    parser.add_argument("--seeds", type=parse_seeds, default=[0, 1, 2, 3], help="e.g. 0-7 or 1,3,5")
+    parser.add_argument("--episodes", type=int, default=300)
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2",
+                        help="parameter values to sweep (repeatable)")
+    parser.add_argument("--maze", choices=CLASSIC_MAZES, default="simple",
+                        help="built-in maze for the classic Q-learning variant")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="sweep.csv", help="CSV file, one row per run")
+    args = parser.parse_args()
+
+    configs = parse_grid(args.param)
+    tasks = [(config, seed) for config in configs for seed in args.seeds]
+    print(f"{len(tasks)} runs ({len(configs)} configurations x {len(args.seeds)} seeds) "
+          f"on {args.workers} workers")
+
+    rows = []
+    with open(args.output, "w", newline="") as f, ProcessPoolExecutor(args.workers) as pool:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        futures = [pool.submit(run_one, args.variant, seed, config, args.episodes, args.maze)
+                   for config, seed in tasks]
+        for future in as_completed(futures):
+            row = future.result()
+            rows.append(row)
+            writer.writerow({**row, "params": format_params(row["params"])})
+            f.flush()
+            print(f"[{len(rows)}/{len(tasks)}] seed={row['seed']:<4} {format_params(row['params']):<40} "
+                  f"success={row['success_rate']:.3f} steps={row['mean_steps_to_goal']:.1f} "
+                  f"({row['wall_time']:.1f}s)")
+
+    summarise(rows)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()